@@ -11,6 +11,13 @@ Implemented search strategy:
 - Binary search within [1, initial_max] using stability criteria
 - Tracks per-iteration outcomes and best stable result
 - Produces analytical summary with recommendations and per-stream insights
+- Unstable iterations where the tester itself was saturated (client-bound)
+  are not counted as server instability; the search stops there and the
+  result is reported as a lower bound
+
+Usage:
+    python adaptive_load_test.py                  # prompts for search settings
+    python adaptive_load_test.py --loop=uvloop    # uvloop event loop backend
 """
 
 import asyncio
@@ -18,7 +25,6 @@ import sys
 import os
 from typing import Optional, Tuple
 import time
-import logging
 import csv
 import json
 
@@ -26,6 +32,8 @@ import json
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from camera_stream_load_test import CameraStreamLoadTester, save_report, print_summary
+from event_loop_backend import current_loop_backend, loop_backend_from_argv, run_with_loop
+from tester_logging import close_tester_logger, setup_tester_logger
 
 class AdaptiveLoadTester:
     def __init__(self, initial_max: int = 100, test_duration: int = 120, 
@@ -45,6 +53,7 @@ class AdaptiveLoadTester:
         self.max_streams = initial_max
         self.best_stable_count = 0
         self.test_iteration = 0
+        self.client_bound_at: Optional[int] = None  # Stream count at which the tester saturated
         
         # Results tracking
         self.test_results = []
@@ -53,33 +62,8 @@ class AdaptiveLoadTester:
         os.makedirs('logs', exist_ok=True)
         self.log_filename = os.path.join('logs', f'adaptive_load_test_{time.strftime("%Y%m%d_%H%M%S")}.log')
         
-        # Create logger
-        self.logger = logging.getLogger(f"AdaptiveLoadTester_{id(self)}")
-        self.logger.setLevel(logging.INFO)
-        
-        # Clear any existing handlers
-        self.logger.handlers.clear()
-        
-        # Console handler
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
-        console_format = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        console_handler.setFormatter(console_format)
-        self.logger.addHandler(console_handler)
-        
-        # File handler
-        try:
-            file_handler = logging.FileHandler(self.log_filename)
-            file_handler.setLevel(logging.INFO) 
-            file_format = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-            file_handler.setFormatter(file_format)
-            self.logger.addHandler(file_handler)
-            self.logger.info(f"Logging to file: {self.log_filename}")
-        except Exception as e:
-            print(f"Warning: Could not create log file {self.log_filename}: {e}")
-        
-        # Prevent propagation to root logger
-        self.logger.propagate = False
+        # Console and file handlers run on a background thread (tester_logging.py)
+        self.logger = setup_tester_logger(f"AdaptiveLoadTester_{id(self)}", self.log_filename)
     
     async def test_stream_count(self, stream_count: int) -> Tuple[bool, dict]:
         """Test a specific number of streams for stability"""
@@ -113,6 +97,8 @@ class AdaptiveLoadTester:
                 achieved_streams >= stream_count * 0.9 and  # At least 90% of target streams achieved
                 reconnection_rate <= self.stability_threshold  # Low reconnection rate
             )
+            # Our own event loop or CPU was the limit, so the server was not measured
+            client_bound = bool(report.get("tester_saturation", {}).get("client_bound"))
             
             result_summary = {
                 "stream_count": stream_count,
@@ -120,6 +106,7 @@ class AdaptiveLoadTester:
                 "total_reconnections": total_reconnections,
                 "reconnection_rate": reconnection_rate,
                 "is_stable": is_stable,
+                "client_bound": client_bound,
                 "test_duration": report["test_info"]["duration_seconds"],
                 "avg_fps": report["stream_performance"]["average_fps"],
                 "full_report": report
@@ -147,7 +134,9 @@ class AdaptiveLoadTester:
                 cam_csv = os.path.join(reports_dir, f"{base_stem}_cameras.csv")
                 fields = [
                     "camera_id", "status", "total_frames", "total_bytes",
-                    "reconnections", "avg_fps", "duration_seconds", "errors_count"
+                    "reconnections", "avg_fps", "malformed_frames", "avg_frame_size",
+                    "frame_interval_p95_ms", "frame_interval_max_ms",
+                    "duration_seconds", "errors_count"
                 ]
                 with open(cam_csv, "w", newline="", encoding="utf-8") as f:
                     writer = csv.DictWriter(f, fieldnames=fields)
@@ -160,8 +149,12 @@ class AdaptiveLoadTester:
                             "total_bytes": s.get("total_bytes"),
                             "reconnections": s.get("reconnections"),
                             "avg_fps": s.get("avg_fps"),
+                            "malformed_frames": s.get("malformed_frames", 0),
+                            "avg_frame_size": s.get("avg_frame_size", 0),
+                            "frame_interval_p95_ms": s.get("frame_interval_ms", {}).get("p95", 0),
+                            "frame_interval_max_ms": s.get("frame_interval_ms", {}).get("max", 0),
                             "duration_seconds": s.get("duration_seconds"),
-                            "errors_count": len(s.get("errors", [])),
+                            "errors_count": s.get("error_count", len(s.get("errors", []))),
                         })
                 self.logger.info(f"   Saved per-camera CSV: {cam_csv}")
             except Exception as e:
@@ -172,11 +165,12 @@ class AdaptiveLoadTester:
                 sys_csv = os.path.join(reports_dir, f"{base_stem}_system.csv")
                 sys_fields = [
                     "timestamp", "cpu_percent", "memory_percent", "memory_used_gb",
-                    "network_bytes_sent", "network_bytes_recv", "active_streams",
-                    "total_frames", "total_bytes"
+                    "network_bytes_sent", "network_bytes_recv", "ctx_switches_per_second",
+                    "tester_cpu_percent", "tester_rss_mb", "tester_ctx_switches_per_second",
+                    "active_streams", "total_frames", "total_bytes"
                 ]
                 with open(sys_csv, "w", newline="", encoding="utf-8") as f:
-                    writer = csv.DictWriter(f, fieldnames=sys_fields)
+                    writer = csv.DictWriter(f, fieldnames=sys_fields, extrasaction="ignore")  # Per-NIC rates stay in the JSON
                     writer.writeheader()
                     for row in getattr(tester, "system_stats", []) or []:
                         writer.writerow(row)
@@ -185,7 +179,7 @@ class AdaptiveLoadTester:
                 self.logger.warning(f"Could not save system metrics CSV: {e}")
             
             # Log results
-            status = "✅ STABLE" if is_stable else "❌ UNSTABLE"
+            status = "✅ STABLE" if is_stable else "⚠️ CLIENT-BOUND (inconclusive)" if client_bound else "❌ UNSTABLE"
             self.logger.info(f"\nResult: {status}")
             self.logger.info(f"   Target streams: {stream_count}")
             self.logger.info(f"   Achieved streams: {achieved_streams}")
@@ -208,6 +202,13 @@ class AdaptiveLoadTester:
         Uses binary search within [1, initial_max] to identify the maximum
         stable concurrent stream count according to the stability threshold.
         """
+        try:
+            return await self._find_maximum_streams()
+        finally:
+            # Each iteration's tester closes its own logger; this one holds the search log
+            close_tester_logger(self.logger)
+
+    async def _find_maximum_streams(self) -> dict:
         print(f"Starting adaptive search up to {self.initial_max} streams...")
 
         # Set exception handler for asyncio to suppress SSL-related noise
@@ -235,6 +236,13 @@ class AdaptiveLoadTester:
                 iterations += 1
                 continue
 
+            if not is_stable and result.get("client_bound"):
+                # Higher counts would saturate the tester even more; lower ones are already known
+                self.client_bound_at = mid
+                self.logger.info(f"   Decision: CLIENT-BOUND at {mid} → tester saturated, stopping the search "
+                                 f"(server capacity is at least {best})")
+                break
+
             if is_stable:
                 achieved = result.get("achieved_streams", 0)
                 best = max(best, achieved)
@@ -264,12 +272,14 @@ class AdaptiveLoadTester:
                 "initial_max_target": self.initial_max,
                 "test_duration_per_iteration": self.test_duration,
                 "stability_threshold": self.stability_threshold,
-                "maximum_stable_streams": self.best_stable_count
+                "maximum_stable_streams": self.best_stable_count,
+                "client_bound_at_streams": self.client_bound_at
             },
             "optimization_results": {
                 "recommended_max_streams": self.best_stable_count,
                 "confidence_level": "high" if len(stable_results) >= 3 else "medium",
-                "stability_verified": best_result is not None
+                "stability_verified": best_result is not None,
+                "capacity_is_lower_bound": self.client_bound_at is not None
             },
             "all_test_iterations": self.test_results,
             "best_stable_configuration": best_result,
@@ -289,6 +299,13 @@ class AdaptiveLoadTester:
             "resource_peaks": {}
         }
         
+        if self.best_stable_count == 0 and self.client_bound_at is not None:
+            analysis["summary"] = f"⚠️ INCONCLUSIVE: the tester saturated at {self.client_bound_at} streams before the server could be measured"
+            analysis["recommendations"].append(
+                "Add tester capacity (--workers, --client raw, uvloop or distributed agents) and rerun"
+            )
+            return analysis
+        
         if self.best_stable_count == 0:
             analysis["summary"] = "❌ Unable to find stable configuration - system may be overloaded"
             analysis["recommendations"].extend([
@@ -299,7 +316,7 @@ class AdaptiveLoadTester:
             return analysis
         
         stable_results = [r for r in self.test_results if r.get("is_stable")]
-        unstable_results = [r for r in self.test_results if not r.get("is_stable")]
+        unstable_results = [r for r in self.test_results if not r.get("is_stable") and not r.get("client_bound")]
         
         # Performance characteristics
         if stable_results:
@@ -346,7 +363,9 @@ class AdaptiveLoadTester:
                         "camera_id": t.get("camera_id"),
                         "reconnections": t.get("reconnections", 0),
                         "avg_fps": t.get("avg_fps", 0),
-                        "errors": t.get("errors", [])
+                        "errors": t.get("errors", []),
+                        "error_count": t.get("error_count", len(t.get("errors", []))),
+                        "error_codes": t.get("error_codes", {})
                     }
                     for t in top if t.get("reconnections", 0) > 0
                 ]
@@ -368,6 +387,12 @@ class AdaptiveLoadTester:
             analysis["summary"] = f"⚠️ MODERATE: System can handle {self.best_stable_count} concurrent streams stably"
         else:
             analysis["summary"] = f"❌ LIMITED: System can only handle {self.best_stable_count} concurrent streams stably"
+        if self.client_bound_at is not None:
+            analysis["summary"] += f" (lower bound: tester saturated at {self.client_bound_at} streams)"
+            analysis["recommendations"].append(
+                f"The tester, not the server, limited the search at {self.client_bound_at} streams; "
+                "add tester capacity (--workers, --client raw, uvloop or distributed agents) to measure higher"
+            )
         
         # Recommendations
         if unstable_results:
@@ -402,6 +427,8 @@ def print_adaptive_summary(report: dict):
     print(f"   Maximum stable concurrent streams: {max_stable}")
     print(f"   Recommended production limit: {max(1, int(max_stable * 0.8))}")
     print(f"   Confidence level: {results.get('confidence_level', 'unknown')}")
+    if test_info.get('client_bound_at_streams'):
+        print(f"   ⚠️  Tester saturated at {test_info['client_bound_at_streams']} streams: maximum is a lower bound")
     
     if "performance_characteristics" in analysis:
         perf = analysis["performance_characteristics"]
@@ -432,7 +459,7 @@ def print_adaptive_summary(report: dict):
     if analysis.get('top_unstable_cameras'):
         print(f"\n🔎 Top Unstable Cameras (reconnections):")
         for c in analysis['top_unstable_cameras']:
-            print(f"   - Camera {c.get('camera_id')}: {c.get('reconnections')} reconnections | avg FPS {c.get('avg_fps')} | errors: {len(c.get('errors', []))}")
+            print(f"   - Camera {c.get('camera_id')}: {c.get('reconnections')} reconnections | avg FPS {c.get('avg_fps')} | errors: {c.get('error_count', len(c.get('errors', [])))}")
     
     print("\n" + "="*80)
 
@@ -465,6 +492,7 @@ async def main():
     print(f"   Initial maximum: {initial_max} streams")
     print(f"   Test duration per iteration: {test_duration}s")
     print(f"   Stability threshold: {threshold} reconnections/stream")
+    print(f"   Event loop: {current_loop_backend()}")
     print()
     
     input("Press Enter to start adaptive testing...")
@@ -505,5 +533,5 @@ async def main():
         return 1
 
 if __name__ == "__main__":
-    result = asyncio.run(main())
+    result = run_with_loop(main(), loop_backend_from_argv())
     sys.exit(result)
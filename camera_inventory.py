@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Cached Camera Inventory
+=======================
+
+Fetches the active camera list once and shares it, instead of downloading
+and filtering the full camera JSON for every tester instance.
+- One parsed inventory per (api_url, prefix) is shared by every tester in
+  the process, so iteration-based runners (adaptive, simple max,
+  multi-connection) fetch it once
+- The inventory is also kept on disk (cache/cameras_<hash>.json); within
+  the TTL it is used as is, after the TTL it is revalidated with
+  If-None-Match / If-Modified-Since and a 304 only renews it
+- When the API fails, a stale cached inventory is used with a warning
+- Offline mode runs from the cached file without touching the API
+- Downloads are parsed incrementally (json_array_parser.py) and filtered as
+  the bytes arrive, optionally page by page (limit/offset); with a camera
+  limit the download stops once enough active cameras are in
+- ``stats`` reports the source, time to the first active camera, download
+  time and the parser's peak buffer
+
+Usage:
+    inventory = CameraInventory(api_url, prefix, ttl=300)
+    cameras = await inventory.get_active_cameras()   # a fresh list per call
+    await inventory.get_active_cameras(limit=50)     # may stop the download early
+    CameraInventory(api_url, offline=True)           # cached file only
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
+
+import aiohttp
+
+from json_array_parser import JsonArrayParser
+
+CACHE_DIR = 'cache'
+DEFAULT_TTL = 300.0  # Seconds
+READ_CHUNK_SIZE = 64 * 1024
+PAGE_LIMIT_PARAM = 'limit'
+PAGE_OFFSET_PARAM = 'offset'
+MAX_PAGES = 10000  # Guards against an API that ignores the offset
+
+# Parsed inventories shared by all testers in this process: url -> cache entry
+_shared: Dict[str, Dict] = {}
+
+
+def with_query(url: str, **params) -> str:
+    """``url`` with the given query parameters set"""
+    try:
+        parsed = urlparse(url)
+        query_params = dict(parse_qsl(parsed.query, keep_blank_values=True))
+        query_params.update(params)
+        return urlunparse(parsed._replace(query=urlencode(query_params)))
+    except Exception:
+        return url  # Fallback to original on parse error
+
+
+def inventory_url(api_url: str, prefix: str = "") -> str:
+    """Camera API URL with the optional prefix query parameter"""
+    return with_query(api_url, **({"prefix": prefix} if prefix != "" else {}))
+
+
+def active_cameras(cameras: List[Dict]) -> List[Dict]:
+    """Cameras with status = 1 and a stream URL"""
+    return [cam for cam in cameras if cam.get('status') == 1 and cam.get('fr_url')]
+
+
+class CameraInventory:
+    """Active cameras of one API URL, cached in memory and on disk"""
+
+    def __init__(self, api_url: str, prefix: str = "", ttl: float = DEFAULT_TTL,
+                 offline: bool = False, cache_dir: str = CACHE_DIR, page_size: int = 0,
+                 logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            ttl: Seconds a fetched inventory is used without revalidation
+            offline: Use the cached file only, never the API
+            cache_dir: Directory of the cached inventory files
+            page_size: Fetch pages of this many cameras (limit/offset), 0 fetches one list
+        """
+        self.url = inventory_url(api_url, prefix)
+        self.ttl = ttl
+        self.offline = offline
+        self.page_size = page_size
+        self.cache_path = os.path.join(
+            cache_dir, f"cameras_{hashlib.sha1(self.url.encode()).hexdigest()[:16]}.json"
+        )
+        self.logger = logger or logging.getLogger(__name__)
+        self.stats: Dict = {}  # Where the last inventory came from and how long it took
+        self._fetch_stats: Dict = {}
+
+    async def get_active_cameras(self, limit: Optional[int] = None) -> List[Dict]:
+        """Active cameras; the list is new on every call (callers shuffle it)
+
+        Args:
+            limit: Only this many cameras are needed (no shuffle); a download
+                   stops once they are in, and the partial list is not cached
+        """
+        self._fetch_stats = {}
+        entry, source = await self._entry(limit)
+        age = time.time() - entry["fetched_at"]
+        if entry.get("partial"):
+            self.logger.info(
+                f"Found {len(entry['cameras'])} active cameras in the first {entry['total']} "
+                f"({source}, download stopped at the camera limit)"
+            )
+        else:
+            self.logger.info(
+                f"Found {len(entry['cameras'])} active cameras out of {entry['total']} total "
+                f"({source}, inventory age {age:.0f}s)"
+            )
+        self.stats = dict(
+            source=source,
+            active_cameras=len(entry["cameras"]),
+            total_cameras=entry["total"],
+            partial=bool(entry.get("partial")),
+            age_seconds=round(age, 1),
+            **self._fetch_stats
+        )
+        if self._fetch_stats.get("time_to_first_camera_ms") is not None:
+            self.logger.info(
+                f"Inventory download: first active camera after {self._fetch_stats['time_to_first_camera_ms']:.0f}ms, "
+                f"done in {self._fetch_stats['download_seconds']:.2f}s "
+                f"({self._fetch_stats['pages']} pages, parser peak buffer {self._fetch_stats['peak_buffer_kb']:.0f}KB)"
+            )
+        return list(entry["cameras"])
+
+    async def _entry(self, limit: Optional[int] = None) -> Tuple[Dict, str]:
+        entry = _shared.get(self.url) or self._load()
+        if entry is not None:
+            _shared[self.url] = entry
+        if self.offline:
+            if entry is None:
+                raise Exception(f"Offline mode: no cached inventory for {self.url} ({self.cache_path})")
+            return entry, "offline"
+        if entry is not None and time.time() - entry["fetched_at"] < self.ttl:
+            return entry, "cached"
+
+        try:
+            fetched, source = await self._fetch(entry, limit)
+        except Exception as e:
+            if entry is None:
+                self.logger.error(f"Failed to fetch cameras: {e}")
+                raise
+            self.logger.warning(f"Failed to refresh cameras ({e}), using the cached inventory")
+            self._fetch_stats.clear()
+            return entry, "stale"
+        if not fetched.get("partial"):
+            _shared[self.url] = fetched
+            self._save(fetched)
+        return fetched, source
+
+    def _page_url(self, offset: int) -> str:
+        if not self.page_size:
+            return self.url
+        return with_query(self.url, **{PAGE_LIMIT_PARAM: self.page_size, PAGE_OFFSET_PARAM: offset})
+
+    async def _fetch(self, entry: Optional[Dict], limit: Optional[int] = None) -> Tuple[Dict, str]:
+        """GET the camera list, filtering it while the bytes arrive
+
+        Conditional when a cached copy exists (unpaged lists only, the
+        validators of one page say nothing about the others).
+        """
+        headers = {}
+        if entry is not None and not self.page_size:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        self.logger.info(f"Fetching cameras from {self.url}")
+        started = time.perf_counter()
+        stats = self._fetch_stats
+        stats.update(pages=0, time_to_first_camera_ms=None, peak_buffer_kb=0.0)
+        cameras: List[Dict] = []
+        total = 0
+        partial = False
+        validators: Dict = {}
+        seen_ids: set = set()  # Camera IDs of earlier pages (paged fetches)
+        page_ids: set = set()
+
+        def keep(elements: List[Dict]) -> None:
+            if self.page_size:
+                ids = [e.get('id') if isinstance(e, dict) else None for e in elements]
+                page_ids.update(camera_id for camera_id in ids if camera_id is not None)
+                elements = [e for e, camera_id in zip(elements, ids) if camera_id is None or camera_id not in seen_ids]
+            active = active_cameras(elements)
+            if active and stats["time_to_first_camera_ms"] is None:
+                stats["time_to_first_camera_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            cameras.extend(active)
+
+        # A large inventory may take longer than a minute; only a stalled read fails
+        async with aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=None, sock_connect=60, sock_read=60)
+        ) as session:
+            while stats["pages"] < MAX_PAGES:
+                parser = JsonArrayParser()
+                async with session.get(self._page_url(total), headers=headers) as response:
+                    if response.status == 304 and entry is not None:
+                        stats["download_seconds"] = round(time.perf_counter() - started, 3)
+                        return dict(entry, fetched_at=time.time()), "revalidated"
+                    if response.status != 200:
+                        raise Exception(f"API returned status {response.status}")
+                    if not self.page_size:
+                        validators = {"etag": response.headers.get("ETag"),
+                                      "last_modified": response.headers.get("Last-Modified")}
+                    async for chunk in response.content.iter_chunked(READ_CHUNK_SIZE):
+                        keep(parser.feed(chunk))
+                        if limit and len(cameras) >= limit and not parser.done:
+                            partial = True  # Leaving the block closes the connection
+                            break
+                    else:
+                        keep(parser.close())
+                stats["pages"] += 1
+                stats["peak_buffer_kb"] = max(stats["peak_buffer_kb"], round(parser.peak_buffer / 1024, 1))
+                total += parser.elements
+                if partial or not self.page_size or parser.elements < self.page_size:
+                    break
+                if limit and len(cameras) >= limit:
+                    partial = True  # Enough cameras; the remaining pages are not fetched
+                    break
+                if parser.elements > self.page_size:
+                    self.logger.warning(f"Camera API ignored the page size ({parser.elements} > {self.page_size}), "
+                                        f"using the first page as the full list")
+                    break
+                if page_ids and page_ids <= seen_ids:
+                    self.logger.warning("Camera API ignored the page offset, stopping at the repeated page")
+                    total -= parser.elements
+                    break
+                seen_ids.update(page_ids)
+                page_ids.clear()
+            else:
+                self.logger.warning(f"Stopped after {MAX_PAGES} camera pages")
+
+        stats["download_seconds"] = round(time.perf_counter() - started, 3)
+        return {
+            "url": self.url,
+            "fetched_at": time.time(),
+            "etag": validators.get("etag"),
+            "last_modified": validators.get("last_modified"),
+            "total": total,
+            "partial": partial,
+            "cameras": cameras
+        }, "fetched"
+
+    def _load(self) -> Optional[Dict]:
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("url") == self.url else None
+
+    def _save(self, entry: Dict) -> None:
+        """Write the cache file atomically, so concurrent testers never read half a file"""
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            temp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            self.logger.warning(f"Could not save camera inventory cache: {e}")
@@ -6,33 +6,65 @@ Camera Stream Load Testing Tool
 Tests concurrent streaming capabilities from camera API endpoints.
 - Fetches cameras with status = 1 from API
 - Opens concurrent fr_url streams (multipart/x-mixed-replace; boundary=frame)
+- Parses multipart part headers and validates JPEG frames (SOI/EOI markers)
+- Fingerprints frames to spot servers resending the same JPEG (unique FPS)
+- Optionally throttles a share of the streams to emulate slow viewers
+- Optionally ramps connections up (linear, fixed rate, stepped) with per-phase metrics
+- Optional open-loop viewer churn (Poisson arrivals, Zipf popularity) with TTFF
 - Monitors performance and connection health
 - Implements automatic reconnection on failures
+- Optionally routes streams through a fault-injection proxy (latency, bandwidth,
+  stalls, resets) to exercise that reconnection logic
 - Generates detailed load testing report
 
 Usage:
     python camera_stream_load_test.py --max-streams 50 --duration 300
+    python camera_stream_load_test.py --max-streams 2000 --duration 300 --workers 8
+    python camera_stream_load_test.py --max-streams 50 --loop uvloop
+    python camera_stream_load_test.py --max-streams 500 --client raw
+    python camera_stream_load_test.py --max-streams 50 --decode-sample 30
+    python camera_stream_load_test.py --max-streams 200 --slow-viewers 0.3 --slow-viewer-rate 128
+    python camera_stream_load_test.py --max-streams 500 --ramp step --ramp-step 100 --ramp-hold 30
+    python camera_stream_load_test.py --max-streams 500 --churn-rate 5 --session-mean 60 --duration 600
+    python camera_stream_load_test.py --max-streams 200 --fault-scenario scenario.json
 """
 
 import asyncio
 import aiohttp
 import time
 import json
-import logging
 import argparse
 import signal
 import sys
 import ssl
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
+from typing import Callable, List, Dict, Optional, Tuple
 import threading
-from dataclasses import dataclass, asdict
-from collections import defaultdict
-import psutil
+from dataclasses import dataclass, asdict, field
 import statistics
 import random
 import os
-from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
+
+from multipart_stream_parser import MultipartFrameParser, parse_multipart_boundary
+from latency_histogram import LatencyHistogram
+from connection_phase_tracer import ConnectionPhaseTracer
+from stall_watchdog import StallWatchdog
+from event_loop_backend import LOOP_BACKENDS, current_loop_backend, loop_backend_from_argv, run_with_loop
+from raw_stream_client import RawStreamClient
+from ramp_scheduler import RAMP_MODES, RampPhaseTracker, RampSchedule
+from viewer_throttle import ThrottleTimer, TokenBucket, assign_viewer_classes
+from frame_sampler import CV2_AVAILABLE, LOW_SHARPNESS, FrameDecodeSampler, frame_decode_summary
+from stream_stats_table import StatsColumn, StatusColumn, StreamStatsTable
+from stream_errors import ErrorLog, StreamEndedError, StreamHTTPError, StreamStalledError, classify_error, error_code_totals
+from stream_timeline import NUMPY_AVAILABLE, StreamTimeline
+from system_sampler import SystemResourceSampler, system_resources_summary
+from tester_logging import camera_event, close_tester_logger, setup_tester_logger, suppressed_log_lines
+from camera_inventory import DEFAULT_TTL, CameraInventory
+from fault_proxy import FaultProxy, fault_proxy_summary, load_scenario, new_fault_stats, route_cameras
+from loop_lag_probe import LAG_THRESHOLD_MS, TESTER_CPU_THRESHOLD, LoopLagProbe, saturation_summary
+from viewer_churn import SESSION_DISTRIBUTIONS, POPULARITY_MODELS, ChurnWorkload, ViewerChurnRunner
+
+CLIENT_TYPES = ("aiohttp", "raw")
 
 @dataclass
 class StreamStats:
@@ -40,36 +72,151 @@ class StreamStats:
     fr_url: str
     start_time: float
     end_time: Optional[float] = None
-    total_frames: int = 0
-    total_bytes: int = 0
-    reconnections: int = 0
-    errors: List[str] = None
-    last_frame_time: float = 0
+    errors: ErrorLog = None  # Error counts per code and the most recent errors
     avg_fps: float = 0
-    status: str = "starting"  # starting, connected, error, disconnected
+    malformed_frames: int = 0
+    frame_bytes: int = 0  # JPEG payload bytes of good frames
+    min_frame_size: int = 0
+    max_frame_size: int = 0
+    repeated_frames: int = 0  # Frames identical to the previous frame
+    repeat_runs: int = 0  # Runs of two or more identical frames
+    longest_repeat_run: int = 0  # Frames in the longest run of identical frames
+    frame_intervals: LatencyHistogram = None  # Frame inter-arrival times
+    last_connection_phases: Dict[str, float] = None  # Phase timings (ms) of the latest attempt
+    stall_count: int = 0
+    stall_seconds: float = 0  # Time without frames during stalls
+    stall_reconnects: int = 0  # Reconnects forced by the stall watchdog
+    decoded_frames: int = 0  # Sampled frames decoded (--decode-sample)
+    decode_dropped: int = 0  # Samples dropped because the decode pool was busy
+    decode_failures: int = 0
+    decode_times: LatencyHistogram = None
+    frame_width: int = 0  # Resolution of the latest decoded sample
+    frame_height: int = 0
+    resolution_changes: int = 0
+    sharpness_total: float = 0  # Sum of Laplacian variances of decoded samples
+    last_sharpness: float = 0
+    session_id: Optional[int] = None  # Viewer session (churn mode); None for a fixed stream
+    first_frame_time: Optional[float] = None
+    viewer: str = "fast"  # fast, or slow (read rate limited)
+    throttled_seconds: float = 0  # Time a slow viewer spent not reading
+    table: Optional[StreamStatsTable] = field(default=None, repr=False, compare=False)
+    
+    # Aggregated every tick, so stored in the columns of the stream's table slot
+    total_frames = StatsColumn()
+    total_bytes = StatsColumn()
+    reconnections = StatsColumn()
+    http_status = StatsColumn()
+    last_frame_time = StatsColumn()
+    status = StatusColumn()  # starting, connecting, connected, stalled, error, disconnected
     
     def __post_init__(self):
         if self.errors is None:
-            self.errors = []
+            self.errors = ErrorLog()
+        if self.frame_intervals is None:
+            self.frame_intervals = LatencyHistogram()
+        if self.last_connection_phases is None:
+            self.last_connection_phases = {}
+        if self.decode_times is None:
+            self.decode_times = LatencyHistogram()
+        if self.table is None:
+            self.table = StreamStatsTable(capacity=1)
+        self.slot = self.table.allocate()
+    
+    def release(self) -> None:
+        """Free the table slot; the values move to a private one-row table"""
+        row = self.table.release(self.slot)
+        self.table = StreamStatsTable(capacity=1)
+        self.slot = self.table.allocate()
+        for name, value in row.items():
+            self.table.columns[name][self.slot] = value
+
+def stream_key(stats) -> object:
+    """Key of a stream in active_streams and the stall watchdog"""
+    return stats.camera_id if stats.session_id is None else f"session-{stats.session_id}"
+
+def record_frame_intervals(stats, frames: int, current_time: float,
+                           prev_frame_time: Optional[float]) -> None:
+    """Record inter-arrival times for frames completed by one chunk"""
+    if prev_frame_time is not None:
+        stats.frame_intervals.record(current_time - prev_frame_time)
+    if frames > 1:
+        # Frames completed by the same chunk arrived together
+        stats.frame_intervals.record(0.0, frames - 1)
+
+def update_frame_stats(stats, parser: MultipartFrameParser) -> None:
+    """Copy frame size and malformed counters from a stream's parser"""
+    stats.malformed_frames = parser.malformed_frames
+    stats.frame_bytes = parser.frame_bytes
+    stats.min_frame_size = parser.min_frame_size
+    stats.max_frame_size = parser.max_frame_size
+    stats.repeated_frames = parser.repeated_frames
+    stats.repeat_runs = parser.repeat_runs
+    stats.longest_repeat_run = parser.longest_repeat_run
+
+def unique_fps(stats) -> float:
+    """Average FPS counting only frames that differ from their predecessor"""
+    if not stats.total_frames:
+        return 0
+    return stats.avg_fps * (stats.total_frames - stats.repeated_frames) / stats.total_frames
 
 class CameraStreamLoadTester:
     def __init__(self, api_url: str = "https://cc.nttagid.com/api/v1/camera/", 
                  max_concurrent: int = 50, test_duration: int = 300,
-                 shuffle_cameras: bool = True, prefix: str = ""):
+                 shuffle_cameras: bool = True, prefix: str = "",
+                 stall_threshold: float = 5.0, stall_reconnect_after: Optional[float] = None,
+                 client: str = "aiohttp", decode_sample_every: int = 0, decode_workers: int = 2,
+                 slow_viewer_fraction: float = 0.0, slow_viewer_rate: float = 128.0,
+                 ramp: Optional[RampSchedule] = None, ramp_shard: Optional[Tuple[int, int, int]] = None,
+                 ramp_origin: Optional[float] = None, churn: Optional[ChurnWorkload] = None,
+                 timeline: bool = True, lag_threshold_ms: float = LAG_THRESHOLD_MS,
+                 tester_cpu_threshold: float = TESTER_CPU_THRESHOLD,
+                 inventory_ttl: float = DEFAULT_TTL, offline: bool = False,
+                 inventory_page_size: int = 0, fault_scenario=None):
         self.api_url = api_url
         self.max_concurrent = max_concurrent
         self.test_duration = test_duration
         self.shuffle_cameras = shuffle_cameras
         self.prefix = prefix or ""
+        self.stall_threshold = stall_threshold
+        self.stall_reconnect_after = stall_reconnect_after
+        self.client = client  # Stream transport: aiohttp or raw (asyncio protocol)
+        self.raw_client: Optional[RawStreamClient] = None
+        self.decode_sample_every = decode_sample_every  # Decode 1-in-N frames per stream, 0 disables
+        self.decode_workers = decode_workers
+        self.frame_sampler: Optional[FrameDecodeSampler] = None
+        self.slow_viewer_fraction = slow_viewer_fraction  # Share of streams read at slow_viewer_rate
+        self.slow_viewer_rate = slow_viewer_rate  # KB/s per slow viewer
+        self.throttle_timer = ThrottleTimer()
+        if isinstance(ramp, dict):
+            ramp = RampSchedule(**ramp)  # Shipped to a worker or agent as a dict
+        self.ramp = ramp or RampSchedule()
+        self.ramp_shard = tuple(ramp_shard) if ramp_shard else None  # (index, shards, total) of a sharded run
+        self.ramp_origin = ramp_origin  # Shared schedule start (epoch) when the parent tracks the phases
+        self.ramp_tracker = RampPhaseTracker(self, self.ramp)
+        if isinstance(churn, dict):
+            churn = ChurnWorkload(**churn)
+        self.churn = churn  # Open-loop viewer sessions instead of one stream per camera
+        self.churn_runner: Optional[ViewerChurnRunner] = None
+        self.timeline_enabled = timeline  # Per-second buckets per stream (off in shard workers)
+        self.timeline: Optional[StreamTimeline] = None
+        self.loop_lag = LoopLagProbe()  # Our own event loop falling behind, not the server
+        self.lag_threshold_ms = lag_threshold_ms
+        self.tester_cpu_threshold = tester_cpu_threshold
+        # Scenario file or dict; loaded here so workers and agents get the dict
+        self.fault_scenario = load_scenario(fault_scenario) if fault_scenario else None
+        self.fault_proxy: Optional[FaultProxy] = None
+        self.fault_stats = new_fault_stats() if self.fault_scenario else None  # Live or merged counters
         
         # Test state
         self.active_streams: Dict[int, StreamStats] = {}
+        self.stats_table = StreamStatsTable(max(self.max_concurrent, 1))  # Columns behind active_streams
         self.stream_tasks: Dict[int, asyncio.Task] = {}
         self.start_time = 0
         self.should_stop = False
         
         # Statistics
         self.system_stats = []
+        self.phase_tracer = ConnectionPhaseTracer()
         self.global_stats = {
             'total_streams_attempted': 0,
             'max_concurrent_achieved': 0,
@@ -81,35 +228,21 @@ class CameraStreamLoadTester:
         
         # Setup logging with unique logger name (saved under logs/)
         os.makedirs('logs', exist_ok=True)
-        self.log_filename = os.path.join('logs', f'camera_load_test_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log')
-        
-        # Create logger
-        self.logger = logging.getLogger(f"CameraLoadTester_{id(self)}")
-        self.logger.setLevel(logging.INFO)
+        # Shard workers and agents start in the same second as their parent: one file each
+        shard = f'_shard{self.ramp_shard[0]}' if self.ramp_shard else ''
+        self.log_filename = os.path.join('logs', f'camera_load_test_{datetime.now().strftime("%Y%m%d_%H%M%S")}{shard}.log')
         
-        # Clear any existing handlers
-        self.logger.handlers.clear()
+        # Console and file handlers run on a background thread (tester_logging.py)
+        self.logger = setup_tester_logger(f"CameraLoadTester_{id(self)}", self.log_filename)
+        self.inventory = CameraInventory(self.api_url, self.prefix, ttl=inventory_ttl, offline=offline,
+                                         page_size=inventory_page_size, logger=self.logger)
         
-        # Console handler
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
-        console_format = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        console_handler.setFormatter(console_format)
-        self.logger.addHandler(console_handler)
-        
-        # File handler
-        try:
-            file_handler = logging.FileHandler(self.log_filename)
-            file_handler.setLevel(logging.INFO)
-            file_format = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-            file_handler.setFormatter(file_format)
-            self.logger.addHandler(file_handler)
-            self.logger.info(f"Logging to file: {self.log_filename}")
-        except Exception as e:
-            print(f"Warning: Could not create log file {self.log_filename}: {e}")
-        
-        # Prevent propagation to root logger
-        self.logger.propagate = False
+        # Single watchdog for frozen streams
+        self.stall_watchdog = StallWatchdog(
+            stall_threshold=stall_threshold,
+            reconnect_after=stall_reconnect_after,
+            logger=self.logger
+        )
         
         # Handle graceful shutdown
         signal.signal(signal.SIGINT, self._signal_handler)
@@ -121,129 +254,80 @@ class CameraStreamLoadTester:
         self.should_stop = True
     
     async def get_active_cameras(self) -> List[Dict]:
-        """Fetch cameras with status = 1 from the API"""
-        # Build API URL with optional prefix query param
-        url = self.api_url
-        try:
-            parsed = urlparse(self.api_url)
-            query_params = dict(parse_qsl(parsed.query, keep_blank_values=True))
-            if self.prefix != "":
-                query_params["prefix"] = self.prefix
-            new_query = urlencode(query_params)
-            url = urlunparse(parsed._replace(query=new_query))
-        except Exception:
-            url = self.api_url  # Fallback to original on parse error
+        """Cameras with status = 1, from the shared inventory cache (camera_inventory.py)
 
-        self.logger.info(f"Fetching cameras from {url}")
-        
-        async with aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=60)
-        ) as session:
-            try:
-                async with session.get(url) as response:
-                    if response.status != 200:
-                        raise Exception(f"API returned status {response.status}")
-                    
-                    cameras = await response.json()
-                    active_cameras = [cam for cam in cameras if cam.get('status') == 1 and cam.get('fr_url')]
-                    
-                    self.logger.info(f"Found {len(active_cameras)} active cameras out of {len(cameras)} total")
-                    return active_cameras
-                    
-            except Exception as e:
-                self.logger.error(f"Failed to fetch cameras: {e}")
-                raise
+        Without shuffling only the first max concurrent cameras are tested, so
+        a download stops once they are in and the test starts right away.
+        """
+        limit = self.max_concurrent if not self.shuffle_cameras and self.churn is None else None
+        return await self.inventory.get_active_cameras(limit)
     
-    async def stream_camera(self, camera: Dict, session: aiohttp.ClientSession) -> None:
+    async def stream_camera(self, camera: Dict, session: aiohttp.ClientSession, viewer: str = "fast",
+                            session_id: Optional[int] = None) -> None:
         """Stream from a single camera with reconnection logic"""
         camera_id = camera['id']
         fr_url = camera['fr_url']
         
-        stats = StreamStats(camera_id=camera_id, fr_url=fr_url, start_time=time.time())
-        self.active_streams[camera_id] = stats
+        stats = StreamStats(camera_id=camera_id, fr_url=fr_url, start_time=time.time(), viewer=viewer,
+                            session_id=session_id, table=self.stats_table)
+        key = stream_key(stats)
+        self.active_streams[key] = stats
+        bucket = TokenBucket(self.slow_viewer_rate * 1024, self.throttle_timer) if viewer == "slow" else None
         
         reconnect_delay = 1.0
         max_reconnect_delay = 30.0
+        parser = MultipartFrameParser()
+        if self.frame_sampler is not None:
+            self.frame_sampler.attach(parser, stats)
         
         while not self.should_stop:
+            attempt = self.phase_tracer.new_attempt()
             try:
                 stats.status = "connecting"
-                self.logger.info(f"Camera {camera_id}: Connecting to {fr_url}")
+                self.logger.info(f"Camera {camera_id}: Connecting to {fr_url}", extra=camera_event(camera_id, "connect"))
                 
-                async with session.get(
-                    fr_url,
-                    headers={'Accept': 'multipart/x-mixed-replace; boundary=frame'},
-                    timeout=aiohttp.ClientTimeout(total=None, sock_read=60)
-                ) as response:
-                    
-                    if response.status != 200:
-                        raise Exception(f"HTTP {response.status}: {response.reason}")
-                    
-                    content_type = response.headers.get('content-type', '')
-                    if 'multipart/x-mixed-replace' not in content_type:
-                        self.logger.warning(f"Camera {camera_id}: Unexpected content-type: {content_type}")
-                    
-                    stats.status = "connected"
-                    stats.last_frame_time = time.time()
-                    reconnect_delay = 1.0  # Reset delay on successful connection
-                    
-                    # Read multipart stream
-                    buffer = b''
-                    frame_start_marker = b'--frame'
-                    
-                    async for chunk in response.content.iter_chunked(8192):
-                        if self.should_stop:
-                            break
-                            
-                        buffer += chunk
-                        stats.total_bytes += len(chunk)
-                        
-                        # Look for frame boundaries
-                        while frame_start_marker in buffer:
-                            frame_pos = buffer.find(frame_start_marker)
-                            if frame_pos > 0:
-                                # Found a complete frame
-                                stats.total_frames += 1
-                                current_time = time.time()
-                                
-                                # Calculate FPS
-                                if stats.total_frames > 1:
-                                    elapsed = current_time - stats.start_time
-                                    stats.avg_fps = stats.total_frames / elapsed
-                                
-                                stats.last_frame_time = current_time
-                            
-                            # Move past the frame marker
-                            next_pos = frame_pos + len(frame_start_marker)
-                            buffer = buffer[next_pos:]
-                        
-                        # Keep buffer manageable
-                        if len(buffer) > 1024 * 1024:  # 1MB limit
-                            buffer = buffer[-512*1024:]  # Keep last 512KB
-                    
-                    # If we reach here, stream ended normally
+                if self.client == "raw":
+                    await self._stream_raw(stats, parser, attempt, bucket)
+                else:
+                    await self._stream_aiohttp(stats, session, parser, attempt, bucket)
+                
+                if stats.status == "stalled" and not self.should_stop:
+                    # Response closed by the stall watchdog
+                    raise StreamStalledError(f"Stalled for {time.time() - stats.last_frame_time:.1f}s, forcing reconnect")
+                
+                if self.should_stop:
                     break
+                
+                # A camera stream has no natural end: a close (or a reset that
+                # reads as EOF on a close-delimited body) is a failure to retry
+                raise StreamEndedError("Server closed the stream")
                     
             except asyncio.CancelledError:
                 self.logger.info(f"Camera {camera_id}: Stream cancelled")
                 break
                 
             except (aiohttp.ClientConnectionError, aiohttp.ClientSSLError, 
-                    aiohttp.ServerDisconnectedError) as e:
+                    aiohttp.ServerDisconnectedError, ConnectionError, ssl.SSLError) as e:
                 # Handle connection-specific errors more gracefully
                 error_msg = f"Connection error: {str(e)}"
-                stats.errors.append(error_msg)
+                error_code = "stall" if stats.status == "stalled" else classify_error(e)
+                stats.errors.record(error_code, error_msg)
+                self.stall_watchdog.settle(stats, time.time())
                 stats.status = "error"
                 self.global_stats['total_errors'] += 1
                 
-                self.logger.warning(f"Camera {camera_id}: {error_msg}")
+                self.logger.warning(f"Camera {camera_id}: [{error_code}] {error_msg}",
+                                    extra=camera_event(camera_id, "error"))
                 
                 if not self.should_stop:
                     # Implement exponential backoff for reconnection
+                    if attempt.get('connected'):
+                        reconnect_delay = 1.0  # Reset delay after a successful connection
                     stats.reconnections += 1
                     self.global_stats['total_reconnections'] += 1
                     
-                    self.logger.info(f"Camera {camera_id}: Reconnecting in {reconnect_delay}s (attempt #{stats.reconnections})")
+                    self.logger.info(f"Camera {camera_id}: Reconnecting in {reconnect_delay}s (attempt #{stats.reconnections})",
+                                     extra=camera_event(camera_id, "reconnect"))
                     
                     # Wait for reconnection delay but check for cancellation
                     try:
@@ -258,18 +342,24 @@ class CameraStreamLoadTester:
                     
             except Exception as e:
                 error_msg = f"Stream error: {str(e)}"
-                stats.errors.append(error_msg)
+                error_code = "stall" if stats.status == "stalled" else classify_error(e)
+                stats.errors.record(error_code, error_msg)
+                self.stall_watchdog.settle(stats, time.time())
                 stats.status = "error"
                 self.global_stats['total_errors'] += 1
                 
-                self.logger.warning(f"Camera {camera_id}: {error_msg}")
+                self.logger.warning(f"Camera {camera_id}: [{error_code}] {error_msg}",
+                                    extra=camera_event(camera_id, "error"))
                 
                 if not self.should_stop:
                     # Implement exponential backoff for reconnection
+                    if attempt.get('connected'):
+                        reconnect_delay = 1.0  # Reset delay after a successful connection
                     stats.reconnections += 1
                     self.global_stats['total_reconnections'] += 1
                     
-                    self.logger.info(f"Camera {camera_id}: Reconnecting in {reconnect_delay}s (attempt #{stats.reconnections})")
+                    self.logger.info(f"Camera {camera_id}: Reconnecting in {reconnect_delay}s (attempt #{stats.reconnections})",
+                                     extra=camera_event(camera_id, "reconnect"))
                     
                     # Wait for reconnection delay but check for cancellation
                     try:
@@ -283,56 +373,186 @@ class CameraStreamLoadTester:
                     break
         
         # Clean up
+        update_frame_stats(stats, parser)
+        self.stall_watchdog.settle(stats, time.time())
+        self.stall_watchdog.unwatch(key)
         stats.status = "disconnected"
         stats.end_time = time.time()
         self.logger.info(f"Camera {camera_id}: Stream ended. Frames: {stats.total_frames}, Reconnections: {stats.reconnections}")
     
-    async def monitor_system_resources(self):
-        """Monitor system resources during the test"""
-        while not self.should_stop:
-            try:
-                cpu_percent = psutil.cpu_percent(interval=1)
-                memory = psutil.virtual_memory()
-                network = psutil.net_io_counters()
-                
-                # Count active connections
-                active_count = len([s for s in self.active_streams.values() if s.status == "connected"])
+    async def _stream_aiohttp(self, stats: StreamStats, session: aiohttp.ClientSession,
+                              parser: MultipartFrameParser, attempt: Dict,
+                              bucket: Optional[TokenBucket] = None) -> None:
+        """One connection through aiohttp; a bucket limits the read rate (slow viewer)"""
+        async with session.get(
+            stats.fr_url,
+            headers={'Accept': 'multipart/x-mixed-replace; boundary=frame'},
+            timeout=aiohttp.ClientTimeout(total=None, sock_read=60),
+            trace_request_ctx=attempt
+        ) as response:
+            
+            stats.http_status = response.status
+            if response.status != 200:
+                raise StreamHTTPError(response.status, response.reason)
+            
+            content_type = response.headers.get('content-type', '')
+            self._stream_connected(stats, content_type, attempt, response.close)
+            
+            # Read multipart stream using the boundary announced by the server
+            parser.reset(parse_multipart_boundary(content_type))
+            prev_frame_time = None
+            bytes_column, slot = stats.table.columns["total_bytes"], stats.slot
+            
+            async for chunk in response.content.iter_chunked(8192):
+                if self.should_stop:
+                    break
+                    
+                bytes_column[slot] += len(chunk)
                 
-                system_stat = {
-                    'timestamp': time.time(),
-                    'cpu_percent': cpu_percent,
-                    'memory_percent': memory.percent,
-                    'memory_used_gb': memory.used / (1024**3),
-                    'network_bytes_sent': network.bytes_sent,
-                    'network_bytes_recv': network.bytes_recv,
-                    'active_streams': active_count,
-                    'total_frames': sum(s.total_frames for s in self.active_streams.values()),
-                    'total_bytes': sum(s.total_bytes for s in self.active_streams.values())
-                }
+                # Parse part headers and validate JPEG frames
+                frames = parser.feed(chunk)
+                if frames:
+                    prev_frame_time = self._record_frames(stats, frames, attempt, prev_frame_time)
                 
-                self.system_stats.append(system_stat)
-                self.global_stats['max_concurrent_achieved'] = max(
-                    self.global_stats['max_concurrent_achieved'], 
-                    active_count
-                )
+                if frames or parser.malformed_frames != stats.malformed_frames:
+                    update_frame_stats(stats, parser)
                 
-                # Log progress every 30 seconds
-                if len(self.system_stats) % 30 == 0:
-                    elapsed = time.time() - self.start_time
-                    total_frames = sum(s.total_frames for s in self.active_streams.values())
-                    avg_fps = total_frames / elapsed if elapsed > 0 else 0
+                if bucket is not None and not bucket.consume(len(chunk)):
+                    # Stop reading until the shared timer refills the bucket
+                    await bucket.wait()
+                    stats.throttled_seconds = bucket.throttled_seconds
+    
+    async def _stream_raw(self, stats: StreamStats, parser: MultipartFrameParser, attempt: Dict,
+                          bucket: Optional[TokenBucket] = None) -> None:
+        """One connection through the raw protocol client (--client raw)"""
+        prev_frame_time = None
+        protocol = None
+        bytes_column, slot = stats.table.columns["total_bytes"], stats.slot
+        
+        def resume() -> None:
+            stats.throttled_seconds = bucket.throttled_seconds
+            protocol.resume_reading()
+        
+        def on_chunk(body_bytes: int, frames: int) -> None:
+            nonlocal prev_frame_time
+            bytes_column[slot] += body_bytes
+            if frames:
+                prev_frame_time = self._record_frames(stats, frames, attempt, prev_frame_time)
+            if frames or parser.malformed_frames != stats.malformed_frames:
+                update_frame_stats(stats, parser)
+            if bucket is not None and protocol is not None and not bucket.consume(body_bytes):
+                protocol.pause_reading()
+                bucket.wait_then(resume)
+        
+        protocol = await self.raw_client.open(stats.fr_url, parser, on_chunk, attempt)
+        try:
+            stats.http_status = protocol.status
+            if protocol.status != 200:
+                raise StreamHTTPError(protocol.status, protocol.reason)
+            
+            self._stream_connected(stats, protocol.headers.get('content-type', ''), attempt, protocol.close)
+            
+            error = await protocol.wait_closed()
+            if error is not None and not self.should_stop:
+                raise error
+        finally:
+            if bucket is not None:
+                bucket.cancel()
+            protocol.close()
+    
+    def _stream_connected(self, stats: StreamStats, content_type: str, attempt: Dict,
+                          close: Callable[[], None]) -> None:
+        """Common bookkeeping once response headers were accepted"""
+        if 'multipart/x-mixed-replace' not in content_type:
+            self.logger.warning(f"Camera {stats.camera_id}: Unexpected content-type: {content_type}",
+                                extra=camera_event(stats.camera_id, "content_type"))
+        
+        stats.status = "connected"
+        stats.last_frame_time = time.time()
+        attempt['connected'] = True
+        self.stall_watchdog.watch(
+            stream_key(stats), stats,
+            on_reconnect=lambda: self._force_stall_reconnect(stats, close)
+        )
+    
+    def _record_frames(self, stats: StreamStats, frames: int, attempt: Dict,
+                       prev_frame_time: Optional[float]) -> float:
+        """Update stream stats for frames completed by one read; returns the frame time"""
+        stats.total_frames += frames
+        current_time = time.time()
+        if stats.status == "stalled":
+            self.stall_watchdog.settle(stats, current_time)
+        record_frame_intervals(stats, frames, current_time, prev_frame_time)
+        if prev_frame_time is None:
+            if stats.first_frame_time is None:
+                stats.first_frame_time = current_time
+            self.phase_tracer.record_first_frame(attempt)
+            stats.last_connection_phases = self.phase_tracer.attempt_summary_ms(attempt)
+        
+        # Calculate FPS
+        if stats.total_frames > 1:
+            elapsed = current_time - stats.start_time
+            stats.avg_fps = stats.total_frames / elapsed
+        
+        stats.last_frame_time = current_time
+        return current_time
+    
+    def _force_stall_reconnect(self, stats: StreamStats, close: Callable[[], None]) -> None:
+        """Stall watchdog callback: drop a frozen connection so it reconnects"""
+        stats.stall_reconnects += 1
+        close()
+    
+    async def monitor_system_resources(self):
+        """Monitor system resources during the test
+        
+        psutil runs on a sampler thread; this coroutine only drains its
+        samples and adds the stream counts, so it never blocks the loop.
+        The loop lag probe runs alongside for as long as the monitor does.
+        """
+        sampler = SystemResourceSampler(interval=1.0)
+        sampler.start()
+        lag_task = asyncio.create_task(self.loop_lag.run())
+        try:
+            while not self.should_stop:
+                await asyncio.sleep(1)
+                try:
+                    # Count active connections (vectorized over the stats table)
+                    active_count = self.stats_table.count_status("connected")
+                    totals = self.stats_table.totals()
                     
-                    self.logger.info(
-                        f"Progress: {elapsed:.0f}s | Active: {active_count}/{self.max_concurrent} | "
-                        f"CPU: {cpu_percent:.1f}% | RAM: {memory.percent:.1f}% | "
-                        f"Total Frames: {total_frames} | Avg FPS: {avg_fps:.1f}"
+                    for system_stat in sampler.drain():
+                        system_stat.update({
+                            'active_streams': active_count,
+                            'total_frames': totals['total_frames'],
+                            'total_bytes': totals['total_bytes']
+                        })
+                        self.system_stats.append(system_stat)
+                        
+                        # Log progress every 30 seconds
+                        if len(self.system_stats) % 30 == 0:
+                            elapsed = time.time() - self.start_time
+                            total_frames = totals['total_frames']
+                            avg_fps = total_frames / elapsed if elapsed > 0 else 0
+                            
+                            self.logger.info(
+                                f"Progress: {elapsed:.0f}s | Active: {active_count}/{self.max_concurrent} | "
+                                f"CPU: {system_stat['cpu_percent']:.1f}% | "
+                                f"Tester CPU: {system_stat['tester_cpu_percent']:.1f}% | "
+                                f"RAM: {system_stat['memory_percent']:.1f}% | "
+                                f"Total Frames: {total_frames} | Avg FPS: {avg_fps:.1f}"
+                            )
+                    
+                    self.global_stats['max_concurrent_achieved'] = max(
+                        self.global_stats['max_concurrent_achieved'], 
+                        active_count
                     )
-                
-                await asyncio.sleep(1)
-                
-            except Exception as e:
-                self.logger.error(f"Error monitoring system: {e}")
-                await asyncio.sleep(5)
+                    
+                except Exception as e:
+                    self.logger.error(f"Error monitoring system: {e}")
+                    await asyncio.sleep(5)
+        finally:
+            lag_task.cancel()
+            sampler.stop()
     
     def _exception_handler(self, loop, context):
         """Handle unhandled asyncio exceptions to prevent spam logs"""
@@ -343,8 +563,39 @@ class CameraStreamLoadTester:
         # Log other exceptions normally
         self.logger.warning(f"Unhandled asyncio exception: {context}")
 
-    async def run_load_test(self) -> Dict:
-        """Run the main load test"""
+    def select_test_cameras(self, cameras: List[Dict]) -> List[Dict]:
+        """Shuffle (if enabled) and limit the camera list to max concurrent
+
+        With churn every camera is kept: max concurrent caps sessions instead,
+        and the (shuffled) order is the popularity rank.
+        """
+        # Optionally shuffle before selecting test set
+        if self.shuffle_cameras:
+            try:
+                random.shuffle(cameras)
+                self.logger.info("Camera list shuffled before selection")
+            except Exception as e:
+                self.logger.warning(f"Could not shuffle cameras: {e}")
+
+        if self.churn is not None:
+            return cameras
+        # Limit cameras to max concurrent (after shuffle if enabled)
+        return cameras[:self.max_concurrent]
+    
+    async def run_load_test(self, cameras: Optional[List[Dict]] = None) -> Dict:
+        """Run the main load test
+        
+        Args:
+            cameras: Preassigned cameras to stream (e.g. one worker's shard);
+                     fetched from the API and selected when not given
+        """
+        try:
+            return await self._run_load_test(cameras)
+        finally:
+            # Stop the log thread and close the log file, even on early returns
+            close_tester_logger(self.logger)
+
+    async def _run_load_test(self, cameras: Optional[List[Dict]]) -> Dict:
         # Set exception handler for current event loop
         loop = asyncio.get_running_loop()
         loop.set_exception_handler(self._exception_handler)
@@ -353,32 +604,37 @@ class CameraStreamLoadTester:
         self.logger.info(f"Max concurrent streams: {self.max_concurrent}")
         self.logger.info(f"Test duration: {self.test_duration} seconds")
         
-        # Get active cameras
-        try:
-            cameras = await self.get_active_cameras()
-        except Exception as e:
-            self.logger.error(f"Failed to get cameras: {e}")
-            return {"error": str(e)}
-        
-        if not cameras:
-            self.logger.error("No active cameras found")
-            return {"error": "No active cameras found"}
-        
-        # Optionally shuffle before selecting test set
-        if self.shuffle_cameras:
+        if cameras is None:
+            # Get active cameras
             try:
-                random.shuffle(cameras)
-                self.logger.info("Camera list shuffled before selection")
+                cameras = await self.get_active_cameras()
             except Exception as e:
-                self.logger.warning(f"Could not shuffle cameras: {e}")
-
-        # Limit cameras to max concurrent (after shuffle if enabled)
-        test_cameras = cameras[:self.max_concurrent]
+                self.logger.error(f"Failed to get cameras: {e}")
+                return {"error": str(e)}
+            
+            if not cameras:
+                self.logger.error("No active cameras found")
+                return {"error": "No active cameras found"}
+            
+            test_cameras = self.select_test_cameras(cameras)
+        else:
+            test_cameras = cameras
         self.logger.info(f"Testing with {len(test_cameras)} cameras")
         
         self.start_time = time.time()
         self.global_stats['total_streams_attempted'] = len(test_cameras)
         
+        if self.fault_scenario is not None:
+            # Every camera gets its own proxy listener; rule windows count from the test start
+            try:
+                self.fault_proxy, test_cameras = route_cameras(test_cameras, self.fault_scenario,
+                                                               origin=self.ramp_origin or self.start_time)
+            except (OSError, ValueError) as e:
+                self.logger.error(f"Failed to start the fault proxy: {e}")
+                return {"error": f"Fault proxy: {e}"}
+            self.fault_stats = self.fault_proxy.stats
+            self.logger.info(f"Fault proxy: {len(self.fault_proxy.rules)} rules on {len(test_cameras)} listeners")
+        
         # Create SSL context that handles connection errors gracefully
         ssl_context = ssl.create_default_context()
         ssl_context.check_hostname = False
@@ -397,38 +653,62 @@ class CameraStreamLoadTester:
         
         session = aiohttp.ClientSession(
             connector=connector,
-            timeout=aiohttp.ClientTimeout(total=None)
+            timeout=aiohttp.ClientTimeout(total=None),
+            trace_configs=[self.phase_tracer.trace_config]
         )
+        if self.client == "raw":
+            self.raw_client = RawStreamClient(ssl_context, self.phase_tracer)
+        if self.decode_sample_every:
+            if CV2_AVAILABLE:
+                self.frame_sampler = FrameDecodeSampler(self.decode_sample_every, self.decode_workers)
+            else:
+                self.logger.warning("OpenCV is not installed (pip install opencv-python), frame decode sampling disabled")
         
         try:
             # Start system monitoring
             monitor_task = asyncio.create_task(self.monitor_system_resources())
+            watchdog_task = asyncio.create_task(self.stall_watchdog.run())
+            throttle_task = asyncio.create_task(self.throttle_timer.run())
+            timeline_task = self.start_timeline()
             
-            # Start streaming tasks
-            for camera in test_cameras:
-                camera_id = camera['id']
-                task = asyncio.create_task(self.stream_camera(camera, session))
-                self.stream_tasks[camera_id] = task
-            
-            self.logger.info(f"Started {len(self.stream_tasks)} streaming tasks")
+            if self.churn is not None:
+                # Viewer sessions arrive and leave on their own schedule
+                self.churn_runner = ViewerChurnRunner(self, test_cameras, self.churn)
+                launch_task = asyncio.create_task(self.churn_runner.run(session))
+            else:
+                # Start streaming tasks on the ramp schedule
+                launch_task = asyncio.create_task(self.launch_streams(test_cameras, session))
+            # A shard's phases are tracked by the process that merges all shards
+            ramp_count = 0 if self.ramp_shard else len(test_cameras)
+            ramp_task = asyncio.create_task(self.ramp_tracker.run(self.start_time, ramp_count))
             
             # Wait for test duration or interruption
             end_time = self.start_time + self.test_duration
             while time.time() < end_time and not self.should_stop:
                 await asyncio.sleep(1)
             
+            self.ramp_tracker.finish()  # Before streams start disconnecting
             self.logger.info("Test duration completed or interrupted, stopping streams...")
             self.should_stop = True
             
             # Cancel all tasks gracefully
             self.logger.info("Cancelling tasks...")
+            launch_task.cancel()
+            ramp_task.cancel()
+            if timeline_task is not None:
+                timeline_task.cancel()
+            await asyncio.gather(launch_task, ramp_task, *filter(None, [timeline_task]), return_exceptions=True)
+            if self.churn_runner is not None:
+                self.global_stats['total_streams_attempted'] = self.churn_runner.sessions_started
             monitor_task.cancel()
+            watchdog_task.cancel()
+            throttle_task.cancel()
             for task in self.stream_tasks.values():
                 if not task.done():
                     task.cancel()
             
             # Wait for tasks to complete with proper exception handling
-            all_tasks = list(self.stream_tasks.values()) + [monitor_task]
+            all_tasks = list(self.stream_tasks.values()) + [monitor_task, watchdog_task, throttle_task]
             if all_tasks:
                 results = await asyncio.gather(*all_tasks, return_exceptions=True)
                 # Log any unexpected exceptions (not CancelledError)
@@ -447,39 +727,95 @@ class CameraStreamLoadTester:
                     await asyncio.sleep(0.1)
             except Exception as e:
                 self.logger.warning(f"Warning during session cleanup: {e}")
+            if self.frame_sampler is not None:
+                self.frame_sampler.close()
+            if self.fault_proxy is not None:
+                self.fault_proxy.stop_thread()
         
         # Generate final report
         return self.generate_report()
     
+    def start_timeline(self) -> Optional[asyncio.Task]:
+        """Start per-second bucketing of the stats table (after start_time is set)"""
+        if not self.timeline_enabled:
+            return None
+        if not NUMPY_AVAILABLE:
+            self.logger.warning("NumPy is not installed (pip install numpy), per-second timeline disabled")
+            return None
+        self.timeline = StreamTimeline(self.stats_table, int(self.test_duration) + 30)
+        return asyncio.create_task(self.timeline.run(self.start_time))
+    
+    def saturation_report(self) -> Dict:
+        """Loop lag and tester CPU over the test duration (teardown excluded)"""
+        return saturation_summary(
+            self.loop_lag, self.system_stats, self.start_time,
+            lag_threshold_ms=self.lag_threshold_ms, cpu_threshold=self.tester_cpu_threshold,
+            end_time=min(time.time(), self.start_time + self.test_duration)
+        )
+    
+    def timeline_report(self) -> Optional[Dict]:
+        """Global per-second timelines; the per-stream buckets go to an .npz artifact"""
+        if self.timeline is None or not self.timeline.ticks:
+            return None
+        summary = self.timeline.summary(self.active_streams, find_degraded=self.churn is None)
+        os.makedirs('reports', exist_ok=True)
+        stamp = datetime.fromtimestamp(self.start_time).strftime("%Y%m%d_%H%M%S")
+        try:
+            summary["artifact"] = self.timeline.save(
+                os.path.join('reports', f"stream_timeline_{stamp}.npz"), self.active_streams)
+        except Exception as e:
+            self.logger.warning(f"Could not save stream timeline: {e}")
+            summary["artifact"] = None
+        return summary
+    
+    async def launch_streams(self, cameras: List[Dict], session: aiohttp.ClientSession) -> None:
+        """Create the streaming tasks at the offsets given by the ramp schedule"""
+        viewers = assign_viewer_classes(len(cameras), self.slow_viewer_fraction)
+        offsets = self.ramp.start_offsets(len(cameras), self.ramp_shard)
+        origin = self.ramp_origin or self.start_time
+        if self.ramp.mode != "none":
+            self.logger.info(f"Ramping up {len(cameras)} streams ({self.ramp.mode}) over {offsets[-1]:.1f}s")
+        
+        for camera, viewer, offset in zip(cameras, viewers, offsets):
+            delay = origin + offset - time.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if self.should_stop:
+                break
+            task = asyncio.create_task(self.stream_camera(camera, session, viewer))
+            self.stream_tasks[camera['id']] = task
+        
+        self.logger.info(f"Started {len(self.stream_tasks)} streaming tasks")
+    
     def generate_report(self) -> Dict:
         """Generate comprehensive test report"""
         end_time = time.time()
         total_duration = end_time - self.start_time
         
         # Aggregate statistics
-        total_frames = sum(s.total_frames for s in self.active_streams.values())
-        total_bytes = sum(s.total_bytes for s in self.active_streams.values())
-        total_reconnections = sum(s.reconnections for s in self.active_streams.values())
+        totals = self.stats_table.totals()
+        total_frames = totals['total_frames']
+        total_bytes = totals['total_bytes']
+        total_reconnections = totals['reconnections']
+        total_malformed = sum(s.malformed_frames for s in self.active_streams.values())
+        total_frame_bytes = sum(s.frame_bytes for s in self.active_streams.values())
+        total_repeated = sum(s.repeated_frames for s in self.active_streams.values())
+        frame_intervals = LatencyHistogram.merged(s.frame_intervals for s in self.active_streams.values())
+        total_stall_seconds = sum(s.stall_seconds for s in self.active_streams.values())
+        streams_stalled = sum(1 for s in self.active_streams.values() if s.stall_count)
         
         # Calculate FPS statistics
         fps_values = [s.avg_fps for s in self.active_streams.values() if s.avg_fps > 0]
         avg_fps = statistics.mean(fps_values) if fps_values else 0
         median_fps = statistics.median(fps_values) if fps_values else 0
+        unique_fps_values = [unique_fps(s) for s in self.active_streams.values() if s.avg_fps > 0]
+        avg_unique_fps = statistics.mean(unique_fps_values) if unique_fps_values else 0
         
         # Stream status breakdown
-        status_counts = defaultdict(int)
-        for stream in self.active_streams.values():
-            status_counts[stream.status] += 1
+        status_counts = self.stats_table.status_counts()
         
         # System resource analysis
-        if self.system_stats:
-            avg_cpu = statistics.mean([s['cpu_percent'] for s in self.system_stats])
-            max_cpu = max([s['cpu_percent'] for s in self.system_stats])
-            avg_memory = statistics.mean([s['memory_percent'] for s in self.system_stats])
-            max_memory = max([s['memory_percent'] for s in self.system_stats])
-            max_concurrent = max([s['active_streams'] for s in self.system_stats])
-        else:
-            avg_cpu = max_cpu = avg_memory = max_memory = max_concurrent = 0
+        max_concurrent = max((s['active_streams'] for s in self.system_stats), default=0)
         
         report = {
             "test_info": {
@@ -487,25 +823,46 @@ class CameraStreamLoadTester:
                 "end_time": datetime.fromtimestamp(end_time).isoformat(),
                 "duration_seconds": round(total_duration, 2),
                 "max_concurrent_target": self.max_concurrent,
-                "max_concurrent_achieved": max_concurrent
+                "max_concurrent_achieved": max_concurrent,
+                "event_loop": current_loop_backend(),
+                "client": self.client,
+                "suppressed_log_lines": suppressed_log_lines(self.logger),
+                "camera_inventory": self.inventory.stats
             },
             "stream_performance": {
                 "total_streams_attempted": len(self.active_streams),
                 "total_frames_received": total_frames,
                 "total_bytes_received": total_bytes,
                 "total_reconnections": total_reconnections,
+                "total_malformed_frames": total_malformed,
+                "average_frame_size_bytes": round(total_frame_bytes / total_frames) if total_frames else 0,
                 "average_fps": round(avg_fps, 2),
                 "median_fps": round(median_fps, 2),
+                "average_unique_fps": round(avg_unique_fps, 2),
+                "total_repeated_frames": total_repeated,
+                "streams_with_repeated_frames": sum(1 for s in self.active_streams.values() if s.repeated_frames),
                 "bytes_per_second": round(total_bytes / total_duration, 2) if total_duration > 0 else 0,
-                "frames_per_second_global": round(total_frames / total_duration, 2) if total_duration > 0 else 0
+                "frames_per_second_global": round(total_frames / total_duration, 2) if total_duration > 0 else 0,
+                "frame_interval_ms": frame_intervals.summary_ms(),
+                "streams_stalled": streams_stalled,
+                "total_stall_seconds": round(total_stall_seconds, 2),
+                "stall_forced_reconnects": self.stall_watchdog.forced_reconnects,
+                "total_errors": sum(len(s.errors) for s in self.active_streams.values()),
+                "error_codes": error_code_totals(s.errors for s in self.active_streams.values())
             },
             "stream_status": dict(status_counts),
-            "system_resources": {
-                "average_cpu_percent": round(avg_cpu, 2),
-                "peak_cpu_percent": round(max_cpu, 2),
-                "average_memory_percent": round(avg_memory, 2),
-                "peak_memory_percent": round(max_memory, 2)
-            },
+            "ramp": self.ramp_tracker.summary(),
+            "churn": self.churn_runner.summary() if self.churn_runner is not None else None,
+            "timeline": self.timeline_report(),
+            "viewer_classes": self.viewer_class_summary(total_duration) if self.slow_viewer_fraction > 0 else None,
+            "frame_decode": frame_decode_summary(
+                self.active_streams.values(), self.decode_sample_every, self.decode_workers
+            ) if self.decode_sample_every and CV2_AVAILABLE else None,
+            "connection_phases": self.phase_tracer.summary(),
+            "system_resources": system_resources_summary(self.system_stats),
+            "tester_saturation": self.saturation_report(),
+            "fault_proxy": fault_proxy_summary(self.fault_stats, self.fault_scenario)
+                           if self.fault_scenario is not None else None,
             "individual_streams": [
                 {
                     "camera_id": stream.camera_id,
@@ -514,18 +871,75 @@ class CameraStreamLoadTester:
                     "total_frames": stream.total_frames,
                     "total_bytes": stream.total_bytes,
                     "reconnections": stream.reconnections,
+                    "http_status": stream.http_status or None,
                     "avg_fps": round(stream.avg_fps, 2),
+                    "unique_fps": round(unique_fps(stream), 2),
+                    "viewer": stream.viewer,
+                    "throttled_seconds": round(stream.throttled_seconds, 2),
+                    "repeated_frames": stream.repeated_frames,
+                    "repeat_runs": stream.repeat_runs,
+                    "longest_repeat_run": stream.longest_repeat_run,
+                    "malformed_frames": stream.malformed_frames,
+                    "avg_frame_size": round(stream.frame_bytes / stream.total_frames) if stream.total_frames else 0,
+                    "min_frame_size": stream.min_frame_size,
+                    "max_frame_size": stream.max_frame_size,
+                    "frame_interval_ms": stream.frame_intervals.summary_ms(),
+                    "last_connection_phases_ms": stream.last_connection_phases,
+                    "stall_count": stream.stall_count,
+                    "stall_seconds": round(stream.stall_seconds, 2),
+                    "stall_reconnects": stream.stall_reconnects,
+                    "decoded_frames": stream.decoded_frames,
+                    "decode_dropped": stream.decode_dropped,
+                    "resolution": f"{stream.frame_width}x{stream.frame_height}" if stream.frame_width else None,
+                    "resolution_changes": stream.resolution_changes,
+                    "avg_sharpness": round(stream.sharpness_total / stream.decoded_frames, 2) if stream.decoded_frames else None,
                     "duration_seconds": round((stream.end_time or end_time) - stream.start_time, 2),
-                    "errors": stream.errors
+                    "error_count": len(stream.errors),
+                    "error_codes": dict(stream.errors.counts),
+                    "errors": stream.errors.messages()
                 }
                 for stream in self.active_streams.values()
             ],
-            "analysis": self.analyze_results(total_duration, max_concurrent, avg_fps)
+            "analysis": self.analyze_results(total_duration, max_concurrent, avg_fps, frame_intervals)
         }
         
         return report
     
-    def analyze_results(self, duration: float, max_concurrent: int, avg_fps: float) -> Dict:
+    def viewer_class_summary(self, duration: float) -> Dict:
+        """Fast vs slow viewer comparison for --slow-viewers runs"""
+        summary = {
+            "slow_viewer_fraction": self.slow_viewer_fraction,
+            "slow_viewer_rate_kbps": self.slow_viewer_rate
+        }
+        for viewer in ("fast", "slow"):
+            streams = [s for s in self.active_streams.values() if s.viewer == viewer]
+            fps_values = [s.avg_fps for s in streams if s.avg_fps > 0]
+            frames = sum(s.total_frames for s in streams)
+            frame_bytes = sum(s.frame_bytes for s in streams)
+            summary[viewer] = {
+                "streams": len(streams),
+                "average_fps": round(statistics.mean(fps_values), 2) if fps_values else 0,
+                "average_unique_fps": round(statistics.mean(unique_fps(s) for s in streams if s.avg_fps > 0), 2) if fps_values else 0,
+                "frame_interval_ms": LatencyHistogram.merged(s.frame_intervals for s in streams).summary_ms(),
+                "bytes_per_second_per_stream": round(sum(s.total_bytes for s in streams) / duration / len(streams), 2)
+                if streams and duration > 0 else 0,
+                "average_frame_size_bytes": round(frame_bytes / frames) if frames else 0,
+                "reconnections": sum(s.reconnections for s in streams),
+                "errors": sum(len(s.errors) for s in streams),
+                "streams_stalled": sum(1 for s in streams if s.stall_count),
+                "malformed_frames": sum(s.malformed_frames for s in streams),
+                "throttled_seconds": round(sum(s.throttled_seconds for s in streams), 2)
+            }
+        
+        # Share of the emulated link the server actually filled
+        slow = summary["slow"]
+        slow["link_utilization_percent"] = round(
+            slow["bytes_per_second_per_stream"] / (self.slow_viewer_rate * 1024) * 100, 1
+        ) if self.slow_viewer_rate > 0 else 0
+        return summary
+    
+    def analyze_results(self, duration: float, max_concurrent: int, avg_fps: float,
+                        frame_intervals: Optional[LatencyHistogram] = None) -> Dict:
         """Analyze test results and provide recommendations"""
         analysis = {
             "summary": "",
@@ -546,6 +960,30 @@ class CameraStreamLoadTester:
         else:
             analysis["summary"] = f"POOR: Only {max_concurrent}/{self.max_concurrent} streams successful"
         
+        # Churn: max concurrent is only a cap, so grade the sessions instead
+        churn = self.churn_runner.summary() if self.churn_runner is not None else None
+        if churn:
+            rate = churn["success_rate_percent"]
+            grade = "EXCELLENT" if rate >= 99 else "GOOD" if rate >= 95 else "MODERATE" if rate >= 80 else "POOR"
+            analysis["summary"] = (
+                f"{grade}: {churn['sessions_succeeded']}/{churn['sessions_classified']} viewer sessions succeeded "
+                f"({rate}%), p95 time to first frame {churn['time_to_first_frame_ms']['p95']:.0f}ms"
+            )
+        
+        # Client-bound: late frames are (at least partly) our own loop falling behind
+        saturation = self.saturation_report()
+        if saturation["client_bound"]:
+            analysis["summary"] += " (CLIENT-BOUND: tester saturated, results understate the server)"
+            windows = ", ".join(f"{w['start_second']}-{w['end_second']}s" for w in saturation["windows"][:5])
+            analysis["issues_found"].append(
+                f"Tester saturated for {saturation['saturated_seconds']}s ({saturation['saturated_percent']}% of the run; "
+                f"windows {windows}); loop lag p99 {saturation['loop_lag_ms']['p99']:.0f}ms. "
+                f"Frame delays and stalls in these windows are the tester's, not the server's"
+            )
+            analysis["recommendations"].append(
+                "Spread the load: more --workers, --client raw, --loop uvloop or more tester hosts"
+            )
+        
         # Capacity assessment
         if avg_fps >= 20:
             analysis["capacity_assessment"] = "High performance - suitable for real-time monitoring"
@@ -561,14 +999,165 @@ class CameraStreamLoadTester:
         total_reconnections = sum(s.reconnections for s in self.active_streams.values())
         
         if total_errors > max_concurrent * 0.1:
-            analysis["issues_found"].append(f"High error rate: {total_errors} errors across streams")
+            codes = error_code_totals(s.errors for s in self.active_streams.values())
+            top_codes = ", ".join(f"{code} {count}" for code, count in list(codes.items())[:3])
+            analysis["issues_found"].append(f"High error rate: {total_errors} errors across streams ({top_codes})")
             analysis["recommendations"].append("Investigate network stability and server capacity")
         
         if total_reconnections > max_concurrent:
             analysis["issues_found"].append(f"Frequent reconnections: {total_reconnections} total")
             analysis["recommendations"].append("Check stream server stability and network conditions")
         
-        if max_concurrent < self.max_concurrent * 0.8:
+        total_frames = sum(s.total_frames for s in self.active_streams.values())
+        total_malformed = sum(s.malformed_frames for s in self.active_streams.values())
+        if total_malformed > (total_frames + total_malformed) * 0.01:
+            analysis["issues_found"].append(f"Malformed frames: {total_malformed} truncated or corrupt JPEG parts")
+            analysis["recommendations"].append("Check encoder and network path for truncated frames under load")
+        
+        # Repeated frames: the server keeps streaming but resends the same JPEG
+        repeating = [s for s in self.active_streams.values() if s.repeated_frames > s.total_frames * 0.1]
+        if repeating:
+            longest = max(s.longest_repeat_run for s in repeating)
+            analysis["issues_found"].append(
+                f"Repeated frames: {len(repeating)} streams resend identical JPEGs for more than 10% of frames "
+                f"(longest run {longest} frames); raw FPS overstates their health"
+            )
+            analysis["recommendations"].append("Compare unique_fps with avg_fps per stream to find dead camera feeds behind the server")
+        
+        # Stutter: streams whose worst frame gap is far above their typical gap
+        stuttering = [
+            s for s in self.active_streams.values()
+            if s.frame_intervals.count and s.frame_intervals.max_value >= max(1.0, 10 * s.frame_intervals.percentile(50))
+        ]
+        if stuttering:
+            worst = max(s.frame_intervals.max_value for s in stuttering)
+            analysis["issues_found"].append(
+                f"Frame stutter on {len(stuttering)} streams (worst gap {worst:.1f}s"
+                + (f", global p99 {frame_intervals.percentile(99) * 1000:.0f}ms" if frame_intervals else "") + ")"
+            )
+            analysis["recommendations"].append("Review per-stream frame_interval_ms to locate freezing cameras")
+        
+        # Timeline: streams that were fine early on and fell off late in the run
+        degraded = (self.timeline.degraded_streams(self.active_streams)
+                    if self.timeline is not None and self.churn is None else [])
+        if degraded:
+            worst = min(degraded, key=lambda d: d["late_fps"] / d["early_fps"])
+            analysis["issues_found"].append(
+                f"FPS degraded during the run on {len(degraded)} streams (e.g. camera {worst['camera_id']}: "
+                f"{worst['early_fps']} -> {worst['late_fps']} FPS from second {worst['degraded_from_second']})"
+            )
+            analysis["recommendations"].append("Plot the per-second timeline artifact to see when and where streams degrade")
+        
+        stalled_streams = [s for s in self.active_streams.values() if s.stall_count]
+        if stalled_streams:
+            stall_seconds = sum(s.stall_seconds for s in stalled_streams)
+            analysis["issues_found"].append(
+                f"Frozen streams: {len(stalled_streams)} streams stalled for {stall_seconds:.0f}s in total "
+                f"(no frames for >= {self.stall_threshold:g}s while connected)"
+            )
+            analysis["recommendations"].append("Check camera feeds and server-side encoders for streams that stop sending frames")
+        
+        # Connection setup: which phase dominates when setup is slow
+        phase_p95 = {
+            phase: hist.percentile(95)
+            for phase, hist in self.phase_tracer.histograms.items()
+            if phase != "setup_total" and hist.count
+        }
+        setup = self.phase_tracer.histograms["setup_total"]
+        if setup.count and setup.percentile(95) >= 2.0 and phase_p95:
+            slowest = max(phase_p95, key=phase_p95.get)
+            analysis["issues_found"].append(
+                f"Slow connection setup: p95 {setup.percentile(95):.1f}s to first frame, dominated by '{slowest}' "
+                f"(p95 {phase_p95[slowest]:.1f}s)"
+            )
+            analysis["recommendations"].append("Connection establishment, not steady-state streaming, may be limiting capacity")
+        
+        # Frame content: downscaled or flat frames still count as healthy FPS
+        decoded_streams = [s for s in self.active_streams.values() if s.decoded_frames]
+        if decoded_streams:
+            changed = [s for s in decoded_streams if s.resolution_changes]
+            if changed:
+                analysis["issues_found"].append(
+                    f"Resolution changed mid-stream on {len(changed)} streams (possible server-side downscaling)"
+                )
+            flat = [s for s in decoded_streams if s.sharpness_total / s.decoded_frames < LOW_SHARPNESS]
+            if flat:
+                analysis["issues_found"].append(
+                    f"Flat/gray frames: {len(flat)} streams with average sharpness below {LOW_SHARPNESS:g}"
+                )
+                analysis["recommendations"].append("Check camera feeds behind streams that deliver blank or gray frames")
+        decode_dropped = sum(s.decode_dropped for s in self.active_streams.values())
+        decoded = sum(s.decoded_frames for s in decoded_streams)
+        if decode_dropped > decoded:
+            analysis["recommendations"].append(
+                "Most decode samples were dropped; raise --decode-sample or --decode-workers for better coverage"
+            )
+        
+        # Ramp: separate connection-establishment limits from steady-state limits
+        ramp_phases = self.ramp_tracker.phases
+        if ramp_phases:
+            failing = [p for p in ramp_phases if p["failed_attempts"]]
+            if failing:
+                first = failing[0]
+                analysis["issues_found"].append(
+                    f"Connection failures began in ramp phase '{first['phase']}' "
+                    f"({first['failed_attempts']} failed with {first['streams_started']} streams started)"
+                )
+                analysis["recommendations"].append(
+                    "Connection establishment is the limit: compare connection_phases_ms per ramp phase"
+                )
+            rates = [p["fps_per_connected_stream"] for p in ramp_phases if p["fps_per_connected_stream"]]
+            if len(rates) >= 2 and rates[-1] < rates[0] * 0.8:
+                analysis["issues_found"].append(
+                    f"Per-stream FPS fell from {rates[0]} to {rates[-1]} as streams were added "
+                    f"(steady-state streaming capacity reached)"
+                )
+        
+        # Slow viewers: does per-consumer buffering on the server hurt everyone else?
+        if self.slow_viewer_fraction > 0:
+            viewers = self.viewer_class_summary(duration)
+            fast, slow = viewers["fast"], viewers["slow"]
+            if slow["streams"] and fast["streams"]:
+                if fast["streams_stalled"] or fast["reconnections"] > fast["streams"] * 0.1:
+                    analysis["issues_found"].append(
+                        f"Fast viewers degraded next to {slow['streams']} slow viewers: "
+                        f"{fast['streams_stalled']} stalled, {fast['reconnections']} reconnections"
+                    )
+                    analysis["recommendations"].append(
+                        "Server buffering for slow consumers affects fast ones; bound per-client queues and drop frames for slow clients"
+                    )
+                if slow["reconnections"] > slow["streams"]:
+                    analysis["issues_found"].append(
+                        f"Server disconnected slow viewers {slow['reconnections']} times (send buffer limit or write timeout)"
+                    )
+                if slow["link_utilization_percent"] < 50:
+                    analysis["issues_found"].append(
+                        f"Slow viewers used only {slow['link_utilization_percent']}% of their "
+                        f"{self.slow_viewer_rate:g} KB/s link; the server sends them less than the link can carry"
+                    )
+        
+        if churn:
+            if churn["sessions_failed"]:
+                analysis["issues_found"].append(
+                    f"Viewer sessions failed: {churn['sessions_failed']} of {churn['sessions_classified']} "
+                    f"never received a frame"
+                )
+            ttff_p95 = churn["time_to_first_frame_ms"]["p95"]
+            if ttff_p95 >= 2000:
+                analysis["issues_found"].append(f"Slow time to first frame under churn: p95 {ttff_p95:.0f}ms")
+                analysis["recommendations"].append(
+                    "Viewers wait long for the first frame; check stream startup (keyframe, encoder spin-up) on the server"
+                )
+            if churn["dropped_at_cap"]:
+                analysis["issues_found"].append(
+                    f"{churn['dropped_at_cap']} session arrivals were dropped at --max-streams; "
+                    f"raise it above the expected {churn['expected_concurrent_sessions']} concurrent sessions"
+                )
+        
+        if self.phase_tracer.failed_attempts > max_concurrent * 0.1:
+            analysis["issues_found"].append(f"Failed connection attempts: {self.phase_tracer.failed_attempts}")
+        
+        if max_concurrent < self.max_concurrent * 0.8 and not churn:
             analysis["issues_found"].append("Could not achieve target concurrent stream count")
             analysis["recommendations"].append("Consider increasing server resources or reducing stream quality")
         
@@ -619,17 +1208,139 @@ def print_summary(report: Dict):
     print(f"   Duration: {test_info['duration_seconds']}s")
     print(f"   Target concurrent streams: {test_info['max_concurrent_target']}")
     print(f"   Achieved concurrent streams: {test_info['max_concurrent_achieved']}")
+    inventory = test_info.get('camera_inventory') or {}
+    if inventory.get('time_to_first_camera_ms') is not None:
+        print(f"   Camera inventory: {inventory['active_cameras']} active of {inventory['total_cameras']} "
+              f"({inventory['source']}), first camera after {inventory['time_to_first_camera_ms']:.0f}ms, "
+              f"download {inventory['download_seconds']:.2f}s, parser peak {inventory['peak_buffer_kb']:.0f}KB")
     
     print(f"\n📈 Performance Metrics:")
     print(f"   Total frames received: {perf['total_frames_received']:,}")
     print(f"   Total data received: {perf['total_bytes_received'] / (1024**2):.1f} MB")
-    print(f"   Average FPS per stream: {perf['average_fps']}")
+    print(f"   Average FPS per stream: {perf['average_fps']} (unique: {perf.get('average_unique_fps', perf['average_fps'])})")
     print(f"   Global FPS: {perf['frames_per_second_global']}")
+    intervals = perf.get('frame_interval_ms')
+    if intervals:
+        print(f"   Frame interval (ms): p50 {intervals['p50']} | p95 {intervals['p95']} | p99 {intervals['p99']} | max {intervals['max']}")
     print(f"   Total reconnections: {perf['total_reconnections']}")
+    print(f"   Stalled streams: {perf.get('streams_stalled', 0)} ({perf.get('total_stall_seconds', 0)}s without frames)")
+    error_codes = perf.get('error_codes')
+    if error_codes:
+        codes = ", ".join(f"{code} {count}" for code, count in error_codes.items())
+        print(f"   Errors: {perf.get('total_errors', 0)} ({codes})")
+    print(f"   Malformed frames: {perf.get('total_malformed_frames', 0)}")
+    print(f"   Repeated frames: {perf.get('total_repeated_frames', 0):,} on {perf.get('streams_with_repeated_frames', 0)} streams")
+    print(f"   Average frame size: {perf.get('average_frame_size_bytes', 0) / 1024:.1f} KB")
+    
+    ramp = report.get("ramp")
+    if ramp:
+        print(f"\n📶 Ramp Phases ({ramp['mode']}):")
+        for phase in ramp["phases"]:
+            setup = phase["connection_phases_ms"].get("setup_total", {})
+            print(f"   {phase['phase']:<8} {phase['start_seconds']:>7}s +{phase['duration_seconds']:<7} "
+                  f"started {phase['streams_started']:>5} | connected {phase['streams_connected_at_end']:>5} | "
+                  f"setup p95 {setup.get('p95', '-')}ms | failed {phase['failed_attempts']} | "
+                  f"{phase['fps_per_connected_stream']} FPS/stream")
+    
+    timeline = report.get("timeline")
+    if timeline and timeline["seconds"]:
+        fps = timeline["frames_per_second"]
+        print(f"\n📉 Timeline ({timeline['seconds']}s): global FPS min {min(fps)} | max {max(fps)} | "
+              f"last {fps[-1]} | degraded streams: {len(timeline['degraded_streams'])}")
+        if timeline.get("artifact"):
+            print(f"   Per-stream buckets: {timeline['artifact']}")
+    
+    churn = report.get("churn")
+    if churn:
+        ttff = churn["time_to_first_frame_ms"]
+        print(f"\n🔄 Viewer Churn ({churn['arrival_rate_per_second']:g}/s, mean session {churn['session_mean_seconds']:g}s, "
+              f"{churn['popularity']}):")
+        print(f"   Sessions: {churn['sessions_started']:,} started | peak concurrent {churn['peak_concurrent_sessions']} "
+              f"(expected {churn['expected_concurrent_sessions']}) | dropped at cap {churn['dropped_at_cap']}")
+        print(f"   Outcome: {churn['sessions_succeeded']} ok | {churn['sessions_degraded']} degraded | "
+              f"{churn['sessions_failed']} failed ({churn['success_rate_percent']}% success)")
+        if ttff.get('count'):
+            print(f"   Time to first frame (ms): p50 {ttff['p50']} | p95 {ttff['p95']} | p99 {ttff['p99']} | max {ttff['max']}")
+        print(f"   Cameras watched: {churn['cameras_watched']}/{churn['cameras_available']}")
+    
+    viewers = report.get("viewer_classes")
+    if viewers:
+        print(f"\n🐢 Viewer Classes (slow: {viewers['slow_viewer_fraction']:.0%} at {viewers['slow_viewer_rate_kbps']:g} KB/s):")
+        for viewer in ("fast", "slow"):
+            entry = viewers[viewer]
+            if entry["streams"]:
+                interval = entry["frame_interval_ms"]
+                print(f"   {viewer:<5} {entry['streams']} streams | {entry['average_fps']} FPS "
+                      f"(unique {entry['average_unique_fps']}) | interval p95 {interval.get('p95', 0)}ms | "
+                      f"reconnections {entry['reconnections']} | stalled {entry['streams_stalled']}"
+                      + (f" | link use {entry['link_utilization_percent']}%" if viewer == "slow" else ""))
+    
+    decode = report.get("frame_decode")
+    if decode:
+        print(f"\n🖼️  Frame Decode (1 in {decode['sample_every']} frames):")
+        print(f"   Decoded samples: {decode['decoded_frames']:,} | Dropped: {decode['dropped_samples']:,} | "
+              f"Failures: {decode['decode_failures']}")
+        if decode['decode_ms'].get('count'):
+            print(f"   Decode time (ms): p50 {decode['decode_ms']['p50']} | p95 {decode['decode_ms']['p95']}")
+        resolutions = ", ".join(f"{res} ({count})" for res, count in decode['resolutions'].items())
+        print(f"   Resolutions: {resolutions or 'n/a'}")
+        print(f"   Average sharpness: {decode['average_sharpness']} | Low-sharpness streams: {decode['low_sharpness_streams']}")
+    
+    phases = report.get("connection_phases", {}).get("phases_ms", {})
+    if phases:
+        print(f"\n🔌 Connection Phases (p50 / p95 ms):")
+        for phase, summary in phases.items():
+            if summary.get("count"):
+                print(f"   {phase:<17} {summary['p50']:>9} / {summary['p95']:<9} (n={summary['count']})")
+    
+    saturation = report.get("tester_saturation")
+    if saturation:
+        state = "⚠️  CLIENT-BOUND" if saturation["client_bound"] else "✅ not saturated"
+        lag = saturation["loop_lag_ms"]
+        print(f"\n⏱️  Tester Saturation: {state} | loop lag p50 {lag['p50']} / p99 {lag['p99']} / max {lag['max']} ms | "
+              f"saturated {saturation['saturated_seconds']}s ({saturation['saturated_percent']}%)")
+        for window in saturation["windows"][:5]:
+            print(f"   {window['start_second']}-{window['end_second']}s: {', '.join(window['reasons'])} | "
+                  f"max lag {window['max_lag_ms']}ms | tester CPU {window['peak_tester_cpu_percent']}%")
+    
+    faults = report.get("fault_proxy")
+    if faults:
+        print(f"\n🧪 Fault Proxy ({', '.join(faults['rules']) or 'no rules'}):")
+        print(f"   Connections: {faults['connections']:,} | resets {faults['resets']:,} (refused {faults['refused']:,}) | "
+              f"upstream errors {faults['upstream_errors']:,}")
+        print(f"   Stalls: {faults['stalls']:,} + {faults['loss_stalls']:,} loss | {faults['mb_to_tester']:,} MB to tester")
+        for name, count in faults["rule_connections"].items():
+            print(f"   {name}: {count:,} connections")
     
     print(f"\n🖥️  System Resources:")
     print(f"   Peak CPU usage: {resources['peak_cpu_percent']}%")
     print(f"   Peak memory usage: {resources['peak_memory_percent']}%")
+    tester_resources = resources.get("tester")
+    if tester_resources:
+        print(f"   Tester CPU: avg {tester_resources['average_cpu_percent_of_one_core']}% | "
+              f"peak {tester_resources['peak_cpu_percent_of_one_core']}% of one core "
+              f"({tester_resources['processes']} processes) | peak RSS {tester_resources['peak_rss_mb']} MB")
+        print(f"   Context switches/s: host {resources['average_ctx_switches_per_second']:,} | "
+              f"tester {tester_resources['average_ctx_switches_per_second']:,}")
+    for name, nic in resources.get("network_interfaces", {}).items():
+        print(f"   {name}: recv avg {nic['average_recv_mbps']} / peak {nic['peak_recv_mbps']} Mbps | "
+              f"sent avg {nic['average_sent_mbps']} Mbps | errors {nic['errors']} | drops {nic['drops']}")
+    
+    workers = report.get("workers")
+    if workers:
+        print(f"\n🧵 Workers ({workers['worker_count']} processes):")
+        for worker in workers["per_worker"]:
+            status = f" | error: {worker['error']}" if worker.get("error") else ""
+            print(f"   #{worker['worker_id']}: {worker['cameras']} cameras | {worker['total_frames']:,} frames | "
+                  f"CPU {worker['cpu_seconds']}s{status}")
+    
+    agents = report.get("agents")
+    if agents:
+        print(f"\n🌐 Agents ({agents['agent_count']}):")
+        for agent in agents["per_agent"]:
+            status = f" | error: {agent['error']}" if agent.get("error") else ""
+            print(f"   {agent['agent']} ({agent['host']}): {agent['cameras']} cameras | "
+                  f"{agent['total_frames']:,} frames | CPU {agent['cpu_seconds']}s{status}")
     
     print(f"\n📋 Analysis:")
     print(f"   {analysis['summary']}")
@@ -660,18 +1371,108 @@ async def main():
                        help='Output filename for report (auto-generated if not specified)')
     parser.add_argument('--no-shuffle', dest='shuffle', action='store_false',
                        help='Disable shuffling cameras before selection')
+    parser.add_argument('--stall-threshold', type=float, default=5.0,
+                       help='Seconds without frames before a connected stream is marked stalled')
+    parser.add_argument('--stall-reconnect', type=float, default=None,
+                       help='Force a reconnect after this many seconds without frames (disabled by default)')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Split streams across this many worker processes (default: 1)')
+    parser.add_argument('--loop', choices=LOOP_BACKENDS, default='auto',
+                       help='Event loop backend; auto uses uvloop when installed (default: auto)')
+    parser.add_argument('--client', choices=CLIENT_TYPES, default='aiohttp',
+                       help='Stream transport: aiohttp, or raw asyncio protocol for capacity runs (default: aiohttp)')
+    parser.add_argument('--slow-viewers', type=float, default=0.0,
+                       help='Fraction of streams read at --slow-viewer-rate to emulate slow links (default: 0)')
+    parser.add_argument('--slow-viewer-rate', type=float, default=128.0,
+                       help='Read rate of slow viewers in KB/s (default: 128)')
+    parser.add_argument('--ramp', choices=RAMP_MODES, default='none',
+                       help='Connection ramp-up: none (all at once), linear, rate or step (default: none)')
+    parser.add_argument('--ramp-seconds', type=float, default=0,
+                       help='linear: seconds over which all streams start')
+    parser.add_argument('--ramp-rate', type=float, default=0,
+                       help='rate: new connections per second')
+    parser.add_argument('--ramp-step', type=int, default=0,
+                       help='Streams per step (step mode; optional batches for linear/rate)')
+    parser.add_argument('--ramp-hold', type=float, default=0,
+                       help='Seconds to hold after each step')
+    parser.add_argument('--decode-sample', type=int, default=0,
+                       help='Decode 1 in N frames per stream with OpenCV to check resolution and sharpness (default: off)')
+    parser.add_argument('--decode-workers', type=int, default=2,
+                       help='Decoder threads for --decode-sample (default: 2)')
+    parser.add_argument('--churn-rate', type=float, default=0,
+                       help='Open-loop viewer churn: new viewer sessions per second (Poisson); '
+                            '--max-streams caps concurrent sessions (default: off)')
+    parser.add_argument('--session-mean', type=float, default=60.0,
+                       help='Mean viewer session length in seconds (default: 60)')
+    parser.add_argument('--session-distribution', choices=SESSION_DISTRIBUTIONS, default='exponential',
+                       help='Session length distribution (default: exponential)')
+    parser.add_argument('--popularity', choices=POPULARITY_MODELS, default='zipf',
+                       help='Camera choice per session: zipf over the camera list or uniform (default: zipf)')
+    parser.add_argument('--zipf-exponent', type=float, default=1.0,
+                       help='Zipf skew; higher concentrates viewers on fewer cameras (default: 1.0)')
+    parser.add_argument('--churn-seed', type=int, default=None,
+                       help='Random seed for arrivals, camera choice and session lengths')
+    parser.add_argument('--lag-threshold', type=float, default=LAG_THRESHOLD_MS,
+                       help=f'Event loop lag (ms) that marks a second as tester-saturated (default: {LAG_THRESHOLD_MS:g})')
+    parser.add_argument('--tester-cpu-threshold', type=float, default=TESTER_CPU_THRESHOLD,
+                       help='CPU of the busiest tester process (%% of one core) that marks a second as '
+                            f'tester-saturated (default: {TESTER_CPU_THRESHOLD:g})')
+    parser.add_argument('--inventory-ttl', type=float, default=DEFAULT_TTL,
+                       help=f'Seconds the cached camera inventory is used before it is revalidated '
+                            f'with the API (default: {DEFAULT_TTL:g}, 0 always revalidates)')
+    parser.add_argument('--offline', action='store_true',
+                       help='Use the cached camera inventory only, without calling the camera API')
+    parser.add_argument('--inventory-page-size', type=int, default=0,
+                       help='Fetch the camera list in pages of this many cameras (limit/offset query '
+                            'parameters, default: one request)')
+    parser.add_argument('--fault-scenario',
+                       help='Route every stream through the fault-injection proxy with the rules in '
+                            'this scenario file (see fault_proxy.py)')
     parser.set_defaults(shuffle=True)
     
     args = parser.parse_args()
     
+    try:
+        ramp = RampSchedule(mode=args.ramp, ramp_seconds=args.ramp_seconds, rate=args.ramp_rate,
+                            step_size=args.ramp_step, step_hold=args.ramp_hold)
+        churn = ChurnWorkload(
+            arrival_rate=args.churn_rate, session_mean=args.session_mean,
+            session_distribution=args.session_distribution, popularity=args.popularity,
+            zipf_exponent=args.zipf_exponent, seed=args.churn_seed
+        ) if args.churn_rate else None
+        fault_scenario = load_scenario(args.fault_scenario) if args.fault_scenario else None
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    if churn and (args.workers > 1 or ramp.mode != "none"):
+        parser.error("--churn-rate cannot be combined with --workers or --ramp")
+    
     # Create and run load tester
-    tester = CameraStreamLoadTester(
+    tester_options = dict(
         api_url=args.api_url,
         max_concurrent=args.max_streams,
         test_duration=args.duration,
         shuffle_cameras=args.shuffle,
-        prefix=args.prefix
+        prefix=args.prefix,
+        stall_threshold=args.stall_threshold,
+        stall_reconnect_after=args.stall_reconnect,
+        client=args.client,
+        decode_sample_every=args.decode_sample,
+        decode_workers=args.decode_workers,
+        slow_viewer_fraction=args.slow_viewers,
+        slow_viewer_rate=args.slow_viewer_rate,
+        ramp=ramp,
+        lag_threshold_ms=args.lag_threshold,
+        tester_cpu_threshold=args.tester_cpu_threshold,
+        inventory_ttl=args.inventory_ttl,
+        offline=args.offline,
+        inventory_page_size=args.inventory_page_size,
+        fault_scenario=fault_scenario
     )
+    if args.workers > 1:
+        from sharded_load_test import ShardedLoadTester
+        tester = ShardedLoadTester(args.workers, loop_backend=args.loop, **tester_options)
+    else:
+        tester = CameraStreamLoadTester(churn=churn, **tester_options)
     
     try:
         report = await tester.run_load_test()
@@ -695,4 +1496,4 @@ async def main():
         sys.exit(1)
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run_with_loop(main(), loop_backend_from_argv())
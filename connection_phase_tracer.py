@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Connection Phase Tracer
+=======================
+
+Breaks every stream connection attempt into phases using aiohttp TraceConfig
+hooks, so slow connection setup can be told apart from slow streaming.
+- queue: waiting for a free connector slot
+- dns: host resolution (cache hits are counted, not timed)
+- connect: TCP connect plus TLS handshake (aiohttp performs both in one
+  create_connection call, so they cannot be separated from trace hooks)
+- response_headers: request headers sent until response headers received
+- first_frame: response headers until the first complete multipart frame
+- setup_total: request start until the first complete frame
+
+Usage:
+    tracer = ConnectionPhaseTracer()
+    session = aiohttp.ClientSession(trace_configs=[tracer.trace_config])
+    attempt = tracer.new_attempt()
+    async with session.get(url, trace_request_ctx=attempt) as response:
+        ...
+        tracer.record_first_frame(attempt)
+
+Transports without aiohttp trace hooks fill the attempt dict themselves
+('dns', 'connect', 'headers_sent') and call start_attempt(),
+record_response_headers() / record_failure() and record_first_frame().
+"""
+
+import time
+from typing import Dict, Optional
+
+import aiohttp
+
+from latency_histogram import LatencyHistogram
+
+PHASES = ("queue", "dns", "connect", "response_headers", "first_frame", "setup_total")
+
+
+class ConnectionPhaseTracer:
+    """Collects per-phase connection timings into mergeable histograms"""
+
+    def __init__(self):
+        self.histograms: Dict[str, LatencyHistogram] = {phase: LatencyHistogram() for phase in PHASES}
+        self.attempts = 0
+        self.failed_attempts = 0
+        self.dns_cache_hits = 0
+        self.reused_connections = 0
+
+        self.trace_config = aiohttp.TraceConfig()
+        self.trace_config.on_request_start.append(self._on_request_start)
+        self.trace_config.on_connection_queued_start.append(self._on_queued_start)
+        self.trace_config.on_connection_queued_end.append(self._on_queued_end)
+        self.trace_config.on_connection_create_start.append(self._on_create_start)
+        self.trace_config.on_connection_create_end.append(self._on_create_end)
+        self.trace_config.on_connection_reuseconn.append(self._on_reuseconn)
+        self.trace_config.on_dns_resolvehost_start.append(self._on_dns_start)
+        self.trace_config.on_dns_resolvehost_end.append(self._on_dns_end)
+        self.trace_config.on_dns_cache_hit.append(self._on_dns_cache_hit)
+        self.trace_config.on_request_headers_sent.append(self._on_headers_sent)
+        self.trace_config.on_request_end.append(self._on_request_end)
+        self.trace_config.on_request_exception.append(self._on_request_exception)
+
+    @staticmethod
+    def new_attempt() -> Dict:
+        """Create the per-attempt context passed as trace_request_ctx"""
+        return {}
+
+    def start_attempt(self, attempt: Dict) -> None:
+        """Count an attempt and mark its start"""
+        self.attempts += 1
+        attempt['request_start'] = time.perf_counter()
+
+    def record_response_headers(self, attempt: Dict) -> None:
+        """Record connection phases and header latency once headers arrived"""
+        now = time.perf_counter()
+        attempt['headers_received'] = now
+        attempt['response_headers'] = now - attempt.get('headers_sent', attempt.get('request_start', now))
+        self._record_connection_phases(attempt)
+        self.histograms['response_headers'].record(attempt['response_headers'])
+
+    def record_failure(self, attempt: Dict) -> None:
+        """Count a failed attempt, keeping whatever phases completed"""
+        self.failed_attempts += 1
+        self._record_connection_phases(attempt)
+
+    def record_first_frame(self, attempt: Optional[Dict]) -> None:
+        """Record first-frame and total setup time once a frame has been parsed"""
+        if not attempt or 'headers_received' not in attempt or 'first_frame' in attempt:
+            return
+        now = time.perf_counter()
+        attempt['first_frame'] = now - attempt['headers_received']
+        attempt['setup_total'] = now - attempt['request_start']
+        self.histograms['first_frame'].record(attempt['first_frame'])
+        self.histograms['setup_total'].record(attempt['setup_total'])
+
+    @staticmethod
+    def attempt_summary_ms(attempt: Optional[Dict]) -> Dict:
+        """Phase durations of one attempt in milliseconds"""
+        if not attempt:
+            return {}
+        return {phase: round(attempt[phase] * 1000, 2) for phase in PHASES if phase in attempt}
+
+    def summary(self) -> Dict:
+        """Aggregated phase percentiles for the report"""
+        return {
+            "connection_attempts": self.attempts,
+            "failed_attempts": self.failed_attempts,
+            "reused_connections": self.reused_connections,
+            "dns_cache_hits": self.dns_cache_hits,
+            "phases_ms": {phase: hist.summary_ms() for phase, hist in self.histograms.items()}
+        }
+
+    # aiohttp trace hooks -------------------------------------------------
+
+    @staticmethod
+    def _ctx(trace_config_ctx) -> Optional[Dict]:
+        return trace_config_ctx.trace_request_ctx
+
+    def _record_connection_phases(self, attempt: Dict) -> None:
+        """Record queue/dns/connect once per attempt"""
+        if attempt.get('connection_recorded'):
+            return
+        attempt['connection_recorded'] = True
+        for phase in ('queue', 'dns', 'connect'):
+            if phase in attempt:
+                self.histograms[phase].record(attempt[phase])
+
+    async def _on_request_start(self, session, trace_config_ctx, params):
+        attempt = self._ctx(trace_config_ctx)
+        if attempt is not None:
+            self.start_attempt(attempt)
+
+    async def _on_queued_start(self, session, trace_config_ctx, params):
+        attempt = self._ctx(trace_config_ctx)
+        if attempt is not None:
+            attempt['queue_start'] = time.perf_counter()
+
+    async def _on_queued_end(self, session, trace_config_ctx, params):
+        attempt = self._ctx(trace_config_ctx)
+        if attempt is not None and 'queue_start' in attempt:
+            attempt['queue'] = time.perf_counter() - attempt['queue_start']
+
+    async def _on_create_start(self, session, trace_config_ctx, params):
+        attempt = self._ctx(trace_config_ctx)
+        if attempt is not None:
+            attempt['create_start'] = time.perf_counter()
+
+    async def _on_create_end(self, session, trace_config_ctx, params):
+        attempt = self._ctx(trace_config_ctx)
+        if attempt is not None and 'create_start' in attempt:
+            # DNS resolution happens inside connection creation
+            elapsed = time.perf_counter() - attempt['create_start']
+            attempt['connect'] = max(0.0, elapsed - attempt.get('dns', 0.0))
+
+    async def _on_reuseconn(self, session, trace_config_ctx, params):
+        if self._ctx(trace_config_ctx) is not None:
+            self.reused_connections += 1
+
+    async def _on_dns_start(self, session, trace_config_ctx, params):
+        attempt = self._ctx(trace_config_ctx)
+        if attempt is not None:
+            attempt['dns_start'] = time.perf_counter()
+
+    async def _on_dns_end(self, session, trace_config_ctx, params):
+        attempt = self._ctx(trace_config_ctx)
+        if attempt is not None and 'dns_start' in attempt:
+            attempt['dns'] = time.perf_counter() - attempt['dns_start']
+
+    async def _on_dns_cache_hit(self, session, trace_config_ctx, params):
+        if self._ctx(trace_config_ctx) is not None:
+            self.dns_cache_hits += 1
+
+    async def _on_headers_sent(self, session, trace_config_ctx, params):
+        attempt = self._ctx(trace_config_ctx)
+        if attempt is not None:
+            attempt['headers_sent'] = time.perf_counter()
+
+    async def _on_request_end(self, session, trace_config_ctx, params):
+        attempt = self._ctx(trace_config_ctx)
+        if attempt is not None:
+            self.record_response_headers(attempt)
+
+    async def _on_request_exception(self, session, trace_config_ctx, params):
+        attempt = self._ctx(trace_config_ctx)
+        if attempt is not None:
+            self.record_failure(attempt)
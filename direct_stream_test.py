@@ -13,13 +13,13 @@ Usage:
     python direct_stream_test.py 4                         # 4 streams, 120s duration
     python direct_stream_test.py 4 300                     # 4 streams, 300s duration
     python direct_stream_test.py 4 300 --prefix=sai1       # with optional API prefix
+    python direct_stream_test.py 4 300 --loop=uvloop       # uvloop event loop backend
 """
 
 import asyncio
 import sys
 import os
 import time
-import logging
 import csv
 import json
 from typing import Optional, Dict
@@ -28,6 +28,8 @@ from typing import Optional, Dict
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from camera_stream_load_test import CameraStreamLoadTester, save_report
+from event_loop_backend import current_loop_backend, loop_backend_from_argv, run_with_loop
+from tester_logging import close_tester_logger, setup_tester_logger
 
 class DirectLoadTester:
     def __init__(self, stream_count: int, test_duration: int = 120, prefix: str = ""):
@@ -44,33 +46,8 @@ class DirectLoadTester:
         os.makedirs('logs', exist_ok=True)
         self.log_filename = os.path.join('logs', f'direct_stream_test_{stream_count}streams_{time.strftime("%Y%m%d_%H%M%S")}.log')
         
-        # Create logger
-        self.logger = logging.getLogger(f"DirectLoadTester_{id(self)}")
-        self.logger.setLevel(logging.INFO)
-        
-        # Clear any existing handlers
-        self.logger.handlers.clear()
-        
-        # Console handler
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
-        console_format = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        console_handler.setFormatter(console_format)
-        self.logger.addHandler(console_handler)
-        
-        # File handler
-        try:
-            file_handler = logging.FileHandler(self.log_filename)
-            file_handler.setLevel(logging.INFO) 
-            file_format = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-            file_handler.setFormatter(file_format)
-            self.logger.addHandler(file_handler)
-            self.logger.info(f"Logging to file: {self.log_filename}")
-        except Exception as e:
-            print(f"Warning: Could not create log file {self.log_filename}: {e}")
-        
-        # Prevent propagation to root logger
-        self.logger.propagate = False
+        # Console and file handlers run on a background thread (tester_logging.py)
+        self.logger = setup_tester_logger(f"DirectLoadTester_{id(self)}", self.log_filename)
 
     async def run_direct_test(self) -> dict:
         """Run direct stream count test and return comprehensive report"""
@@ -113,6 +90,8 @@ class DirectLoadTester:
         except Exception as e:
             self.logger.error(f"Direct test failed: {e}")
             return {"error": str(e)}
+        finally:
+            close_tester_logger(self.logger)
 
     def enhance_report_with_analysis(self, report: dict) -> dict:
         """Add comprehensive analysis similar to adaptive test"""
@@ -218,7 +197,7 @@ class DirectLoadTester:
                     "reconnections": s.get("reconnections", 0),
                     "avg_fps": round(s.get("avg_fps", 0), 2),
                     "total_frames": s.get("total_frames", 0),
-                    "errors_count": len(s.get("errors", [])),
+                    "errors_count": s.get("error_count", len(s.get("errors", []))),
                     "stability_score": round(1.0 - (s.get("reconnections", 0) * 0.1), 2)
                 }
                 for s in unstable_cameras if s.get("reconnections", 0) > 0
@@ -312,7 +291,9 @@ class DirectLoadTester:
             cam_csv = os.path.join(reports_dir, f"{base_stem}_cameras.csv")
             fields = [
                 "camera_id", "status", "total_frames", "total_bytes",
-                "reconnections", "avg_fps", "duration_seconds", "errors_count", "stability_score"
+                "reconnections", "avg_fps", "malformed_frames", "avg_frame_size",
+                "frame_interval_p95_ms", "frame_interval_max_ms",
+                "duration_seconds", "errors_count", "stability_score"
             ]
             with open(cam_csv, "w", newline="", encoding="utf-8") as f:
                 writer = csv.DictWriter(f, fieldnames=fields)
@@ -326,8 +307,12 @@ class DirectLoadTester:
                         "total_bytes": s.get("total_bytes"),
                         "reconnections": s.get("reconnections"),
                         "avg_fps": s.get("avg_fps"),
+                        "malformed_frames": s.get("malformed_frames", 0),
+                        "avg_frame_size": s.get("avg_frame_size", 0),
+                        "frame_interval_p95_ms": s.get("frame_interval_ms", {}).get("p95", 0),
+                        "frame_interval_max_ms": s.get("frame_interval_ms", {}).get("max", 0),
                         "duration_seconds": s.get("duration_seconds"),
-                        "errors_count": len(s.get("errors", [])),
+                        "errors_count": s.get("error_count", len(s.get("errors", []))),
                         "stability_score": round(stability_score, 3)
                     })
             self.logger.info(f"   Saved per-camera CSV: {cam_csv}")
@@ -339,11 +324,12 @@ class DirectLoadTester:
             sys_csv = os.path.join(reports_dir, f"{base_stem}_system.csv")
             sys_fields = [
                 "timestamp", "cpu_percent", "memory_percent", "memory_used_gb",
-                "network_bytes_sent", "network_bytes_recv", "active_streams",
-                "total_frames", "total_bytes"
+                "network_bytes_sent", "network_bytes_recv", "ctx_switches_per_second",
+                "tester_cpu_percent", "tester_rss_mb", "tester_ctx_switches_per_second",
+                "active_streams", "total_frames", "total_bytes"
             ]
             with open(sys_csv, "w", newline="", encoding="utf-8") as f:
-                writer = csv.DictWriter(f, fieldnames=sys_fields)
+                writer = csv.DictWriter(f, fieldnames=sys_fields, extrasaction="ignore")  # Per-NIC rates stay in the JSON
                 writer.writeheader()
                 for row in getattr(tester, "system_stats", []) or []:
                     writer.writerow(row)
@@ -421,18 +407,23 @@ def print_direct_summary(report: dict):
 
 async def main():
     """Main entry point for direct load testing"""
-    # Parse CLI args: <stream_count> [duration_seconds] [--prefix=VALUE]
+    # Parse CLI args: <stream_count> [duration_seconds] [--prefix=VALUE] [--loop BACKEND]
     if len(sys.argv) < 2:
-        print("Usage: python direct_stream_test.py <stream_count> [duration_seconds] [--prefix=VALUE]")
+        print("Usage: python direct_stream_test.py <stream_count> [duration_seconds] [--prefix=VALUE] [--loop=auto|asyncio|uvloop]")
         print("Example: python direct_stream_test.py 4 300 --prefix=sai1")
         sys.exit(1)
 
     # Extract optional --prefix argument, keep numeric args clean
     prefix = ""
     numeric_args = []
-    for arg in sys.argv[1:]:
+    args = iter(sys.argv[1:])
+    for arg in args:
         if arg.startswith("--prefix="):
             prefix = arg.split("=", 1)[1]
+        elif arg.startswith("--loop"):
+            # Applied before the event loop starts (--loop=BACKEND or --loop BACKEND)
+            if arg == "--loop":
+                next(args, None)
         else:
             numeric_args.append(arg)
 
@@ -459,6 +450,7 @@ async def main():
     print(f"   Target streams: {stream_count}")
     print(f"   Test duration: {duration}s")
     print(f"   Camera selection: shuffled for variety")
+    print(f"   Event loop: {current_loop_backend()}")
     print()
     
     input("Press Enter to start testing...")
@@ -494,5 +486,5 @@ async def main():
 
 
 if __name__ == "__main__":
-    result = asyncio.run(main())
+    result = run_with_loop(main(), loop_backend_from_argv())
     sys.exit(result)
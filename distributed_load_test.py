@@ -0,0 +1,482 @@
+#!/usr/bin/env python3
+"""
+Distributed Camera Stream Load Test
+===================================
+
+Spreads one load test across several tester hosts, so a single NIC and CPU
+do not cap the number of streams.
+- The coordinator fetches and selects cameras once and splits them across agents
+- Agents connect to the coordinator over plain TCP (newline-delimited JSON)
+- All agents start together, a fixed delay after the coordinator sends start
+- Agents send stats deltas every report interval; the coordinator merges them
+  into the generate_report() format and adds a per-agent breakdown
+
+Protocol (one JSON object per line):
+    agent -> coordinator: hello {agent, host}, delta {payload}, done {payload}
+    coordinator -> agent: start {cameras, options, start_in, report_interval}, stop
+
+Usage:
+    python distributed_load_test.py coordinator --agents 4 --max-streams 2000 --duration 300
+    python distributed_load_test.py agent --coordinator 10.0.0.5:8790
+    python distributed_load_test.py coordinator --spawn-local 3 --max-streams 30 --duration 60
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from dataclasses import asdict
+from typing import Dict, List, Optional
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from camera_stream_load_test import CLIENT_TYPES, CameraStreamLoadTester, save_report, print_summary
+from sharded_load_test import run_shard, split_cameras
+from stats_delta import apply_generator_message, new_generator_totals
+from camera_inventory import DEFAULT_TTL
+from fault_proxy import load_scenario
+from loop_lag_probe import LAG_THRESHOLD_MS, TESTER_CPU_THRESHOLD
+from ramp_scheduler import RAMP_MODES, RampSchedule
+from tester_logging import close_tester_logger
+from event_loop_backend import LOOP_BACKENDS, loop_backend_from_argv, run_with_loop
+
+DEFAULT_PORT = 8790
+MAX_MESSAGE_SIZE = 64 * 1024 * 1024  # Camera lists and deltas travel as single lines
+AGENT_GRACE_SECONDS = 30  # Extra time for agents to shut down and flush
+
+
+def write_message(writer: asyncio.StreamWriter, message: Dict) -> None:
+    """Queue one JSON line on a stream"""
+    writer.write(json.dumps(message, separators=(',', ':')).encode() + b'\n')
+
+
+async def read_message(reader: asyncio.StreamReader) -> Optional[Dict]:
+    """Read one JSON line; None when the peer has gone"""
+    try:
+        line = await reader.readline()
+    except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+        return None
+    if not line:
+        return None
+    return json.loads(line)
+
+
+class LoadTestCoordinator:
+    """Hands camera shards to agents and merges their stats into one report"""
+
+    def __init__(self, expected_agents: int, listen_host: str = "0.0.0.0", port: int = DEFAULT_PORT,
+                 api_url: str = "https://cc.nttagid.com/api/v1/camera/",
+                 max_concurrent: int = 50, test_duration: int = 300,
+                 shuffle_cameras: bool = True, prefix: str = "",
+                 stall_threshold: float = 5.0, stall_reconnect_after: Optional[float] = None,
+                 start_delay: float = 3.0, join_timeout: float = 120.0,
+                 report_interval: float = 1.0, spawn_local: int = 0, loop_backend: str = "auto",
+                 client: str = "aiohttp", decode_sample_every: int = 0, decode_workers: int = 2,
+                 slow_viewer_fraction: float = 0.0, slow_viewer_rate: float = 128.0,
+                 ramp: Optional[RampSchedule] = None, lag_threshold_ms: float = LAG_THRESHOLD_MS,
+                 tester_cpu_threshold: float = TESTER_CPU_THRESHOLD,
+                 inventory_ttl: float = DEFAULT_TTL, offline: bool = False,
+                 inventory_page_size: int = 0, fault_scenario=None):
+        """
+        Args:
+            expected_agents: Agents to wait for before starting
+            listen_host, port: Address agents connect to
+            start_delay: Seconds between sending start and the synchronized start
+            join_timeout: Seconds to wait for agents; the test runs with those joined
+            report_interval: Seconds between stats deltas from each agent
+            spawn_local: Start this many agent processes on localhost
+            loop_backend: Event loop backend for spawned local agents
+            Other arguments as for CameraStreamLoadTester
+        """
+        self.expected_agents = max(expected_agents, spawn_local)
+        self.listen_host = listen_host
+        self.port = port
+        self.start_delay = start_delay
+        self.join_timeout = join_timeout
+        self.report_interval = report_interval
+        self.spawn_local = spawn_local
+        self.loop_backend = loop_backend
+        self.agent_options = {
+            "api_url": api_url,
+            "test_duration": test_duration,
+            "prefix": prefix,
+            "stall_threshold": stall_threshold,
+            "stall_reconnect_after": stall_reconnect_after,
+            "client": client,
+            "decode_sample_every": decode_sample_every,
+            "decode_workers": decode_workers,
+            "slow_viewer_fraction": slow_viewer_fraction,
+            "slow_viewer_rate": slow_viewer_rate,
+            "ramp": asdict(ramp) if ramp else None,
+            "timeline": False,  # The merging process keeps the timeline
+            "fault_scenario": load_scenario(fault_scenario) if fault_scenario else None
+        }
+
+        # Merge target: owns camera selection, system monitoring and the report
+        self.tester = CameraStreamLoadTester(
+            api_url=api_url,
+            max_concurrent=max_concurrent,
+            test_duration=test_duration,
+            shuffle_cameras=shuffle_cameras,
+            prefix=prefix,
+            stall_threshold=stall_threshold,
+            stall_reconnect_after=stall_reconnect_after,
+            client=client,
+            decode_sample_every=decode_sample_every,
+            decode_workers=decode_workers,
+            slow_viewer_fraction=slow_viewer_fraction,
+            slow_viewer_rate=slow_viewer_rate,
+            ramp=ramp,
+            lag_threshold_ms=lag_threshold_ms,
+            tester_cpu_threshold=tester_cpu_threshold,
+            inventory_ttl=inventory_ttl,
+            offline=offline,
+            inventory_page_size=inventory_page_size,
+            fault_scenario=self.agent_options["fault_scenario"]
+        )
+        self.logger = self.tester.logger
+
+        self.agents: Dict[str, Dict] = {}  # name -> breakdown totals
+        self._writers: Dict[str, asyncio.StreamWriter] = {}
+        self._pending: set = set()
+        self._started = False
+        self._joined: Optional[asyncio.Event] = None
+
+    async def _handle_agent(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """One agent connection: register, then apply its deltas"""
+        hello = await read_message(reader)
+        if not hello or hello.get("type") != "hello" or self._started:
+            writer.close()
+            return
+
+        name = hello.get("agent") or f"agent-{len(self.agents)}"
+        if name in self.agents:
+            name = f"{name}-{len(self.agents)}"
+        self.agents[name] = new_generator_totals(agent=name, host=hello.get("host", ""), cameras=0)
+        self._writers[name] = writer
+        self.logger.info(f"Agent {name} joined from {writer.get_extra_info('peername')} "
+                         f"({len(self.agents)}/{self.expected_agents})")
+        if len(self.agents) >= self.expected_agents:
+            self._joined.set()
+
+        try:
+            while True:
+                message = await read_message(reader)
+                if message is None:
+                    break
+                kind = message.get("type")
+                if kind in ("delta", "done"):
+                    if apply_generator_message(self.tester, self.agents[name], kind, message["payload"]):
+                        self._pending.discard(name)
+                        self.logger.info(f"Agent {name}: Finished ({self.agents[name]['total_frames']} frames)")
+        finally:
+            if name in self._pending:
+                self.agents[name]["error"] = "Disconnected before final stats"
+                self.logger.error(f"Agent {name}: Disconnected before final stats")
+                self._pending.discard(name)
+            self._writers.pop(name, None)
+            writer.close()
+
+    def _spawn_local_agents(self) -> List[subprocess.Popen]:
+        """Start agent processes on this host (for localhost testing)"""
+        processes = []
+        for i in range(self.spawn_local):
+            processes.append(subprocess.Popen([
+                sys.executable, os.path.abspath(__file__), "agent",
+                "--coordinator", f"127.0.0.1:{self.port}",
+                "--name", f"local-{i}",
+                "--loop", self.loop_backend
+            ]))
+        self.logger.info(f"Spawned {len(processes)} local agents")
+        return processes
+
+    async def run_load_test(self) -> Dict:
+        """Wait for agents, run the distributed test and return the merged report"""
+        try:
+            return await self._run_load_test()
+        finally:
+            close_tester_logger(self.logger)
+
+    async def _run_load_test(self) -> Dict:
+        tester = self.tester
+        self._joined = asyncio.Event()
+
+        server = await asyncio.start_server(self._handle_agent, self.listen_host, self.port,
+                                            limit=MAX_MESSAGE_SIZE)
+        self.logger.info(f"Coordinator listening on {self.listen_host}:{self.port}, "
+                         f"waiting for {self.expected_agents} agents")
+        local_agents = self._spawn_local_agents() if self.spawn_local else []
+
+        try:
+            try:
+                await asyncio.wait_for(self._joined.wait(), timeout=self.join_timeout)
+            except asyncio.TimeoutError:
+                self.logger.warning(f"Only {len(self.agents)}/{self.expected_agents} agents joined")
+            if not self.agents:
+                return {"error": "No agents joined"}
+
+            try:
+                cameras = await tester.get_active_cameras()
+            except Exception as e:
+                self.logger.error(f"Failed to get cameras: {e}")
+                return {"error": str(e)}
+
+            if not cameras:
+                self.logger.error("No active cameras found")
+                return {"error": "No active cameras found"}
+
+            # Freeze the agent set and hand out shards
+            self._started = True
+            test_cameras = tester.select_test_cameras(cameras)
+            names = list(self._writers)
+            shards = split_cameras(test_cameras, len(names))
+            for index, (name, shard) in enumerate(zip(names, shards)):
+                self.agents[name]["cameras"] = len(shard)
+                self._pending.add(name)
+                write_message(self._writers[name], {
+                    "type": "start",
+                    "cameras": shard,
+                    "options": dict(self.agent_options, ramp_shard=[index, len(names), len(test_cameras)]),
+                    "start_in": self.start_delay,
+                    "report_interval": self.report_interval
+                })
+            for name in names[len(shards):]:
+                write_message(self._writers[name], {"type": "stop"})  # More agents than cameras
+            self.logger.info(f"Assigned {len(test_cameras)} cameras to {len(shards)} agents, "
+                             f"starting in {self.start_delay}s")
+
+            await asyncio.sleep(self.start_delay)
+            tester.start_time = time.time()
+            tester.global_stats['total_streams_attempted'] = len(test_cameras)
+            monitor_task = asyncio.create_task(tester.monitor_system_resources())
+            timeline_task = tester.start_timeline()
+            ramp_task = asyncio.create_task(tester.ramp_tracker.run(
+                tester.start_time, len(test_cameras), tester.start_time + tester.test_duration))
+
+            deadline = tester.start_time + tester.test_duration + AGENT_GRACE_SECONDS
+            stop_sent = False
+            try:
+                while self._pending:
+                    if tester.should_stop and not stop_sent:
+                        for name in list(self._pending):
+                            if name in self._writers:
+                                write_message(self._writers[name], {"type": "stop"})
+                        stop_sent = True
+                    if time.time() > deadline:
+                        self.logger.warning(f"Agents {sorted(self._pending)} did not finish in time")
+                        break
+                    await asyncio.sleep(0.2)
+            finally:
+                tester.should_stop = True
+                monitor_task.cancel()
+                ramp_task.cancel()
+                if timeline_task is not None:
+                    timeline_task.cancel()
+                await asyncio.gather(monitor_task, ramp_task, *filter(None, [timeline_task]), return_exceptions=True)
+                tester.ramp_tracker.finish()
+        finally:
+            server.close()
+            for writer in list(self._writers.values()):
+                writer.close()
+            await server.wait_closed()
+            for process in local_agents:
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.terminate()
+
+        report = tester.generate_report()
+        report["agents"] = {
+            "agent_count": len(self.agents),
+            "report_interval_seconds": self.report_interval,
+            "per_agent": list(self.agents.values())
+        }
+        return report
+
+
+async def run_agent(coordinator: str, name: Optional[str] = None, connect_timeout: float = 120.0) -> int:
+    """Connect to a coordinator, stream the assigned shard and report back"""
+    host, _, port = coordinator.rpartition(':')
+    name = name or f"{socket.gethostname()}-{os.getpid()}"
+
+    # The coordinator may not be listening yet
+    deadline = time.time() + connect_timeout
+    while True:
+        try:
+            reader, writer = await asyncio.open_connection(host or "127.0.0.1", int(port or DEFAULT_PORT),
+                                                           limit=MAX_MESSAGE_SIZE)
+            break
+        except OSError as e:
+            if time.time() > deadline:
+                print(f"Agent {name}: Could not reach coordinator {coordinator}: {e}")
+                return 1
+            await asyncio.sleep(1)
+
+    write_message(writer, {"type": "hello", "agent": name, "host": socket.gethostname()})
+    await writer.drain()
+
+    start = await read_message(reader)
+    if not start or start.get("type") != "start":
+        print(f"Agent {name}: No work assigned")
+        writer.close()
+        return 0
+
+    print(f"Agent {name}: {len(start['cameras'])} cameras, starting in {start['start_in']}s")
+    stop_requested = False
+
+    async def watch_coordinator():
+        nonlocal stop_requested
+        while True:
+            message = await read_message(reader)
+            if message is None or message.get("type") == "stop":
+                stop_requested = True
+                return
+
+    async def send(kind: str, payload: Dict) -> None:
+        if not writer.is_closing():
+            write_message(writer, {"type": kind, "payload": payload})
+            await writer.drain()
+
+    watcher = asyncio.create_task(watch_coordinator())
+    await asyncio.sleep(start["start_in"])
+    try:
+        await run_shard(start["cameras"], start["options"], send,
+                        lambda: stop_requested, start["report_interval"])
+    except ConnectionError as e:
+        print(f"Agent {name}: Lost coordinator connection: {e}")
+        return 1
+    finally:
+        watcher.cancel()
+        writer.close()
+    return 0
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Distributed Camera Stream Load Testing')
+    subparsers = parser.add_subparsers(dest='role', required=True)
+
+    coord = subparsers.add_parser('coordinator', help='Split cameras across agents and merge their stats')
+    coord.add_argument('--agents', type=int, default=1, help='Agents to wait for (default: 1)')
+    coord.add_argument('--listen', default='0.0.0.0', help='Listen address (default: 0.0.0.0)')
+    coord.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Listen port (default: {DEFAULT_PORT})')
+    coord.add_argument('--spawn-local', type=int, default=0,
+                       help='Start this many agents on localhost (for testing)')
+    coord.add_argument('--join-timeout', type=float, default=120.0,
+                       help='Seconds to wait for agents (default: 120)')
+    coord.add_argument('--start-delay', type=float, default=3.0,
+                       help='Seconds between start message and synchronized start (default: 3)')
+    coord.add_argument('--api-url', default='https://cc.nttagid.com/api/v1/camera/',
+                       help='Camera API endpoint URL')
+    coord.add_argument('--prefix', default='', help='Optional prefix query for API requests')
+    coord.add_argument('--max-streams', type=int, default=50, help='Total concurrent streams across agents')
+    coord.add_argument('--duration', type=int, default=300, help='Test duration in seconds')
+    coord.add_argument('--output', '-o', help='Output filename for report (auto-generated if not specified)')
+    coord.add_argument('--no-shuffle', dest='shuffle', action='store_false',
+                       help='Disable shuffling cameras before selection')
+    coord.add_argument('--stall-threshold', type=float, default=5.0,
+                       help='Seconds without frames before a connected stream is marked stalled')
+    coord.add_argument('--stall-reconnect', type=float, default=None,
+                       help='Force a reconnect after this many seconds without frames (disabled by default)')
+    coord.add_argument('--loop', choices=LOOP_BACKENDS, default='auto',
+                       help='Event loop backend (default: auto)')
+    coord.add_argument('--client', choices=CLIENT_TYPES, default='aiohttp',
+                       help='Stream transport used by the agents (default: aiohttp)')
+    coord.add_argument('--decode-sample', type=int, default=0,
+                       help='Agents decode 1 in N frames per stream with OpenCV (default: off)')
+    coord.add_argument('--decode-workers', type=int, default=2,
+                       help='Decoder threads per agent for --decode-sample (default: 2)')
+    coord.add_argument('--slow-viewers', type=float, default=0.0,
+                       help='Fraction of streams read at --slow-viewer-rate (default: 0)')
+    coord.add_argument('--slow-viewer-rate', type=float, default=128.0,
+                       help='Read rate of slow viewers in KB/s (default: 128)')
+    coord.add_argument('--ramp', choices=RAMP_MODES, default='none',
+                       help='Connection ramp-up across all agents: none, linear, rate or step (default: none)')
+    coord.add_argument('--ramp-seconds', type=float, default=0, help='linear: seconds over which all streams start')
+    coord.add_argument('--ramp-rate', type=float, default=0, help='rate: new connections per second (all agents)')
+    coord.add_argument('--ramp-step', type=int, default=0, help='Streams per step (all agents)')
+    coord.add_argument('--ramp-hold', type=float, default=0, help='Seconds to hold after each step')
+    coord.add_argument('--lag-threshold', type=float, default=LAG_THRESHOLD_MS,
+                       help=f'Event loop lag (ms) on any agent that marks a second as tester-saturated '
+                            f'(default: {LAG_THRESHOLD_MS:g})')
+    coord.add_argument('--tester-cpu-threshold', type=float, default=TESTER_CPU_THRESHOLD,
+                       help='CPU of the busiest local tester process (%% of one core) that marks a second as '
+                            f'tester-saturated (default: {TESTER_CPU_THRESHOLD:g})')
+    coord.add_argument('--inventory-ttl', type=float, default=DEFAULT_TTL,
+                       help=f'Seconds the cached camera inventory is used before revalidation (default: {DEFAULT_TTL:g})')
+    coord.add_argument('--offline', action='store_true',
+                       help='Use the cached camera inventory only, without calling the camera API')
+    coord.add_argument('--inventory-page-size', type=int, default=0,
+                       help='Fetch the camera list in pages of this many cameras (default: one request)')
+    coord.add_argument('--fault-scenario',
+                       help='Agents route their streams through the fault-injection proxy with the rules '
+                            'in this scenario file (see fault_proxy.py)')
+    coord.set_defaults(shuffle=True)
+
+    agent = subparsers.add_parser('agent', help='Stream cameras assigned by a coordinator')
+    agent.add_argument('--coordinator', required=True, help='Coordinator address host:port')
+    agent.add_argument('--name', help='Agent name in the report (default: hostname-pid)')
+    agent.add_argument('--connect-timeout', type=float, default=120.0,
+                       help='Seconds to keep retrying the coordinator (default: 120)')
+    agent.add_argument('--loop', choices=LOOP_BACKENDS, default='auto',
+                       help='Event loop backend (default: auto)')
+
+    args = parser.parse_args()
+
+    if args.role == 'agent':
+        return await run_agent(args.coordinator, args.name, args.connect_timeout)
+
+    try:
+        ramp = RampSchedule(mode=args.ramp, ramp_seconds=args.ramp_seconds, rate=args.ramp_rate,
+                            step_size=args.ramp_step, step_hold=args.ramp_hold)
+        fault_scenario = load_scenario(args.fault_scenario) if args.fault_scenario else None
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    coordinator = LoadTestCoordinator(
+        expected_agents=args.agents,
+        listen_host=args.listen,
+        port=args.port,
+        api_url=args.api_url,
+        max_concurrent=args.max_streams,
+        test_duration=args.duration,
+        shuffle_cameras=args.shuffle,
+        prefix=args.prefix,
+        stall_threshold=args.stall_threshold,
+        stall_reconnect_after=args.stall_reconnect,
+        start_delay=args.start_delay,
+        join_timeout=args.join_timeout,
+        spawn_local=args.spawn_local,
+        loop_backend=args.loop,
+        client=args.client,
+        decode_sample_every=args.decode_sample,
+        decode_workers=args.decode_workers,
+        slow_viewer_fraction=args.slow_viewers,
+        slow_viewer_rate=args.slow_viewer_rate,
+        ramp=ramp,
+        lag_threshold_ms=args.lag_threshold,
+        tester_cpu_threshold=args.tester_cpu_threshold,
+        inventory_ttl=args.inventory_ttl,
+        offline=args.offline,
+        inventory_page_size=args.inventory_page_size,
+        fault_scenario=fault_scenario
+    )
+
+    report = await coordinator.run_load_test()
+    if "error" in report:
+        print(f"Test failed: {report['error']}")
+        return 1
+
+    filename = save_report(report, args.output)
+    if filename:
+        print(f"\n📄 Report saved to: {filename}")
+    print_summary(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_with_loop(main(), loop_backend_from_argv()))
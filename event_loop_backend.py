@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Event Loop Backend Selection
+============================
+
+Runs the load testers on the default asyncio loop or on uvloop.
+- uvloop is optional; "auto" uses it when installed, asyncio otherwise
+- Entry points read --loop before asyncio starts (argparse runs inside main())
+- The backend in use is recorded in reports
+
+Usage:
+    if __name__ == "__main__":
+        result = run_with_loop(main(), loop_backend_from_argv())
+
+    python camera_stream_load_test.py --loop uvloop
+    python tester_benchmark.py loop --streams 200
+"""
+
+import asyncio
+import sys
+from typing import List, Optional
+
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    uvloop = None
+    UVLOOP_AVAILABLE = False
+
+LOOP_BACKENDS = ("auto", "asyncio", "uvloop")
+
+
+def available_loop_backends() -> List[str]:
+    """Concrete backends that can run on this machine"""
+    return ["asyncio", "uvloop"] if UVLOOP_AVAILABLE else ["asyncio"]
+
+
+def resolve_loop_backend(backend: str = "auto") -> str:
+    """Map a requested backend to the one that will actually run"""
+    if backend == "auto":
+        return "uvloop" if UVLOOP_AVAILABLE else "asyncio"
+    if backend == "uvloop" and not UVLOOP_AVAILABLE:
+        print("Warning: uvloop is not installed (pip install uvloop), using asyncio")
+        return "asyncio"
+    if backend not in LOOP_BACKENDS:
+        print(f"Warning: Unknown loop backend '{backend}', using asyncio")
+        return "asyncio"
+    return backend
+
+
+def loop_backend_from_argv(argv: Optional[List[str]] = None, default: str = "auto") -> str:
+    """Read --loop VALUE or --loop=VALUE from the command line"""
+    argv = sys.argv[1:] if argv is None else argv
+    for i, arg in enumerate(argv):
+        if arg.startswith("--loop="):
+            return arg.split("=", 1)[1]
+        if arg == "--loop" and i + 1 < len(argv):
+            return argv[i + 1]
+    return default
+
+
+def run_with_loop(coro, backend: str = "auto"):
+    """asyncio.run() on the selected backend"""
+    backend = resolve_loop_backend(backend)
+    if backend == "uvloop":
+        if hasattr(asyncio, "Runner"):
+            with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+                return runner.run(coro)
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return asyncio.run(coro)
+
+
+def current_loop_backend() -> str:
+    """Backend of the running loop, for reports"""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return "none"
+    return "uvloop" if type(loop).__module__.startswith("uvloop") else "asyncio"
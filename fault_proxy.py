@@ -0,0 +1,683 @@
+#!/usr/bin/env python3
+"""
+Network Fault-Injection Proxy
+=============================
+
+TCP proxy between the tester and the camera servers that degrades the
+network reproducibly, to exercise the reconnect and backoff logic of
+stream_camera.
+- Faults come from rules in a scenario file: latency and jitter,
+  bandwidth caps, loss-like stalls (a chunk is held back as if it were
+  retransmitted), periodic stalls, blackholes (nothing forwarded, the
+  connection stays open) and connection resets (RST)
+- A rule applies to all connections, or to some cameras (IDs, or a regex
+  on the request path), and optionally only in a time window (seconds
+  since the proxy started); overlapping rules combine
+- Forwarding uses asyncio protocols with a release-time queue per
+  direction; data without a delay is written straight through, and a
+  full queue or a slow receiver pauses reading from the sender
+  (backpressure instead of unbounded buffering)
+- Standalone: one listener forwarding to one upstream, the camera is taken
+  from the request path. In-process: the tester gives every camera its own
+  listener on 127.0.0.1 and rewrites the fr_url (TLS passes through), and
+  the proxy runs on its own thread and event loop
+
+Usage:
+    python fault_proxy.py --listen 127.0.0.1:9000 --upstream 127.0.0.1:8080 --scenario scenario.json
+    python camera_stream_load_test.py --fault-scenario scenario.json
+
+Scenario file:
+    {"listen": "127.0.0.1:9000", "upstream": "127.0.0.1:8080", "seed": 1,
+     "rules": [
+        {"name": "slow-link", "cameras": [1, 2, 3], "latency_ms": 200, "jitter_ms": 50, "bandwidth_kbps": 512},
+        {"name": "lossy", "path": "^/fr/1[0-9]$", "loss": 0.02, "loss_stall_ms": 400},
+        {"name": "outage", "start": 60, "end": 90, "reset": true},
+        {"name": "flaky", "cameras": [7], "reset_after": 30}]}
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import socket
+import struct
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, fields
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from event_loop_backend import LOOP_BACKENDS, UVLOOP_AVAILABLE, run_with_loop, uvloop
+from tester_logging import LOG_FORMAT
+
+READ_LIMIT = 64 * 1024  # Largest piece released at once under a bandwidth cap
+MAX_QUEUED = 1024 * 1024  # Bytes held per direction before the sender is paused
+MAX_REQUEST_HEAD = 16 * 1024
+CHECK_INTERVAL = 0.1  # Seconds between reset checks
+FOREVER = 86400.0  # Hold time for an open-ended blackhole
+CAMERA_PATTERN = r'(\d+)/?$'  # Camera ID: last numeric path segment
+
+TLS_HANDSHAKE = 0x16
+# Counters merged across shard workers and agents (stats deltas)
+FAULT_COUNTERS = ("connections", "refused", "resets", "upstream_errors", "stalls", "loss_stalls",
+                  "bytes_up", "bytes_down")
+
+logger = logging.getLogger("fault_proxy")
+
+
+@dataclass
+class FaultRule:
+    """One scenario rule; unset faults are off"""
+    name: str = ""
+    cameras: Optional[List[int]] = None  # None: every connection
+    path: Optional[str] = None  # Regex on the request path (plain HTTP)
+    start: float = 0.0  # Window, seconds since the proxy started
+    end: Optional[float] = None
+    latency_ms: float = 0.0  # Added to every chunk, both directions
+    jitter_ms: float = 0.0  # +- on top of latency_ms
+    bandwidth_kbps: float = 0.0  # Per connection and direction, 0 is uncapped
+    loss: float = 0.0  # Per-chunk probability of a retransmission-like stall
+    loss_stall_ms: float = 300.0
+    stall_every: float = 0.0  # Mean seconds between stalls per connection, 0 disables
+    stall_seconds: float = 5.0
+    blackhole: bool = False  # Forward nothing in the window, connections stay open
+    reset: bool = False  # Reset connections in the window, new ones at once
+    reset_after: float = 0.0  # Mean seconds before each connection is reset, 0 disables
+
+    def __post_init__(self):
+        self._path = re.compile(self.path) if self.path else None
+
+    def matches(self, camera_id: Optional[int], path: Optional[str]) -> bool:
+        if self.cameras is not None and camera_id not in self.cameras:
+            return False
+        if self._path is not None and (path is None or not self._path.search(path)):
+            return False
+        return True
+
+    def active(self, elapsed: float) -> bool:
+        return self.start <= elapsed and (self.end is None or elapsed < self.end)
+
+
+@dataclass
+class Faults:
+    """Active rules of one connection combined: delays add up, the tightest cap wins"""
+    latency: float = 0.0  # Seconds
+    jitter: float = 0.0
+    bandwidth: float = 0.0  # Bytes per second, 0 is uncapped
+    loss: float = 0.0
+    loss_stall: float = 0.0
+    stall_every: float = 0.0
+    stall_seconds: float = 0.0
+    blackhole_until: float = 0.0  # Elapsed seconds
+    reset: bool = False
+
+    @property
+    def delays(self) -> bool:
+        return bool(self.latency or self.jitter or self.bandwidth or self.loss
+                    or self.stall_every or self.blackhole_until)
+
+
+def combine_rules(rules: List[FaultRule]) -> Faults:
+    faults = Faults()
+    for rule in rules:
+        faults.latency += rule.latency_ms / 1000
+        faults.jitter += rule.jitter_ms / 1000
+        if rule.bandwidth_kbps:
+            rate = rule.bandwidth_kbps * 1000 / 8
+            faults.bandwidth = min(faults.bandwidth, rate) if faults.bandwidth else rate
+        if rule.loss > faults.loss:
+            faults.loss, faults.loss_stall = rule.loss, rule.loss_stall_ms / 1000
+        if rule.stall_every and not faults.stall_every:
+            faults.stall_every, faults.stall_seconds = rule.stall_every, rule.stall_seconds
+        if rule.blackhole:
+            faults.blackhole_until = max(faults.blackhole_until,
+                                         rule.end if rule.end is not None else FOREVER)
+        faults.reset = faults.reset or rule.reset
+    return faults
+
+
+def load_scenario(scenario) -> Dict:
+    """Scenario dict from a JSON file path (or a dict, as shipped to workers)"""
+    if isinstance(scenario, str):
+        with open(scenario, encoding="utf-8") as f:
+            scenario = json.load(f)
+    known = {f.name for f in fields(FaultRule)}
+    for rule in scenario.get("rules", []):
+        unknown = set(rule) - known
+        if unknown:
+            raise ValueError(f"Unknown fault rule keys: {', '.join(sorted(unknown))}")
+    return scenario
+
+
+def parse_address(address: str, default_port: int = 80) -> Tuple[str, int]:
+    host, _, port = address.rpartition(':')
+    if not host:
+        return port, default_port
+    return host.strip('[]'), int(port)
+
+
+def _abort_with_reset(transport: asyncio.Transport) -> None:
+    """Close with an RST instead of a FIN"""
+    sock = transport.get_extra_info('socket')
+    if sock is not None:
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+        except OSError:
+            pass
+    transport.abort()
+
+
+class _Pipe:
+    """One direction of a proxied connection: delays, caps and backpressure"""
+
+    def __init__(self, connection: "_Connection", name: str):
+        self.connection = connection
+        self.name = name  # "up" (to the server) or "down" (to the tester)
+        self.source: Optional[asyncio.Transport] = None
+        self.target: Optional[asyncio.Transport] = None
+        self.queue: deque = deque()  # (release loop time, data)
+        self.queued = 0
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.last_release = 0.0
+        self.bandwidth_free_at = 0.0
+        self.target_paused = False
+        self.source_paused = False
+        self.close_when_drained = False
+
+    def send(self, data: bytes) -> None:
+        connection = self.connection
+        loop = connection.proxy.loop
+        now = loop.time()
+        faults = connection.faults(now)
+        if faults.reset:
+            connection.reset("window")
+            return
+        connection.proxy.stats[f"bytes_{self.name}"] += len(data)
+        if not faults.delays and not self.queue:
+            if not self.target.is_closing():
+                self.target.write(data)
+            return
+
+        release = now
+        if faults.latency or faults.jitter:
+            release += max(0.0, faults.latency + connection.rng.uniform(-faults.jitter, faults.jitter))
+        release = max(release, connection.stall_until(now, faults))
+        if faults.blackhole_until:
+            release = max(release, connection.proxy.start_time + faults.blackhole_until)
+        if faults.bandwidth:
+            pieces = [data[i:i + READ_LIMIT] for i in range(0, len(data), READ_LIMIT)]
+            for piece in pieces:
+                start = max(release, self.bandwidth_free_at)
+                self.bandwidth_free_at = start + len(piece) / faults.bandwidth
+                self._enqueue(self.bandwidth_free_at, piece)
+        else:
+            self._enqueue(release, data)
+
+    def _enqueue(self, release: float, data: bytes) -> None:
+        release = max(release, self.last_release)  # Bytes stay in order
+        self.last_release = release
+        self.queue.append((release, data))
+        self.queued += len(data)
+        if self.timer is None:
+            self.timer = self.connection.proxy.loop.call_at(release, self._release)
+        self._update_source()
+
+    def _release(self) -> None:
+        self.timer = None
+        now = self.connection.proxy.loop.time()
+        while self.queue and self.queue[0][0] <= now:
+            _, data = self.queue.popleft()
+            self.queued -= len(data)
+            if self.target is not None and not self.target.is_closing():
+                self.target.write(data)
+        if self.queue:
+            self.timer = self.connection.proxy.loop.call_at(self.queue[0][0], self._release)
+        elif self.close_when_drained and self.target is not None:
+            self.target.close()
+        self._update_source()
+
+    def _update_source(self) -> None:
+        if self.source is None or self.source.is_closing():
+            return
+        if self.source_paused:
+            if not self.target_paused and self.queued <= MAX_QUEUED // 2:
+                self.source.resume_reading()
+                self.source_paused = False
+        elif self.target_paused or self.queued > MAX_QUEUED:
+            self.source.pause_reading()
+            self.source_paused = True
+
+    def set_target_paused(self, paused: bool) -> None:
+        self.target_paused = paused
+        self._update_source()
+
+    def finish(self) -> None:
+        """Sender is gone: close the target after the queued bytes"""
+        if not self.queue and self.target is not None:
+            self.target.close()
+        else:
+            self.close_when_drained = True
+
+    def cancel(self) -> None:
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        self.queue.clear()
+        self.queued = 0
+
+
+class _UpstreamProtocol(asyncio.Protocol):
+    def __init__(self, connection: "_Connection"):
+        self.connection = connection
+
+    def connection_made(self, transport):
+        self.connection.upstream_made(transport)
+
+    def data_received(self, data):
+        self.connection.down.send(data)
+
+    def eof_received(self):
+        self.connection.down.finish()
+        return True
+
+    def connection_lost(self, exc):
+        self.connection.down.finish()
+
+    def pause_writing(self):
+        self.connection.up.set_target_paused(True)
+
+    def resume_writing(self):
+        self.connection.up.set_target_paused(False)
+
+
+class _Connection(asyncio.Protocol):
+    """Client side of one proxied connection"""
+
+    def __init__(self, proxy: "FaultProxy", listener: "Listener"):
+        self.proxy = proxy
+        self.listener = listener
+        self.rng = random.Random(proxy.rng.random())
+        self.camera_id = listener.camera_id
+        self.path: Optional[str] = None
+        self.client: Optional[asyncio.Transport] = None
+        self.upstream: Optional[asyncio.Transport] = None
+        self.up = _Pipe(self, "up")
+        self.down = _Pipe(self, "down")
+        self.head = b''
+        self.rules: List[FaultRule] = []
+        self._faults_key: Optional[Tuple] = None
+        self._faults = Faults()
+        self.reset_at = 0.0
+        self.next_stall = 0.0
+        self.stalled_until = 0.0
+        self.closed = False
+
+    # Client transport
+
+    def connection_made(self, transport):
+        self.client = transport
+        self.up.source = transport
+        self.down.target = transport
+        self.proxy.connections.add(self)
+        self.proxy.stats["connections"] += 1
+        self.proxy.stats["active_connections"] += 1
+
+    def data_received(self, data):
+        if self.upstream is not None:
+            self.up.send(data)
+            return
+        self.head += data
+        if self.head[0] != TLS_HANDSHAKE and b'\r\n\r\n' not in self.head and len(self.head) < MAX_REQUEST_HEAD:
+            return  # Wait for the whole request head of a plain HTTP request
+        self.client.pause_reading()
+        if self.head[0] != TLS_HANDSHAKE:
+            self.head = self._rewrite_head(self.head)
+        self._match()
+        if self.faults(self.proxy.loop.time()).reset:
+            self.proxy.stats["refused"] += 1
+            self.reset("window")
+            return
+        self.proxy.loop.create_task(self._connect_upstream())
+
+    def eof_received(self):
+        self.up.finish()
+        return True
+
+    def connection_lost(self, exc):
+        self.closed = True
+        self.up.finish()
+        self.down.cancel()
+        if self in self.proxy.connections:
+            self.proxy.connections.discard(self)
+            self.proxy.stats["active_connections"] -= 1
+
+    def pause_writing(self):
+        self.down.set_target_paused(True)
+
+    def resume_writing(self):
+        self.down.set_target_paused(False)
+
+    # Setup
+
+    def _rewrite_head(self, head: bytes) -> bytes:
+        """Take the path for rule matching; point Host at the upstream when it was rewritten"""
+        line_end = head.find(b'\r\n')
+        parts = head[:line_end].split(b' ')
+        if len(parts) >= 2:
+            self.path = urlsplit(parts[1].decode('latin-1')).path
+            if self.camera_id is None:
+                match = self.proxy.camera_pattern.search(self.path)
+                self.camera_id = int(match.group(1)) if match else None
+        host = self.listener.host_header
+        if host is None:
+            return head
+        return re.sub(rb'(?im)^host:[^\r\n]*', b'Host: ' + host.encode('latin-1'), head, count=1)
+
+    def _match(self) -> None:
+        self.rules = [rule for rule in self.proxy.rules if rule.matches(self.camera_id, self.path)]
+        for rule in self.rules:
+            self.proxy.stats["rule_connections"][rule.name] = \
+                self.proxy.stats["rule_connections"].get(rule.name, 0) + 1
+        reset_after = next((rule.reset_after for rule in self.rules if rule.reset_after), 0.0)
+        if reset_after:
+            self.reset_at = self.proxy.loop.time() + self.rng.expovariate(1 / reset_after)
+
+    async def _connect_upstream(self) -> None:
+        host, port = self.listener.upstream
+        try:
+            await self.proxy.loop.create_connection(lambda: _UpstreamProtocol(self), host, port)
+        except OSError as e:
+            self.proxy.stats["upstream_errors"] += 1
+            logger.debug(f"Upstream {host}:{port} failed: {e}")
+            if self.client is not None:
+                self.client.close()
+
+    def upstream_made(self, transport) -> None:
+        if self.closed:
+            transport.close()
+            return
+        self.upstream = transport
+        self.up.target = transport
+        self.down.source = transport
+        head, self.head = self.head, b''
+        self.up.send(head)
+        self.client.resume_reading()
+
+    # Faults
+
+    def faults(self, now: float) -> Faults:
+        """Combined faults of the rules active now (recombined only when that set changes)"""
+        elapsed = now - self.proxy.start_time
+        active = tuple(i for i, rule in enumerate(self.rules) if rule.active(elapsed))
+        if active != self._faults_key:
+            self._faults_key = active
+            self._faults = combine_rules([self.rules[i] for i in active])
+        return self._faults
+
+    def stall_until(self, now: float, faults: Faults) -> float:
+        """End of the current stall, starting a periodic or loss stall when one is due"""
+        if faults.stall_every:
+            if not self.next_stall:
+                self.next_stall = now + self.rng.expovariate(1 / faults.stall_every)
+            elif now >= self.next_stall:
+                self.proxy.stats["stalls"] += 1
+                self.stalled_until = now + faults.stall_seconds
+                self.next_stall = self.stalled_until + self.rng.expovariate(1 / faults.stall_every)
+        if faults.loss and self.rng.random() < faults.loss:
+            self.proxy.stats["loss_stalls"] += 1
+            self.stalled_until = max(self.stalled_until, now + faults.loss_stall)
+        return self.stalled_until
+
+    def reset(self, reason: str) -> None:
+        if self.closed:
+            return
+        self.proxy.stats["resets"] += 1
+        self.up.cancel()
+        self.down.cancel()
+        for transport in (self.client, self.upstream):
+            if transport is not None and not transport.is_closing():
+                _abort_with_reset(transport)
+        logger.debug(f"Camera {self.camera_id}: connection reset ({reason})")
+
+
+@dataclass
+class Listener:
+    """One listening address and where its connections go"""
+    upstream: Tuple[str, int]
+    camera_id: Optional[int] = None  # Known camera (in-process listeners), else taken from the path
+    host_header: Optional[str] = None  # Host header sent upstream, None keeps the client's
+    server: Optional[asyncio.AbstractServer] = None
+    port: int = 0
+
+
+class FaultProxy:
+    """Listeners, scenario rules and counters; runs on one event loop"""
+
+    def __init__(self, scenario=None):
+        """
+        Args:
+            scenario: Scenario dict or JSON file path (see module docstring)
+        """
+        self.scenario = load_scenario(scenario or {})
+        self.rules = [FaultRule(**rule) for rule in self.scenario.get("rules", [])]
+        for i, rule in enumerate(self.rules):
+            rule.name = rule.name or f"rule-{i + 1}"
+        self.camera_pattern = re.compile(self.scenario.get("camera_pattern", CAMERA_PATTERN))
+        self.rng = random.Random(self.scenario.get("seed"))
+        self.listeners: List[Listener] = []
+        self.connections: set = set()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.start_time = 0.0
+        self._checker: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._thread_task: Optional[asyncio.Task] = None
+        self.stats = new_fault_stats()
+
+    async def start(self, origin: Optional[float] = None) -> None:
+        """Start the clock and the reset checks on the running loop
+
+        Args:
+            origin: Epoch time rule windows count from (default: now), so
+                    proxies in several workers share one schedule
+        """
+        self.loop = asyncio.get_running_loop()
+        self.start_time = self.loop.time() - (max(0.0, time.time() - origin) if origin else 0.0)
+        self._checker = asyncio.create_task(self._check_resets())
+
+    async def add_listener(self, upstream: Tuple[str, int], host: str = '127.0.0.1', port: int = 0,
+                           camera_id: Optional[int] = None, host_header: Optional[str] = None) -> Listener:
+        listener = Listener(upstream, camera_id, host_header)
+        listener.server = await self.loop.create_server(
+            lambda: _Connection(self, listener), host, port, backlog=1024
+        )
+        listener.port = listener.server.sockets[0].getsockname()[1]
+        self.listeners.append(listener)
+        return listener
+
+    async def close(self) -> None:
+        if self._checker is not None:
+            self._checker.cancel()
+        for listener in self.listeners:
+            listener.server.close()
+        for connection in list(self.connections):
+            if connection.client is not None:
+                connection.client.abort()
+            if connection.upstream is not None:
+                connection.upstream.abort()
+
+    async def _check_resets(self) -> None:
+        """Reset connections whose reset_after is due or that entered a reset window"""
+        while True:
+            await asyncio.sleep(CHECK_INTERVAL)
+            now = self.loop.time()
+            for connection in list(self.connections):
+                if connection.reset_at and now >= connection.reset_at:
+                    connection.reset("reset_after")
+                elif connection.rules and connection.faults(now).reset:
+                    connection.reset("window")
+
+    def snapshot(self) -> Dict:
+        """Counters (thread-safe enough for reporting: plain ints and a copied dict)"""
+        stats = dict(self.stats)
+        stats["rule_connections"] = dict(stats["rule_connections"])
+        return stats
+
+    # In-process use (own thread and event loop)
+
+    def start_thread(self, routes: List[Tuple[int, str]], origin: Optional[float] = None) -> Dict[int, int]:
+        """Run the proxy on a background thread with one listener per camera
+
+        Args:
+            routes: (camera ID, upstream host:port) pairs
+            origin: Epoch time rule windows count from (default: now)
+        Returns:
+            Camera ID -> local listener port
+        """
+        ready = threading.Event()
+        ports: Dict[int, int] = {}
+        failure: List[BaseException] = []
+
+        async def main():
+            try:
+                await self.start(origin)
+                for camera_id, netloc in routes:
+                    listener = await self.add_listener(parse_address(netloc), camera_id=camera_id,
+                                                       host_header=netloc)
+                    ports[camera_id] = listener.port
+            except BaseException as e:
+                failure.append(e)
+                raise
+            finally:
+                ready.set()
+            await asyncio.Event().wait()  # Until the loop is stopped
+
+        def run():
+            loop = uvloop.new_event_loop() if UVLOOP_AVAILABLE else asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            task = self._thread_task = loop.create_task(main())
+            try:
+                loop.run_until_complete(task)
+            except (asyncio.CancelledError, Exception):
+                pass
+            finally:
+                loop.run_until_complete(self.close())
+                loop.close()
+
+        self._thread = threading.Thread(target=run, name="fault-proxy", daemon=True)
+        self._thread.start()
+        ready.wait()
+        if failure:
+            raise failure[0]
+        return ports
+
+    def stop_thread(self) -> None:
+        """Close the listeners and connections and end the thread"""
+        if self._thread is None:
+            return
+        self.loop.call_soon_threadsafe(self._thread_task.cancel)
+        self._thread.join(timeout=5)
+        self._thread = None
+
+
+def new_fault_stats() -> Dict:
+    """Zeroed proxy counters"""
+    stats = {name: 0 for name in FAULT_COUNTERS}
+    stats["active_connections"] = 0
+    stats["rule_connections"] = {}
+    return stats
+
+
+def route_cameras(cameras: List[Dict], scenario,
+                  origin: Optional[float] = None) -> Tuple[FaultProxy, List[Dict]]:
+    """Start an in-process proxy and return copies of ``cameras`` whose fr_url goes through it"""
+    proxy = FaultProxy(scenario)
+    routes = []
+    for camera in cameras:
+        url = urlsplit(camera['fr_url'])
+        default_port = 443 if url.scheme == 'https' else 80
+        routes.append((camera['id'], f"{url.hostname}:{url.port or default_port}"))
+    ports = proxy.start_thread(routes, origin)
+    routed = []
+    for camera in cameras:
+        url = urlsplit(camera['fr_url'])
+        routed.append(dict(camera, fr_url=url._replace(netloc=f"127.0.0.1:{ports[camera['id']]}").geturl()))
+    return proxy, routed
+
+
+def fault_proxy_summary(stats: Dict, scenario: Dict) -> Dict:
+    """Report section"""
+    return {
+        "rules": [rule.get("name") or f"rule-{i + 1}" for i, rule in enumerate(scenario.get("rules", []))],
+        "connections": stats["connections"],
+        "refused": stats["refused"],
+        "resets": stats["resets"],
+        "upstream_errors": stats["upstream_errors"],
+        "stalls": stats["stalls"],
+        "loss_stalls": stats["loss_stalls"],
+        "mb_to_tester": round(stats["bytes_down"] / 1024**2, 1),
+        "mb_to_server": round(stats["bytes_up"] / 1024**2, 3),
+        "rule_connections": stats["rule_connections"]
+    }
+
+
+async def run_standalone(scenario: Dict, listen: str, upstream: str, stats_interval: float) -> None:
+    proxy = FaultProxy(scenario)
+    await proxy.start()
+    host, port = parse_address(listen)
+    await proxy.add_listener(parse_address(upstream), host, port)
+    logger.info(f"Proxying {listen} -> {upstream} with {len(proxy.rules)} rules: "
+                f"{', '.join(rule.name for rule in proxy.rules) or 'none'}")
+    try:
+        while True:
+            await asyncio.sleep(stats_interval if stats_interval > 0 else 3600)
+            if stats_interval > 0:
+                stats = proxy.snapshot()
+                logger.info(
+                    f"connections {stats['active_connections']:,} active / {stats['connections']:,} total | "
+                    f"resets {stats['resets']:,} (refused {stats['refused']:,}) | "
+                    f"stalls {stats['stalls']:,} + {stats['loss_stalls']:,} loss | "
+                    f"{stats['bytes_down'] / 1024**2:,.1f} MB to tester"
+                )
+    finally:
+        await proxy.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Network fault-injection TCP proxy')
+    parser.add_argument('--scenario', help='Scenario JSON file (rules, and optionally listen/upstream)')
+    parser.add_argument('--listen', help='Listen address host:port (default: scenario "listen" or 127.0.0.1:9000)')
+    parser.add_argument('--upstream', help='Upstream camera server host:port (default: scenario "upstream")')
+    parser.add_argument('--loop', choices=LOOP_BACKENDS, default='auto', help='Event loop backend (default: auto)')
+    parser.add_argument('--stats-interval', type=float, default=10.0,
+                        help='Seconds between counter log lines, 0 disables (default: 10)')
+    parser.add_argument('--verbose', action='store_true', help='Log every reset')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, format=LOG_FORMAT)
+
+    try:
+        scenario = load_scenario(args.scenario) if args.scenario else {}
+        [FaultRule(**rule) for rule in scenario.get("rules", [])]
+    except (OSError, ValueError, TypeError, re.error) as e:
+        parser.error(str(e))
+    listen = args.listen or scenario.get("listen", "127.0.0.1:9000")
+    upstream = args.upstream or scenario.get("upstream")
+    if not upstream:
+        parser.error("--upstream (or \"upstream\" in the scenario) is required")
+
+    try:
+        run_with_loop(run_standalone(scenario, listen, upstream, args.stats_interval), args.loop)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Sampled Frame Decoding
+======================
+
+Checks what the server actually sends by decoding 1-in-N frames per stream.
+- The parser only buffers sampled frame bodies; all other parts stay on the
+  skip fast path
+- Sampled JPEGs are decoded with cv2.imdecode on a small thread pool (OpenCV
+  releases the GIL while decoding), never on the event loop
+- Per stream: resolution, resolution changes, decode time and a sharpness
+  score (variance of the Laplacian; flat or gray frames score near 0)
+- When the pool falls behind, new samples are dropped and counted instead of
+  queueing, so the streaming loop never waits for the decoder
+
+Usage:
+    sampler = FrameDecodeSampler(sample_every=30, workers=2)
+    sampler.attach(parser, stats)   # per stream, before reading
+    ...
+    sampler.close()
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+try:
+    import cv2
+    import numpy as np
+    CV2_AVAILABLE = True
+except ImportError:
+    cv2 = None
+    np = None
+    CV2_AVAILABLE = False
+
+from multipart_stream_parser import MultipartFrameParser
+from latency_histogram import LatencyHistogram
+
+LOW_SHARPNESS = 10.0  # Laplacian variance below this looks like a flat/gray frame
+
+
+def decode_frame(data: bytes) -> Optional[Tuple[int, int, float, float]]:
+    """Decode one JPEG; returns (width, height, decode seconds, sharpness) or None"""
+    start = time.perf_counter()
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+    decode_time = time.perf_counter() - start
+    if image is None:
+        return None
+
+    height, width = image.shape[:2]
+    laplacian = cv2.Laplacian(image, cv2.CV_16S)
+    _, stddev = cv2.meanStdDev(laplacian)
+    return width, height, decode_time, float(stddev[0][0]) ** 2
+
+
+class FrameDecodeSampler:
+    """Decodes every Nth frame of each stream on a bounded thread pool"""
+
+    def __init__(self, sample_every: int = 30, workers: int = 2, max_pending: Optional[int] = None):
+        """
+        Args:
+            sample_every: Decode one in this many frames per stream
+            workers: Decoder threads
+            max_pending: Samples queued or decoding before new ones are dropped
+                         (default: 4 per worker)
+        """
+        if not CV2_AVAILABLE:
+            raise RuntimeError("Frame sampling needs OpenCV (pip install opencv-python)")
+
+        self.sample_every = max(1, sample_every)
+        self.workers = max(1, workers)
+        self.max_pending = max_pending or self.workers * 4
+        self.pending = 0
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="frame-decode")
+
+    def attach(self, parser: MultipartFrameParser, stats) -> None:
+        """Route sampled frames of one stream's parser into the pool"""
+        # Stagger streams so their samples do not all land on the same frame
+        countdown = stats.camera_id % self.sample_every + 1
+
+        def want_frame() -> bool:
+            nonlocal countdown
+            countdown -= 1
+            if countdown:
+                return False
+            countdown = self.sample_every
+            if self.pending >= self.max_pending:
+                stats.decode_dropped += 1
+                return False
+            return True
+
+        def on_frame(payload: memoryview) -> None:
+            if self.pending >= self.max_pending:
+                stats.decode_dropped += 1
+                return
+            self._submit(stats, bytes(payload))
+
+        parser.want_frame = want_frame
+        parser.on_frame = on_frame
+
+    def _submit(self, stats, data: bytes) -> None:
+        """Queue a copied frame for decoding; the result is applied on the loop"""
+        self.pending += 1
+        future = asyncio.get_running_loop().run_in_executor(self._executor, decode_frame, data)
+        future.add_done_callback(lambda f: self._apply(stats, f))
+
+    def _apply(self, stats, future: asyncio.Future) -> None:
+        """Record one decode result into the stream's stats"""
+        self.pending -= 1
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            stats.decode_failures += 1
+            return
+        result = future.result()
+        if result is None:
+            stats.decode_failures += 1
+            return
+
+        width, height, decode_time, sharpness = result
+        if stats.frame_width and (width, height) != (stats.frame_width, stats.frame_height):
+            stats.resolution_changes += 1
+        stats.frame_width = width
+        stats.frame_height = height
+        stats.decoded_frames += 1
+        stats.decode_times.record(decode_time)
+        stats.sharpness_total += sharpness
+        stats.last_sharpness = round(sharpness, 2)
+
+    def close(self) -> None:
+        """Stop the pool without waiting for queued samples"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def frame_decode_summary(streams, sample_every: int, workers: int) -> Dict:
+    """Report section over all streams' decode stats"""
+    streams = list(streams)
+    decoded = sum(s.decoded_frames for s in streams)
+    sharpness_total = sum(s.sharpness_total for s in streams)
+    resolutions: Dict[str, int] = {}
+    for s in streams:
+        if s.frame_width:
+            key = f"{s.frame_width}x{s.frame_height}"
+            resolutions[key] = resolutions.get(key, 0) + 1
+
+    return {
+        "sample_every": sample_every,
+        "decode_workers": workers,
+        "decoded_frames": decoded,
+        "dropped_samples": sum(s.decode_dropped for s in streams),
+        "decode_failures": sum(s.decode_failures for s in streams),
+        "decode_ms": LatencyHistogram.merged(s.decode_times for s in streams).summary_ms(),
+        "resolutions": resolutions,
+        "streams_with_resolution_changes": sum(1 for s in streams if s.resolution_changes),
+        "average_sharpness": round(sharpness_total / decoded, 2) if decoded else 0,
+        "low_sharpness_streams": sum(
+            1 for s in streams
+            if s.decoded_frames and s.sharpness_total / s.decoded_frames < LOW_SHARPNESS
+        )
+    }
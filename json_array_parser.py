@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Incremental JSON Array Parser
+=============================
+
+Parses a top-level JSON array as its bytes arrive, so a large camera
+inventory is filtered while it downloads instead of after json() has built
+the whole list.
+- Bytes go through an incremental UTF-8 decoder, so a character split
+  across chunks is fine
+- Each element is decoded with the C JSON scanner (``raw_decode``) once it
+  is complete; consumed text is dropped, so the parser only holds the
+  element in progress
+- An element that is still incomplete waits for the next chunk; elements
+  larger than MAX_ELEMENT_SIZE are treated as corrupt instead of buffering
+  the rest of the response. A number or literal is only taken once a
+  delimiter follows it, so ``1.`` + ``5`` is 1.5, not 1
+- Tracks the peak buffered text and the elements parsed
+
+Usage:
+    parser = JsonArrayParser()
+    async for chunk in response.content.iter_chunked(64 * 1024):
+        for camera in parser.feed(chunk):
+            ...
+    parser.close()  # Raises ValueError when the array is truncated
+"""
+
+import codecs
+import json
+import re
+from typing import Any, List
+
+MAX_ELEMENT_SIZE = 16 * 1024 * 1024  # Characters of one pending element
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_NUMBER_TAIL = re.compile(r'[0-9.eE+-]*\Z')  # Rest of the buffer could still extend a number
+
+# Parser states
+_START = 0  # Before '['
+_FIRST = 1  # After '[': an element or ']'
+_ELEMENT = 2  # After ',': an element
+_SEPARATOR = 3  # After an element: ',' or ']'
+_DONE = 4
+
+
+class JsonArrayParser:
+    """Yields the elements of a JSON array from chunks of its bytes"""
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._state = _START
+        self.elements = 0
+        self.peak_buffer = 0  # Characters held at once
+
+    @property
+    def done(self) -> bool:
+        """The closing ']' has been read"""
+        return self._state == _DONE
+
+    def feed(self, data: bytes) -> List[Any]:
+        """Elements completed by ``data``"""
+        self._buffer += self._text_decoder.decode(data)
+        self.peak_buffer = max(self.peak_buffer, len(self._buffer))
+        return self._parse(final=False)
+
+    def close(self) -> List[Any]:
+        """Elements left at the end of the response"""
+        self._buffer += self._text_decoder.decode(b"", final=True)
+        elements = self._parse(final=True)
+        if self._state != _DONE:
+            raise ValueError("JSON array ended before its closing ']'")
+        return elements
+
+    def _parse(self, final: bool) -> List[Any]:
+        buffer = self._buffer
+        pos = 0
+        elements = []
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos == len(buffer):
+                break
+            char = buffer[pos]
+
+            if self._state == _START:
+                if char == '\ufeff':  # Byte order mark
+                    pos += 1
+                    continue
+                if char != '[':
+                    raise ValueError(f"Expected a JSON array, got {buffer[pos:pos + 20]!r}")
+                self._state = _FIRST
+                pos += 1
+            elif self._state == _SEPARATOR or (self._state == _FIRST and char == ']'):
+                if char == ']':
+                    self._state = _DONE
+                elif char == ',' and self._state == _SEPARATOR:
+                    self._state = _ELEMENT
+                else:
+                    raise ValueError(f"Expected ',' or ']' at {buffer[pos:pos + 20]!r}")
+                pos += 1
+            elif self._state == _DONE:
+                raise ValueError(f"Unexpected data after the JSON array: {buffer[pos:pos + 20]!r}")
+            else:
+                try:
+                    element, end = self._decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if final:
+                        raise
+                    if len(buffer) - pos > MAX_ELEMENT_SIZE:
+                        raise ValueError(f"JSON array element larger than {MAX_ELEMENT_SIZE} characters")
+                    break  # Incomplete, wait for more data
+                if not final and not isinstance(element, (dict, list, str)) and _NUMBER_TAIL.match(buffer, end):
+                    break  # A number split after '.', 'e' or '-' (or a literal) may continue in the next chunk
+                elements.append(element)
+                self.elements += 1
+                self._state = _SEPARATOR
+                pos = end
+
+        self._buffer = buffer[pos:]
+        return elements
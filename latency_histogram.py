@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Fixed-Memory Latency Histogram
+==============================
+
+Log-bucketed histogram for frame inter-arrival times and other latencies.
+- Fixed number of buckets regardless of how many values are recorded
+- 8 buckets per power of two, percentiles within ~5% of the exact value
+- Mergeable: combining N histograms costs O(buckets), not O(values)
+- Deltas: the values recorded since an earlier copy, for shipping between processes
+- Serialisable to a sparse dict for reports and for shipping between processes
+
+Usage:
+    hist = LatencyHistogram()
+    hist.record(0.066)
+    total = LatencyHistogram.merged([hist_a, hist_b])
+    total.summary_ms()  # {'count': ..., 'p50': ..., 'p95': ..., 'p99': ..., 'max': ...}
+"""
+
+import math
+from typing import Dict, Iterable, List, Optional
+
+MIN_VALUE = 0.0001        # 0.1 ms, smaller values land in bucket 0
+MAX_VALUE = 1000.0        # Larger values land in the last bucket
+BUCKETS_PER_DOUBLING = 8
+
+_LOG_GROWTH = math.log(2) / BUCKETS_PER_DOUBLING
+_BUCKET_COUNT = int(math.ceil(math.log(MAX_VALUE / MIN_VALUE) / _LOG_GROWTH)) + 2
+
+
+def _bucket_midpoint(index: int) -> float:
+    """Geometric midpoint of a bucket in seconds"""
+    if index == 0:
+        return 0.0
+    return MIN_VALUE * math.exp((index - 0.5) * _LOG_GROWTH)
+
+
+class LatencyHistogram:
+    """Histogram of durations in seconds with logarithmic buckets"""
+
+    __slots__ = ('counts', 'count', 'total', 'max_value')
+
+    def __init__(self):
+        self.counts: List[int] = [0] * _BUCKET_COUNT
+        self.count = 0
+        self.total = 0.0
+        self.max_value = 0.0
+
+    def record(self, value: float, times: int = 1) -> None:
+        """Record a duration (seconds) one or more times"""
+        if value <= MIN_VALUE:
+            index = 0
+        else:
+            index = int(math.log(value / MIN_VALUE) / _LOG_GROWTH) + 1
+            if index >= _BUCKET_COUNT:
+                index = _BUCKET_COUNT - 1
+        self.counts[index] += times
+        self.count += times
+        self.total += value * times
+        if value > self.max_value:
+            self.max_value = value
+
+    def merge(self, other: 'LatencyHistogram') -> 'LatencyHistogram':
+        """Add another histogram's counts into this one"""
+        counts = self.counts
+        for index, bucket_count in enumerate(other.counts):
+            if bucket_count:
+                counts[index] += bucket_count
+        self.count += other.count
+        self.total += other.total
+        self.max_value = max(self.max_value, other.max_value)
+        return self
+
+    def copy(self) -> 'LatencyHistogram':
+        """Independent copy of this histogram"""
+        result = LatencyHistogram()
+        result.counts = list(self.counts)
+        result.count = self.count
+        result.total = self.total
+        result.max_value = self.max_value
+        return result
+
+    def delta_since(self, earlier: 'LatencyHistogram') -> 'LatencyHistogram':
+        """Values recorded since ``earlier`` (a copy of this histogram).
+
+        max_value stays the running maximum, which merges correctly.
+        """
+        result = LatencyHistogram()
+        result.counts = [now - then for now, then in zip(self.counts, earlier.counts)]
+        result.count = self.count - earlier.count
+        result.total = self.total - earlier.total
+        result.max_value = self.max_value if result.count else 0.0
+        return result
+
+    @classmethod
+    def merged(cls, histograms: Iterable[Optional['LatencyHistogram']]) -> 'LatencyHistogram':
+        """Combine histograms into a new one"""
+        result = cls()
+        for hist in histograms:
+            if hist is not None:
+                result.merge(hist)
+        return result
+
+    def percentile(self, p: float) -> float:
+        """Approximate p-th percentile (0-100) in seconds"""
+        if self.count == 0:
+            return 0.0
+        rank = max(1, int(math.ceil(self.count * p / 100)))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return min(_bucket_midpoint(index), self.max_value)
+        return self.max_value
+
+    def summary_ms(self) -> Dict:
+        """Percentile summary in milliseconds for reports"""
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count * 1000, 2) if self.count else 0,
+            "p50": round(self.percentile(50) * 1000, 2),
+            "p95": round(self.percentile(95) * 1000, 2),
+            "p99": round(self.percentile(99) * 1000, 2),
+            "max": round(self.max_value * 1000, 2)
+        }
+
+    def to_dict(self) -> Dict:
+        """Sparse serialisable form (only non-empty buckets)"""
+        return {
+            "buckets": {str(i): c for i, c in enumerate(self.counts) if c},
+            "count": self.count,
+            "total": self.total,
+            "max": self.max_value
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'LatencyHistogram':
+        """Rebuild a histogram from to_dict() output"""
+        hist = cls()
+        for index, bucket_count in data.get("buckets", {}).items():
+            hist.counts[int(index)] = bucket_count
+        hist.count = data.get("count", 0)
+        hist.total = data.get("total", 0.0)
+        hist.max_value = data.get("max", 0.0)
+        return hist
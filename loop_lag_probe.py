@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Event-Loop Lag Probe
+====================
+
+Tells tester overload apart from server slowness. When the tester's own
+event loop falls behind, frames sit in socket buffers and look late, and
+the report would blame the server.
+- A probe task sleeps a short interval (10 ms) and measures how late it
+  wakes up with perf_counter; the lateness is the loop lag every stream
+  callback is seeing at that moment
+- Lag is kept as a fixed-memory histogram plus the worst lag per wall
+  second, so saturated seconds can be located
+- A second is saturated when the worst lag or the busiest tester process
+  (from the system sampler) goes over its threshold; runs with enough
+  saturated seconds are marked client-bound and the windows are listed
+
+Usage:
+    probe = LoopLagProbe()
+    task = asyncio.create_task(probe.run())
+    ...
+    saturation_summary(probe, tester.system_stats, start_time)
+"""
+
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+from latency_histogram import LatencyHistogram
+
+PROBE_INTERVAL = 0.01  # Seconds between wake-ups
+LAG_THRESHOLD_MS = 100.0  # Worst lag in a second above this saturates it
+TESTER_CPU_THRESHOLD = 90.0  # Busiest tester process above this (% of one core) saturates a second
+CLIENT_BOUND_MIN_SECONDS = 3
+CLIENT_BOUND_FRACTION = 0.05  # Share of the run that must be saturated
+MAX_REPORTED_WINDOWS = 20
+
+
+class LoopLagProbe:
+    """Measures how late the event loop runs a timer"""
+
+    def __init__(self, interval: float = PROBE_INTERVAL):
+        self.interval = interval
+        self.lag = LatencyHistogram()
+        self.worst_by_second: Dict[int, float] = {}  # Wall second -> worst lag (seconds)
+
+    async def run(self) -> None:
+        """Probe until cancelled"""
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - expected)
+            self.lag.record(lag)
+            self.merge_second(int(time.time()), lag)
+
+    def merge_second(self, second: int, lag: float) -> None:
+        """Keep the worst lag of ``second`` (also used for lag shipped by workers)"""
+        if lag > self.worst_by_second.get(second, -1.0):
+            self.worst_by_second[second] = lag
+
+
+def _longest(windows: List[Dict]) -> List[Dict]:
+    """The longest windows, in time order"""
+    longest = sorted(windows, key=lambda w: w["_first"] - w["_last"])[:MAX_REPORTED_WINDOWS]
+    return sorted(longest, key=lambda w: w["_first"])
+
+
+def saturation_summary(probe: LoopLagProbe, system_stats: List[Dict], start_time: float,
+                       lag_threshold_ms: float = LAG_THRESHOLD_MS,
+                       cpu_threshold: float = TESTER_CPU_THRESHOLD,
+                       end_time: Optional[float] = None) -> Dict:
+    """Report section: loop lag, saturated seconds and whether the run was client-bound"""
+    end_time = end_time or time.time()
+    first, last = int(start_time), int(end_time)
+    lag_seconds = {second for second, lag in probe.worst_by_second.items()
+                   if first <= second <= last and lag * 1000 > lag_threshold_ms}
+    cpu_by_second = {int(s['timestamp']): s.get('tester_peak_process_cpu_percent', 0) for s in system_stats}
+    cpu_seconds = {second for second, cpu in cpu_by_second.items()
+                   if first <= second <= last and cpu >= cpu_threshold}
+
+    windows: List[Dict] = []
+    for second in sorted(lag_seconds | cpu_seconds):
+        if windows and second - windows[-1]["_last"] <= 1:
+            window = windows[-1]
+        else:
+            window = {"_first": second, "reasons": set(), "max_lag_ms": 0.0, "peak_tester_cpu_percent": 0.0}
+            windows.append(window)
+        window["_last"] = second
+        if second in lag_seconds:
+            window["reasons"].add("loop_lag")
+        if second in cpu_seconds:
+            window["reasons"].add("tester_cpu")
+        window["max_lag_ms"] = max(window["max_lag_ms"], probe.worst_by_second.get(second, 0.0) * 1000)
+        window["peak_tester_cpu_percent"] = max(window["peak_tester_cpu_percent"], cpu_by_second.get(second, 0.0))
+
+    saturated = len(lag_seconds | cpu_seconds)
+    observed = last - first + 1
+    return {
+        "client_bound": saturated >= max(CLIENT_BOUND_MIN_SECONDS, observed * CLIENT_BOUND_FRACTION),
+        "lag_threshold_ms": lag_threshold_ms,
+        "tester_cpu_threshold_percent": cpu_threshold,
+        "loop_lag_ms": probe.lag.summary_ms(),
+        "saturated_seconds": saturated,
+        "saturated_percent": round(saturated / observed * 100, 1),
+        "windows": [
+            {
+                "start_second": window["_first"] - first,
+                "end_second": window["_last"] - first + 1,
+                "reasons": sorted(window["reasons"]),
+                "max_lag_ms": round(window["max_lag_ms"], 1),
+                "peak_tester_cpu_percent": round(window["peak_tester_cpu_percent"], 1)
+            }
+            for window in _longest(windows)
+        ]
+    }
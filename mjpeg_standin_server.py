@@ -0,0 +1,558 @@
+#!/usr/bin/env python3
+"""
+Local MJPEG Stand-In Server
+===========================
+
+Serves a camera inventory and MJPEG streams shaped like the production
+camera API, so every tester can be run and benchmarked offline.
+- GET /api/v1/camera/ returns the camera list (id, name, status, fr_url)
+  with the prefix, limit and offset query parameters and ETag /
+  If-None-Match revalidation
+- GET /fr/<id> streams multipart/x-mixed-replace at the camera's frame rate
+- Per camera: fps, frame size and spread, boundary, part Content-Length,
+  jitter, stalls, mid-stream disconnects and HTTP errors. Faults go to a
+  fraction of the cameras from the command line, or per camera from a
+  JSON profile file
+- Frames are pre-encoded multipart parts, one pool per (boundary, size)
+  shared by every stream; sending a frame is one transport.write() of a
+  pooled bytes object
+- One scheduler per process sends all due frames from a timing wheel
+  (5 ms slots) instead of one sleeping task per stream
+- A client that does not keep up loses frames (counted as dropped), like
+  behind a real camera server, instead of buffering without bound
+- --workers forks processes sharing the port (SO_REUSEPORT, Linux) after
+  the frame pools are built, so the pools are shared copy-on-write
+- --host-aliases spreads the fr_url hosts over 127.0.0.1..127.0.0.N, so
+  testers with a per-host connection limit (50 in CameraStreamLoadTester)
+  can open thousands of streams against one box
+
+Usage:
+    python mjpeg_standin_server.py --cameras 2000 --port 8080
+    python mjpeg_standin_server.py --cameras 5000 --workers 4 --host-aliases 100 --stall-fraction 0.05
+    python mjpeg_standin_server.py --profile cameras.json
+    python camera_stream_load_test.py --api-url http://127.0.0.1:8080/api/v1/camera/
+
+Profile file (all keys optional; "cameras" overrides single camera IDs):
+    {"defaults": {"fps": 10, "frame_size": 60000},
+     "cameras": {"7": {"stall_every": 30, "stall_seconds": 8}, "9": {"error_status": 503}}}
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import random
+import signal
+import sys
+from dataclasses import dataclass, fields, replace
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from event_loop_backend import LOOP_BACKENDS, run_with_loop
+from tester_logging import LOG_FORMAT
+
+API_PATH = '/api/v1/camera/'
+STREAM_PATH = '/fr/'
+POOL_FRAMES = 32  # Distinct frames per pool; streams cycle through them
+SLOT_SECONDS = 0.005  # Timing wheel resolution
+WHEEL_SLOTS = 4096  # ~20s per wheel turn; later frames wait for another turn
+MAX_WRITE_BUFFER = 512 * 1024  # Unsent bytes per client before frames are dropped
+MAX_REQUEST_HEAD = 16 * 1024
+
+HTTP_REASONS = {400: 'Bad Request', 404: 'Not Found', 429: 'Too Many Requests',
+                500: 'Internal Server Error', 502: 'Bad Gateway', 503: 'Service Unavailable',
+                504: 'Gateway Timeout'}
+
+logger = logging.getLogger("mjpeg_standin")
+
+
+@dataclass
+class CameraProfile:
+    """How one camera streams and fails"""
+    fps: float = 15.0
+    frame_size: int = 40000  # Mean JPEG size in bytes
+    frame_size_spread: float = 0.1  # Standard deviation as a share of frame_size
+    boundary: str = "frame"
+    content_length: bool = True  # Content-Length header on every part
+    jitter: float = 0.0  # Each frame interval varies by up to +- this share
+    stall_every: float = 0.0  # Mean seconds between stalls (connection stays open), 0 disables
+    stall_seconds: float = 10.0
+    disconnect_after: float = 0.0  # Mean seconds before the server closes the stream, 0 disables
+    error_status: int = 0  # HTTP status answered instead of the stream, 0 disables
+    error_probability: float = 1.0  # Share of requests answered with error_status
+    active: bool = True  # Inventory status 1
+
+
+def _profile_overrides(values: Dict) -> Dict:
+    known = {f.name for f in fields(CameraProfile)}
+    unknown = set(values) - known
+    if unknown:
+        raise ValueError(f"Unknown camera profile keys: {', '.join(sorted(unknown))}")
+    return values
+
+
+def build_profiles(count: int, defaults: CameraProfile, seed: int = 1,
+                   inactive_fraction: float = 0.0, stall_fraction: float = 0.0,
+                   disconnect_fraction: float = 0.0, error_fraction: float = 0.0,
+                   profile_file: Optional[str] = None) -> Dict[int, CameraProfile]:
+    """Profiles of cameras 1..count; fault fractions pick cameras with a seeded RNG
+
+    Args:
+        defaults: Profile of a healthy camera; stall/disconnect/error settings
+                  in it apply to the cameras picked by the fractions
+        profile_file: JSON with "defaults" and per-camera "cameras" overrides
+    """
+    overrides: Dict[str, Dict] = {}
+    if profile_file:
+        with open(profile_file, encoding="utf-8") as f:
+            config = json.load(f)
+        defaults = replace(defaults, **_profile_overrides(config.get("defaults", {})))
+        overrides = {str(key): _profile_overrides(value) for key, value in config.get("cameras", {}).items()}
+
+    healthy = replace(defaults, stall_every=0.0, disconnect_after=0.0, error_status=0)
+    rng = random.Random(seed)
+    camera_ids = list(range(1, count + 1))
+
+    def pick(fraction: float) -> set:
+        return set(rng.sample(camera_ids, round(count * fraction))) if fraction > 0 else set()
+
+    inactive, stalling = pick(inactive_fraction), pick(stall_fraction)
+    disconnecting, failing = pick(disconnect_fraction), pick(error_fraction)
+    profiles = {}
+    for camera_id in camera_ids:
+        profile = replace(
+            healthy,
+            active=camera_id not in inactive,
+            stall_every=defaults.stall_every if camera_id in stalling else 0.0,
+            disconnect_after=defaults.disconnect_after if camera_id in disconnecting else 0.0,
+            error_status=defaults.error_status if camera_id in failing else 0
+        )
+        if str(camera_id) in overrides:
+            profile = replace(profile, **overrides[str(camera_id)])
+        profiles[camera_id] = profile
+    return profiles
+
+
+def build_jpeg_payload(size: int, rng: random.Random) -> bytes:
+    """Random bytes framed by JPEG SOI/EOI markers"""
+    return b'\xff\xd8' + rng.randbytes(max(0, size - 4)) + b'\xff\xd9'
+
+
+def build_mjpeg_part(jpeg: bytes, boundary: bytes = b'frame', content_length: bool = True) -> bytes:
+    """One multipart part (boundary line, headers, JPEG body)"""
+    headers = b'Content-Type: image/jpeg\r\n'
+    if content_length:
+        headers += b'Content-Length: ' + str(len(jpeg)).encode() + b'\r\n'
+    return b'--' + boundary + b'\r\n' + headers + b'\r\n' + jpeg + b'\r\n'
+
+
+class FramePool:
+    """Pre-encoded multipart parts, one list per (boundary, size, spread, Content-Length)"""
+
+    def __init__(self, seed: int = 1234):
+        self.seed = seed
+        self._pools: Dict[Tuple, List[bytes]] = {}
+
+    @staticmethod
+    def key(profile: CameraProfile) -> Tuple:
+        return (profile.boundary, profile.frame_size, profile.frame_size_spread, profile.content_length)
+
+    def parts(self, profile: CameraProfile) -> List[bytes]:
+        key = self.key(profile)
+        pool = self._pools.get(key)
+        if pool is None:
+            rng = random.Random(f"{self.seed}-{key}")
+            boundary = profile.boundary.encode('latin-1')
+            pool = self._pools[key] = [
+                build_mjpeg_part(
+                    build_jpeg_payload(max(4, int(rng.gauss(profile.frame_size,
+                                                            profile.frame_size * profile.frame_size_spread))), rng),
+                    boundary, profile.content_length
+                )
+                for _ in range(POOL_FRAMES)
+            ]
+        return pool
+
+    @property
+    def size_bytes(self) -> int:
+        return sum(len(part) for pool in self._pools.values() for part in pool)
+
+
+class _Stream:
+    """One client stream in the timing wheel"""
+    __slots__ = ("transport", "profile", "parts", "index", "interval", "due", "slot",
+                 "next_stall", "stall_until", "disconnect_at", "closed")
+
+    def __init__(self, transport, profile: CameraProfile, parts: List[bytes], now: float, rng: random.Random):
+        self.transport = transport
+        self.profile = profile
+        self.parts = parts
+        self.index = rng.randrange(len(parts))  # Streams do not send the same frame in lockstep
+        self.interval = 1.0 / profile.fps
+        self.due = now
+        self.slot = 0
+        self.next_stall = now + rng.expovariate(1 / profile.stall_every) if profile.stall_every else 0.0
+        self.stall_until = 0.0
+        self.disconnect_at = now + rng.expovariate(1 / profile.disconnect_after) if profile.disconnect_after else 0.0
+        self.closed = False
+
+
+class StandInServer:
+    """Inventory and MJPEG endpoints for one process"""
+
+    def __init__(self, profiles: Dict[int, CameraProfile], pool: FramePool, stream_hosts: List[str],
+                 worker_id: int = 0, seed: int = 1):
+        """
+        Args:
+            stream_hosts: host:port values written into the fr_urls, round-robin
+        """
+        self.profiles = profiles
+        self.pool = pool
+        self.worker_id = worker_id
+        self.rng = random.Random(seed * 1000 + worker_id)
+        self.inventory = [
+            {
+                "id": camera_id,
+                "name": f"standin-{camera_id:05d}",
+                "status": 1 if profile.active else 0,
+                "fr_url": f"http://{stream_hosts[camera_id % len(stream_hosts)]}{STREAM_PATH}{camera_id}"
+            }
+            for camera_id, profile in profiles.items()
+        ]
+        self.inventory_body = json.dumps(self.inventory).encode()
+        self.inventory_etag = f'"{hashlib.sha1(self.inventory_body).hexdigest()[:16]}"'
+        self.slots: List[List[_Stream]] = [[] for _ in range(WHEEL_SLOTS)]
+        self.current_slot = 0  # Absolute slot number last processed
+        self.stats = {
+            "streams_active": 0,
+            "streams_served": 0,
+            "frames_sent": 0,
+            "bytes_sent": 0,
+            "frames_dropped": 0,
+            "stalls": 0,
+            "disconnects": 0,
+            "http_errors": 0,
+            "inventory_requests": 0
+        }
+
+    # Timing wheel
+
+    def _schedule(self, stream: _Stream, due: float) -> None:
+        stream.due = due
+        stream.slot = max(int(due / SLOT_SECONDS), self.current_slot + 1)
+        self.slots[stream.slot % WHEEL_SLOTS].append(stream)
+
+    async def run_scheduler(self) -> None:
+        """Send every due frame; cancel to stop"""
+        loop = asyncio.get_running_loop()
+        self.current_slot = int(loop.time() / SLOT_SECONDS)
+        while True:
+            await asyncio.sleep(SLOT_SECONDS)
+            now = loop.time()
+            last_slot = int(now / SLOT_SECONDS)
+            while self.current_slot < last_slot:
+                self.current_slot += 1
+                index = self.current_slot % WHEEL_SLOTS
+                due_streams, self.slots[index] = self.slots[index], []
+                for stream in due_streams:
+                    if stream.closed:
+                        continue
+                    if stream.slot > self.current_slot:
+                        self.slots[index].append(stream)  # A later turn of the wheel
+                    else:
+                        self._service(stream, now)
+
+    def _service(self, stream: _Stream, now: float) -> None:
+        """Send one frame, or start a stall or disconnect"""
+        profile = stream.profile
+        if stream.disconnect_at and now >= stream.disconnect_at:
+            self.stats["disconnects"] += 1
+            stream.closed = True
+            stream.transport.close()
+            return
+        if stream.next_stall and now >= stream.next_stall:
+            self.stats["stalls"] += 1
+            stream.stall_until = now + profile.stall_seconds
+            stream.next_stall = stream.stall_until + self.rng.expovariate(1 / profile.stall_every)
+            self._schedule(stream, stream.stall_until)
+            return
+
+        transport = stream.transport
+        if transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+            self.stats["frames_dropped"] += 1
+        else:
+            part = stream.parts[stream.index]
+            stream.index = (stream.index + 1) % len(stream.parts)
+            transport.write(part)
+            self.stats["frames_sent"] += 1
+            self.stats["bytes_sent"] += len(part)
+
+        interval = stream.interval
+        if profile.jitter:
+            interval *= 1 + self.rng.uniform(-profile.jitter, profile.jitter)
+        due = stream.due + interval
+        if due < now - 1.0:
+            due = now  # Fell far behind (loop overloaded); do not burst to catch up
+        self._schedule(stream, due)
+
+    # HTTP
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            writer.close()
+            return
+        try:
+            request_line, *header_lines = head.decode('latin-1').split('\r\n')
+            method, target, _ = request_line.split(' ', 2)
+        except ValueError:
+            self._respond(writer, 400)
+            return
+        headers = {}
+        for line in header_lines:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        url = urlsplit(target)
+        if method != 'GET':
+            self._respond(writer, 400)
+        elif url.path.rstrip('/') == API_PATH.rstrip('/'):
+            self._serve_inventory(writer, dict(parse_qsl(url.query)), headers)
+        elif url.path.startswith(STREAM_PATH):
+            await self._serve_stream(reader, writer, url.path[len(STREAM_PATH):].strip('/'))
+        else:
+            self._respond(writer, 404)
+
+    def _respond(self, writer: asyncio.StreamWriter, status: int, body: bytes = b'',
+                 content_type: str = 'text/plain', extra_headers: str = '') -> None:
+        reason = 'OK' if status == 200 else 'Not Modified' if status == 304 else HTTP_REASONS.get(status, 'Error')
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n{extra_headers}Connection: close\r\n\r\n".encode('latin-1') + body
+        )
+        writer.close()
+
+    def _serve_inventory(self, writer: asyncio.StreamWriter, query: Dict[str, str], headers: Dict[str, str]) -> None:
+        self.stats["inventory_requests"] += 1
+        prefix = query.get('prefix', '')
+        paged = 'limit' in query or 'offset' in query
+        if not prefix and not paged:
+            if headers.get('if-none-match') == self.inventory_etag:
+                self._respond(writer, 304, extra_headers=f"ETag: {self.inventory_etag}\r\n")
+                return
+            self._respond(writer, 200, self.inventory_body, 'application/json',
+                          extra_headers=f"ETag: {self.inventory_etag}\r\n")
+            return
+
+        cameras = [cam for cam in self.inventory if cam["name"].startswith(prefix)] if prefix else self.inventory
+        try:
+            offset = int(query.get('offset', 0))
+            limit = int(query['limit']) if 'limit' in query else len(cameras)
+        except ValueError:
+            self._respond(writer, 400)
+            return
+        self._respond(writer, 200, json.dumps(cameras[offset:offset + limit]).encode(), 'application/json')
+
+    async def _serve_stream(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, camera: str) -> None:
+        profile = self.profiles.get(int(camera)) if camera.isdigit() else None
+        if profile is None:
+            self._respond(writer, 404)
+            return
+        if profile.error_status and self.rng.random() < profile.error_probability:
+            self.stats["http_errors"] += 1
+            self._respond(writer, profile.error_status)
+            return
+
+        writer.write(
+            f"HTTP/1.1 200 OK\r\nContent-Type: multipart/x-mixed-replace; boundary={profile.boundary}\r\n"
+            f"Cache-Control: no-cache\r\nConnection: close\r\n\r\n".encode('latin-1')
+        )
+        stream = _Stream(writer.transport, profile, self.pool.parts(profile),
+                         asyncio.get_running_loop().time(), self.rng)
+        self.stats["streams_served"] += 1
+        self.stats["streams_active"] += 1
+        self._schedule(stream, stream.due)
+        try:
+            # Clients send nothing more; this returns when they disconnect
+            while await reader.read(4096):
+                pass
+        except ConnectionError:
+            pass
+        finally:
+            stream.closed = True
+            self.stats["streams_active"] -= 1
+            writer.close()
+
+    async def report_stats(self, interval: float) -> None:
+        """Log throughput every ``interval`` seconds"""
+        last = dict(self.stats)
+        while True:
+            await asyncio.sleep(interval)
+            stats = dict(self.stats)
+            logger.info(
+                f"[worker {self.worker_id}] streams {stats['streams_active']:,} | "
+                f"{(stats['frames_sent'] - last['frames_sent']) / interval:,.0f} frames/s | "
+                f"{(stats['bytes_sent'] - last['bytes_sent']) * 8 / interval / 1e6:,.1f} Mbps | "
+                f"dropped {stats['frames_dropped'] - last['frames_dropped']:,} | "
+                f"stalls {stats['stalls']:,} | disconnects {stats['disconnects']:,} | "
+                f"HTTP errors {stats['http_errors']:,}"
+            )
+            last = stats
+
+
+async def serve(server: StandInServer, host, port: int, reuse_port: bool, stats_interval: float) -> None:
+    """Run one process's listener, scheduler and stats log until cancelled"""
+    listener = await asyncio.start_server(
+        server.handle_connection, host, port, backlog=4096, reuse_port=reuse_port or None,
+        limit=MAX_REQUEST_HEAD
+    )
+    scheduler = asyncio.create_task(server.run_scheduler())
+    reporter = asyncio.create_task(server.report_stats(stats_interval)) if stats_interval > 0 else None
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        scheduler.cancel()
+        if reporter is not None:
+            reporter.cancel()
+
+
+def _worker_main(server: StandInServer, args) -> None:
+    """Forked worker process: inherits the frame pools built by the parent"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # The parent stops the workers
+    try:
+        run_with_loop(serve(server, args.listen, args.port, True, args.stats_interval), args.loop)
+    except asyncio.CancelledError:
+        pass
+
+
+def main():
+    defaults = CameraProfile()
+    parser = argparse.ArgumentParser(description='Local MJPEG stand-in for the camera API')
+    parser.add_argument('--host', default='127.0.0.1', help='Listen address (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8080, help='Listen port (default: 8080)')
+    parser.add_argument('--advertise', help='host:port written into fr_url (default: --host:--port)')
+    parser.add_argument('--host-aliases', type=int, default=1,
+                        help='Spread fr_url hosts over 127.0.0.1..127.0.0.N and listen on all of them, '
+                             'for testers with a per-host connection limit (default: 1)')
+    parser.add_argument('--cameras', type=int, default=1000, help='Cameras in the inventory (default: 1000)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Server processes sharing the port (SO_REUSEPORT, Linux; default: 1)')
+    parser.add_argument('--loop', choices=LOOP_BACKENDS, default='auto',
+                        help='Event loop backend (default: auto)')
+    parser.add_argument('--seed', type=int, default=1, help='Seed for fault assignment and frames (default: 1)')
+    parser.add_argument('--profile', help='JSON profile file with "defaults" and per-camera "cameras" overrides')
+    parser.add_argument('--stats-interval', type=float, default=10.0,
+                        help='Seconds between throughput log lines, 0 disables (default: 10)')
+
+    stream = parser.add_argument_group('streams')
+    stream.add_argument('--fps', type=float, default=defaults.fps, help=f'Frames per second (default: {defaults.fps:g})')
+    stream.add_argument('--frame-size', type=int, default=defaults.frame_size,
+                        help=f'Mean JPEG size in bytes (default: {defaults.frame_size})')
+    stream.add_argument('--frame-size-spread', type=float, default=defaults.frame_size_spread,
+                        help=f'Frame size standard deviation as a share of the mean (default: {defaults.frame_size_spread:g})')
+    stream.add_argument('--boundary', default=defaults.boundary, help=f'Multipart boundary (default: {defaults.boundary})')
+    stream.add_argument('--no-content-length', dest='content_length', action='store_false',
+                        help='Omit the Content-Length header of every part')
+    stream.add_argument('--jitter', type=float, default=defaults.jitter,
+                        help='Frame interval varies by up to +- this share (default: 0)')
+    stream.add_argument('--inactive-fraction', type=float, default=0.0,
+                        help='Cameras listed with status 0 (default: 0)')
+
+    faults = parser.add_argument_group('faults')
+    faults.add_argument('--stall-fraction', type=float, default=0.0, help='Cameras that stall (default: 0)')
+    faults.add_argument('--stall-every', type=float, default=60.0,
+                        help='Mean seconds between stalls of a stalling camera (default: 60)')
+    faults.add_argument('--stall-seconds', type=float, default=defaults.stall_seconds,
+                        help=f'Length of a stall (default: {defaults.stall_seconds:g})')
+    faults.add_argument('--disconnect-fraction', type=float, default=0.0,
+                        help='Cameras whose streams the server closes mid-stream (default: 0)')
+    faults.add_argument('--disconnect-after', type=float, default=120.0,
+                        help='Mean seconds before such a stream is closed (default: 120)')
+    faults.add_argument('--error-fraction', type=float, default=0.0,
+                        help='Cameras answering stream requests with an HTTP error (default: 0)')
+    faults.add_argument('--error-status', type=int, default=503, help='HTTP status of those errors (default: 503)')
+    faults.add_argument('--error-probability', type=float, default=defaults.error_probability,
+                        help='Share of a failing camera\'s requests that get the error (default: 1)')
+    parser.set_defaults(content_length=True)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+
+    try:
+        profiles = build_profiles(
+            args.cameras,
+            CameraProfile(fps=args.fps, frame_size=args.frame_size, frame_size_spread=args.frame_size_spread,
+                          boundary=args.boundary, content_length=args.content_length, jitter=args.jitter,
+                          stall_every=args.stall_every, stall_seconds=args.stall_seconds,
+                          disconnect_after=args.disconnect_after, error_status=args.error_status,
+                          error_probability=args.error_probability),
+            seed=args.seed, inactive_fraction=args.inactive_fraction, stall_fraction=args.stall_fraction,
+            disconnect_fraction=args.disconnect_fraction, error_fraction=args.error_fraction,
+            profile_file=args.profile
+        )
+    except (OSError, ValueError, TypeError) as e:
+        parser.error(str(e))
+    if args.workers > 1 and not hasattr(os, "fork"):
+        parser.error("--workers needs fork and SO_REUSEPORT (Linux)")
+    if args.host_aliases > 1 and (args.host != '127.0.0.1' or args.advertise or not 1 < args.host_aliases < 255):
+        parser.error("--host-aliases needs the default --host 127.0.0.1, no --advertise and at most 254 aliases")
+
+    # Build every frame pool before forking, so the workers share them
+    pool = FramePool(args.seed)
+    for profile in profiles.values():
+        pool.parts(profile)
+    advertise = args.advertise or f"{args.host}:{args.port}"
+    if args.host_aliases > 1:
+        args.listen = [f"127.0.0.{i}" for i in range(1, args.host_aliases + 1)]
+        stream_hosts = [f"{host}:{args.port}" for host in args.listen]
+    else:
+        args.listen = args.host
+        stream_hosts = [advertise]
+
+    print(f"📷 MJPEG stand-in: {args.cameras:,} cameras "
+          f"({sum(p.active for p in profiles.values()):,} active) on http://{advertise}{API_PATH}")
+    print(f"   Frame pools: {len(pool._pools)} ({pool.size_bytes / 1024**2:.1f} MB) | Workers: {args.workers} | "
+          f"Stream hosts: {len(stream_hosts)}")
+    print(f"   Faults: {sum(1 for p in profiles.values() if p.stall_every)} stalling, "
+          f"{sum(1 for p in profiles.values() if p.disconnect_after)} disconnecting, "
+          f"{sum(1 for p in profiles.values() if p.error_status)} failing cameras")
+
+    if args.workers <= 1:
+        server = StandInServer(profiles, pool, stream_hosts, seed=args.seed)
+        try:
+            run_with_loop(serve(server, args.listen, args.port, False, args.stats_interval), args.loop)
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    context = multiprocessing.get_context("fork")  # No event loop runs in this process yet
+    processes = [
+        context.Process(target=_worker_main,
+                        args=(StandInServer(profiles, pool, stream_hosts, worker_id, args.seed), args),
+                        daemon=True)
+        for worker_id in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))  # Stop the workers too
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in processes:
+            process.terminate()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
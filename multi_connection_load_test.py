@@ -18,7 +18,6 @@ import asyncio
 import sys
 import os
 import time
-import logging
 import csv
 import json
 import argparse
@@ -28,7 +27,15 @@ from dataclasses import dataclass
 # Add current directory to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from camera_stream_load_test import CameraStreamLoadTester, save_report, StreamStats
+from camera_stream_load_test import (CameraStreamLoadTester, save_report, StreamStats,
+                                     update_frame_stats, record_frame_intervals)
+from multipart_stream_parser import MultipartFrameParser, parse_multipart_boundary
+from latency_histogram import LatencyHistogram
+from stream_errors import ErrorLog, StreamEndedError, StreamHTTPError, classify_error, error_code_totals
+from session_pool import SharedSessionPool
+from system_sampler import SystemResourceSampler, system_resources_summary
+from event_loop_backend import LOOP_BACKENDS, current_loop_backend, loop_backend_from_argv, run_with_loop
+from tester_logging import camera_event, close_tester_logger, setup_tester_logger
 
 @dataclass
 class ConnectionStats:
@@ -42,14 +49,21 @@ class ConnectionStats:
     total_frames: int = 0
     total_bytes: int = 0
     reconnections: int = 0
-    errors: List[str] = None
+    errors: ErrorLog = None  # Error counts per code and the most recent errors
     last_frame_time: float = 0
     avg_fps: float = 0
     status: str = "starting"
+    malformed_frames: int = 0
+    frame_bytes: int = 0
+    min_frame_size: int = 0
+    max_frame_size: int = 0
+    frame_intervals: LatencyHistogram = None
     
     def __post_init__(self):
         if self.errors is None:
-            self.errors = []
+            self.errors = ErrorLog()
+        if self.frame_intervals is None:
+            self.frame_intervals = LatencyHistogram()
 
 class MultiConnectionLoadTester:
     def __init__(self, camera_count: int, connections_per_camera: int = 1, test_duration: int = 120):
@@ -68,37 +82,18 @@ class MultiConnectionLoadTester:
         self.connection_stats: Dict[str, ConnectionStats] = {}
         self.camera_groups: Dict[int, List[str]] = {}  # camera_id -> [connection_ids]
         
+        # Shared sessions (one SSL context, one connector per host) and tester cost
+        self.session_pool: Optional[SharedSessionPool] = None
+        self.resource_sampler = SystemResourceSampler(interval=1.0)
+        self.resource_samples: List[Dict] = []
+        self.tester_resources: Dict = {}
+        
         # Setup logging
         os.makedirs('logs', exist_ok=True)
         self.log_filename = os.path.join('logs', f'multi_connection_test_{camera_count}x{connections_per_camera}_{time.strftime("%Y%m%d_%H%M%S")}.log')
         
-        # Create logger
-        self.logger = logging.getLogger(f"MultiConnectionTester_{id(self)}")
-        self.logger.setLevel(logging.INFO)
-        
-        # Clear any existing handlers
-        self.logger.handlers.clear()
-        
-        # Console handler
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
-        console_format = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-        console_handler.setFormatter(console_format)
-        self.logger.addHandler(console_handler)
-        
-        # File handler
-        try:
-            file_handler = logging.FileHandler(self.log_filename)
-            file_handler.setLevel(logging.INFO)
-            file_format = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-            file_handler.setFormatter(file_format)
-            self.logger.addHandler(file_handler)
-            self.logger.info(f"Logging to file: {self.log_filename}")
-        except Exception as e:
-            print(f"Warning: Could not create log file {self.log_filename}: {e}")
-        
-        # Prevent propagation to root logger
-        self.logger.propagate = False
+        # Console and file handlers run on a background thread (tester_logging.py)
+        self.logger = setup_tester_logger(f"MultiConnectionTester_{id(self)}", self.log_filename)
 
     async def run_multi_connection_test(self) -> dict:
         """Run multi-connection test and return comprehensive report"""
@@ -124,6 +119,7 @@ class MultiConnectionLoadTester:
             test_duration=self.test_duration,
             shuffle_cameras=True
         )
+        sampler_task = None
         
         try:
             # Get camera list
@@ -136,6 +132,13 @@ class MultiConnectionLoadTester:
             test_cameras = cameras[:self.camera_count]
             self.logger.info(f"Selected {len(test_cameras)} cameras for multi-connection testing")
             
+            self.session_pool = SharedSessionPool()
+            self.resource_sampler.start()
+            sampler_task = asyncio.create_task(self.collect_resource_samples())
+            baseline_deadline = time.time() + 2 * self.resource_sampler.interval
+            while not (self.resource_samples or self.resource_sampler.samples) and time.time() < baseline_deadline:
+                await asyncio.sleep(0.05)  # Baseline RSS before any connection opens
+            
             # Create multiple connections per camera
             connection_tasks = []
             for camera in test_cameras:
@@ -183,6 +186,11 @@ class MultiConnectionLoadTester:
             end_time = time.time()
             actual_duration = end_time - start_time
             
+            await self.stop_resource_sampler(sampler_task)
+            self.tester_resources = self.tester_resources_summary(len(connection_tasks))
+            self.tester_resources["shared_sessions"] = self.session_pool.host_count
+            await self.session_pool.close()
+            
             # Generate comprehensive report
             report = self.generate_multi_connection_report(actual_duration)
             
@@ -194,28 +202,23 @@ class MultiConnectionLoadTester:
         except Exception as e:
             self.logger.error(f"Multi-connection test failed: {e}")
             return {"error": str(e)}
+        
+        finally:
+            if sampler_task is not None:
+                await self.stop_resource_sampler(sampler_task)
+            if self.session_pool is not None:
+                await self.session_pool.close()
+            close_tester_logger(base_tester.logger)
+            close_tester_logger(self.logger)
 
     async def stream_single_connection(self, camera: dict, conn_stats: ConnectionStats):
         """Stream from a single connection with tracking"""
         import aiohttp
-        import ssl
-        
-        # Create SSL context and session for this connection
-        ssl_context = ssl.create_default_context()
-        ssl_context.check_hostname = False
-        ssl_context.verify_mode = ssl.CERT_NONE
-        
-        connector = aiohttp.TCPConnector(
-            limit=10,
-            enable_cleanup_closed=True,
-            ssl=ssl_context,
-            force_close=True
-        )
         
-        session = aiohttp.ClientSession(
-            connector=connector,
-            timeout=aiohttp.ClientTimeout(total=None)
-        )
+        # Shared per-host session; force_close gives this connection its own socket
+        session = self.session_pool.session_for(conn_stats.camera_url)
+        
+        parser = MultipartFrameParser()
         
         try:
             reconnect_delay = 1.0
@@ -233,45 +236,40 @@ class MultiConnectionLoadTester:
                     ) as response:
                         
                         if response.status != 200:
-                            raise Exception(f"HTTP {response.status}: {response.reason}")
+                            raise StreamHTTPError(response.status, response.reason)
                         
                         conn_stats.status = "connected"
                         conn_stats.last_frame_time = time.time()
                         reconnect_delay = 1.0  # Reset delay on successful connection
                         
-                        # Read multipart stream
-                        buffer = b''
-                        frame_start_marker = b'--frame'
+                        # Read multipart stream using the boundary announced by the server
+                        parser.reset(parse_multipart_boundary(response.headers.get('content-type', '')))
+                        prev_frame_time = None
                         
                         async for chunk in response.content.iter_chunked(8192):
-                            buffer += chunk
                             conn_stats.total_bytes += len(chunk)
                             
-                            # Look for frame boundaries
-                            while frame_start_marker in buffer:
-                                frame_pos = buffer.find(frame_start_marker)
-                                if frame_pos > 0:
-                                    # Found a complete frame
-                                    conn_stats.total_frames += 1
-                                    current_time = time.time()
-                                    
-                                    # Calculate FPS
-                                    if conn_stats.total_frames > 1:
-                                        elapsed = current_time - conn_stats.start_time
-                                        conn_stats.avg_fps = conn_stats.total_frames / elapsed
-                                    
-                                    conn_stats.last_frame_time = current_time
+                            # Parse part headers and validate JPEG frames
+                            frames = parser.feed(chunk)
+                            if frames:
+                                # Found complete frame(s)
+                                conn_stats.total_frames += frames
+                                current_time = time.time()
+                                record_frame_intervals(conn_stats, frames, current_time, prev_frame_time)
+                                prev_frame_time = current_time
+                                
+                                # Calculate FPS
+                                if conn_stats.total_frames > 1:
+                                    elapsed = current_time - conn_stats.start_time
+                                    conn_stats.avg_fps = conn_stats.total_frames / elapsed
                                 
-                                # Move past the frame marker
-                                next_pos = frame_pos + len(frame_start_marker)
-                                buffer = buffer[next_pos:]
+                                conn_stats.last_frame_time = current_time
                             
-                            # Keep buffer manageable
-                            if len(buffer) > 1024 * 1024:  # 1MB limit
-                                buffer = buffer[-512*1024:]  # Keep last 512KB
+                            if frames or parser.malformed_frames != conn_stats.malformed_frames:
+                                update_frame_stats(conn_stats, parser)
                         
-                        # If we reach here, stream ended normally
-                        break
+                        # Connections are cancelled at test end, so an ended stream is a server-side close
+                        raise StreamEndedError("Server closed the stream")
                         
                 except asyncio.CancelledError:
                     self.logger.debug(f"{conn_stats.connection_id}: Connection cancelled")
@@ -279,19 +277,50 @@ class MultiConnectionLoadTester:
                     
                 except Exception as e:
                     conn_stats.reconnections += 1
-                    conn_stats.errors.append(f"{time.time()}: {str(e)}")
+                    error_code = classify_error(e)
+                    conn_stats.errors.record(error_code, f"Connection error: {e}")
                     conn_stats.status = "error"
                     
-                    self.logger.warning(f"{conn_stats.connection_id}: Connection failed (attempt {conn_stats.reconnections}): {e}")
+                    self.logger.warning(f"{conn_stats.connection_id}: [{error_code}] Connection failed (attempt {conn_stats.reconnections}): {e}",
+                                        extra=camera_event(conn_stats.connection_id, "error"))
                     
                     # Wait before reconnecting
                     await asyncio.sleep(min(reconnect_delay, max_reconnect_delay))
                     reconnect_delay = min(reconnect_delay * 2, max_reconnect_delay)
                     
         finally:
+            update_frame_stats(conn_stats, parser)
             conn_stats.end_time = time.time()
             conn_stats.status = "disconnected" if conn_stats.status != "error" else "error"
-            await session.close()
+
+    async def collect_resource_samples(self) -> None:
+        """Drain the sampler thread's queue while connections run; cancel to stop"""
+        while True:
+            await asyncio.sleep(self.resource_sampler.interval)
+            self.resource_samples.extend(self.resource_sampler.drain())
+
+    async def stop_resource_sampler(self, sampler_task: asyncio.Task) -> None:
+        """Stop the collector and the sampler thread and keep the last samples (safe to repeat)"""
+        sampler_task.cancel()
+        await asyncio.gather(sampler_task, return_exceptions=True)
+        self.resource_sampler.stop()
+        self.resource_samples.extend(self.resource_sampler.drain())
+
+    def tester_resources_summary(self, connections: int) -> Dict:
+        """Tester-side cost in total and per connection (system_sampler.py tester fields)"""
+        samples = self.resource_samples
+        if not samples:
+            return {}
+        tester = system_resources_summary(samples)["tester"]
+        connections = max(connections, 1)
+        rss_start = samples[0]['tester_rss_mb']
+        tester.update({
+            "cpu_percent_per_connection": round(tester["average_cpu_percent_of_one_core"] / connections, 3),
+            "start_rss_mb": round(rss_start, 2),
+            "end_rss_mb": round(samples[-1]['tester_rss_mb'], 2),
+            "rss_kb_per_connection": round(max(tester["peak_rss_mb"] - rss_start, 0) * 1024 / connections, 1)
+        })
+        return tester
 
     def generate_multi_connection_report(self, actual_duration: float) -> dict:
         """Generate comprehensive multi-connection report"""
@@ -302,13 +331,15 @@ class MultiConnectionLoadTester:
                 "total_connections": self.total_connections,
                 "test_duration": self.test_duration,
                 "actual_duration": round(actual_duration, 2),
-                "camera_selection": "shuffled"
+                "camera_selection": "shuffled",
+                "event_loop": current_loop_backend()
             },
             "connection_statistics": self.analyze_connection_performance(),
             "camera_statistics": self.analyze_camera_performance(),
             "capacity_estimation": self.estimate_capacity(),
             "fr_deployment_recommendations": self.generate_fr_recommendations(),
             "analysis": self.analyze_results(),
+            "tester_resources": self.tester_resources,
             "individual_connections": self.get_individual_connection_data(),
             "camera_groups": self.get_camera_group_data()
         }
@@ -326,6 +357,9 @@ class MultiConnectionLoadTester:
         total_frames = sum(c.total_frames for c in connected_connections)
         total_bytes = sum(c.total_bytes for c in connected_connections)
         total_reconnections = sum(c.reconnections for c in self.connection_stats.values())
+        total_malformed = sum(c.malformed_frames for c in self.connection_stats.values())
+        total_frame_bytes = sum(c.frame_bytes for c in connected_connections)
+        frame_intervals = LatencyHistogram.merged(c.frame_intervals for c in self.connection_stats.values())
         
         fps_values = [c.avg_fps for c in connected_connections if c.avg_fps > 0]
         avg_fps = sum(fps_values) / len(fps_values) if fps_values else 0
@@ -338,9 +372,14 @@ class MultiConnectionLoadTester:
             "total_bytes_received": total_bytes,
             "total_data_gb": round(total_bytes / (1024**3), 3),
             "total_reconnections": total_reconnections,
+            "total_malformed_frames": total_malformed,
+            "average_frame_size_bytes": round(total_frame_bytes / total_frames) if total_frames else 0,
             "average_fps_per_connection": round(avg_fps, 2),
+            "frame_interval_ms": frame_intervals.summary_ms(),
             "global_fps": round(total_frames / self.test_duration, 2) if self.test_duration > 0 else 0,
-            "reconnection_rate": round(total_reconnections / len(connected_connections), 3) if connected_connections else 0
+            "reconnection_rate": round(total_reconnections / len(connected_connections), 3) if connected_connections else 0,
+            "total_errors": sum(len(c.errors) for c in self.connection_stats.values()),
+            "error_codes": error_code_totals(c.errors for c in self.connection_stats.values())
         }
 
     def analyze_camera_performance(self) -> dict:
@@ -366,7 +405,8 @@ class MultiConnectionLoadTester:
                 "total_bytes": total_bytes,
                 "total_reconnections": total_reconnections,
                 "avg_fps_per_connection": round(avg_fps, 2),
-                "combined_fps": round(sum(c.avg_fps for c in successful_conns), 2)
+                "combined_fps": round(sum(c.avg_fps for c in successful_conns), 2),
+                "frame_interval_ms": LatencyHistogram.merged(c.frame_intervals for c in camera_connections).summary_ms()
             }
         
         return {
@@ -568,6 +608,7 @@ class MultiConnectionLoadTester:
         """Get individual connection data for detailed analysis"""
         connections = []
         for conn_stats in self.connection_stats.values():
+            intervals = conn_stats.frame_intervals.summary_ms()
             connections.append({
                 "connection_id": conn_stats.connection_id,
                 "camera_id": conn_stats.camera_id,
@@ -576,9 +617,17 @@ class MultiConnectionLoadTester:
                 "total_frames": conn_stats.total_frames,
                 "total_bytes": conn_stats.total_bytes,
                 "avg_fps": round(conn_stats.avg_fps, 2),
+                "malformed_frames": conn_stats.malformed_frames,
+                "avg_frame_size": round(conn_stats.frame_bytes / conn_stats.total_frames) if conn_stats.total_frames else 0,
+                "frame_interval_p50_ms": intervals["p50"],
+                "frame_interval_p95_ms": intervals["p95"],
+                "frame_interval_p99_ms": intervals["p99"],
+                "frame_interval_max_ms": intervals["max"],
                 "reconnections": conn_stats.reconnections,
                 "duration_seconds": round((conn_stats.end_time or time.time()) - conn_stats.start_time, 1),
-                "errors_count": len(conn_stats.errors)
+                "errors_count": len(conn_stats.errors),
+                "error_codes": dict(conn_stats.errors.counts),
+                "errors": conn_stats.errors.messages()
             })
         return connections
 
@@ -633,11 +682,13 @@ class MultiConnectionLoadTester:
             conn_csv = os.path.join(reports_dir, f"{base_stem}_connections.csv")
             fields = [
                 "connection_id", "camera_id", "connection_number", "status", 
-                "total_frames", "total_bytes", "avg_fps", "reconnections", 
+                "total_frames", "total_bytes", "avg_fps", "malformed_frames",
+                "avg_frame_size", "frame_interval_p50_ms", "frame_interval_p95_ms",
+                "frame_interval_p99_ms", "frame_interval_max_ms", "reconnections",
                 "duration_seconds", "errors_count"
             ]
             with open(conn_csv, "w", newline="", encoding="utf-8") as f:
-                writer = csv.DictWriter(f, fieldnames=fields)
+                writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
                 writer.writeheader()
                 for conn_data in report.get("individual_connections", []):
                     writer.writerow(conn_data)
@@ -697,9 +748,22 @@ def print_multi_connection_summary(report: dict):
         print(f"   Success rate: {conn_stats.get('connection_success_rate', 'N/A')}%")
         print(f"   Average FPS per connection: {conn_stats.get('average_fps_per_connection', 'N/A')}")
         print(f"   Global FPS: {conn_stats.get('global_fps', 'N/A')}")
+        intervals = conn_stats.get('frame_interval_ms')
+        if intervals:
+            print(f"   Frame interval (ms): p50 {intervals['p50']} | p95 {intervals['p95']} | p99 {intervals['p99']} | max {intervals['max']}")
         print(f"   Total data processed: {conn_stats.get('total_data_gb', 'N/A')} GB")
+        print(f"   Malformed frames: {conn_stats.get('total_malformed_frames', 0)}")
         print(f"   Reconnection rate: {conn_stats.get('reconnection_rate', 'N/A')}")
     
+    tester = report.get("tester_resources")
+    if tester:
+        print(f"\n🖥️  Tester Resources:")
+        print(f"   CPU: avg {tester['average_cpu_percent_of_one_core']}% | peak {tester['peak_cpu_percent_of_one_core']}% "
+              f"of one core ({tester['cpu_percent_per_connection']}% per connection)")
+        print(f"   RSS: {tester['start_rss_mb']} MB → peak {tester['peak_rss_mb']} MB "
+              f"({tester['rss_kb_per_connection']} KB per connection)")
+        print(f"   Shared sessions: {tester.get('shared_sessions', 'N/A')}")
+    
     if "error" not in camera_stats:
         camera_summary = camera_stats.get("camera_summary", {})
         print(f"\n📺 Camera Performance:")
@@ -765,6 +829,8 @@ Examples:
                        help='Number of connections per camera (default: 1)')
     parser.add_argument('--duration', type=int, default=120,
                        help='Test duration in seconds (default: 120)')
+    parser.add_argument('--loop', choices=LOOP_BACKENDS, default='auto',
+                       help='Event loop backend; auto uses uvloop when installed (default: auto)')
     
     args = parser.parse_args()
     
@@ -826,5 +892,5 @@ Examples:
 
 
 if __name__ == "__main__":
-    result = asyncio.run(main())
+    result = run_with_loop(main(), loop_backend_from_argv())
     sys.exit(result)
\ No newline at end of file
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+Incremental Multipart Frame Parser
+==================================
+
+Shared part reader for multipart/x-mixed-replace camera streams.
+- Takes the boundary from the response Content-Type header
+- Parses each part's headers (Content-Type, Content-Length)
+- Skips straight over the body when Content-Length is present, keeping only
+  the bytes needed for the JPEG SOI/EOI check
+- Falls back to a resumable boundary scan when Content-Length is missing
+- Counts good frames, malformed frames and exact frame sizes
+- Fingerprints every good frame (size + CRC32 of a few sampled byte ranges)
+  and counts frames that repeat the previous one, in O(1) memory per stream
+- Used by CameraStreamLoadTester and MultiConnectionLoadTester
+
+Usage:
+    parser = MultipartFrameParser(parse_multipart_boundary(content_type))
+    async for chunk in response.content.iter_chunked(8192):
+        frames = parser.feed(chunk)
+"""
+
+import sys
+import zlib
+from typing import Callable, Dict, List, Optional, Tuple
+
+DEFAULT_BOUNDARY = b'frame'
+MAX_PART_SIZE = 1024 * 1024   # 1MB, same cap as the old per-stream buffer
+MAX_HEADER_SIZE = 16 * 1024   # Part headers larger than this are treated as corrupt
+
+# Frame fingerprint: CRC32 over this many evenly spaced windows of the body
+FINGERPRINT_WINDOWS = 4
+FINGERPRINT_WINDOW_SIZE = 32
+
+JPEG_SOI = b'\xff\xd8'
+JPEG_EOI = b'\xff\xd9'
+
+# Parser states
+_SEEK_BOUNDARY = 0
+_HEADERS = 1
+_BODY = 2
+_CLOSED = 3
+
+
+def parse_multipart_boundary(content_type: str) -> Optional[bytes]:
+    """Extract the boundary token from a multipart Content-Type header"""
+    if not content_type:
+        return None
+    for param in content_type.split(';')[1:]:
+        key, _, value = param.strip().partition('=')
+        if key.strip().lower() == 'boundary':
+            value = value.strip().strip('"')
+            return value.encode('latin-1') if value else None
+    return None
+
+
+def fingerprint_ranges(size: int) -> List[Tuple[int, int]]:
+    """Sorted, non-overlapping (start, end) body ranges hashed for a fingerprint"""
+    if size <= FINGERPRINT_WINDOWS * FINGERPRINT_WINDOW_SIZE * 2:
+        return [(0, size)]
+    step = size // (FINGERPRINT_WINDOWS + 1)
+    return [(step * k, step * k + FINGERPRINT_WINDOW_SIZE) for k in range(1, FINGERPRINT_WINDOWS + 1)]
+
+
+def parse_part_headers(raw: bytes) -> Dict[str, str]:
+    """Parse raw part header lines into a lower-cased header dict"""
+    headers = {}
+    for line in raw.split(b'\n'):
+        name, sep, value = line.partition(b':')
+        if sep:
+            headers[name.strip().lower().decode('latin-1')] = value.strip().decode('latin-1')
+    return headers
+
+
+class MultipartFrameParser:
+    """Incremental multipart/x-mixed-replace part reader.
+
+    Each completed part is checked for JPEG SOI/EOI markers when its
+    Content-Type is missing or image/jpeg. Parts that fail the check, exceed
+    ``max_part_size`` or are cut off by a reconnect count as malformed and are
+    not reported as frames.
+
+    Good frames whose fingerprint matches the previous frame count as
+    ``repeated_frames``; a run is a sequence of identical frames, so a server
+    resending one JPEG after its camera died shows up as one long run.
+    """
+
+    def __init__(self, boundary: Optional[bytes] = None,
+                 on_frame: Optional[Callable[[memoryview], None]] = None,
+                 max_part_size: int = MAX_PART_SIZE,
+                 want_frame: Optional[Callable[[], bool]] = None):
+        """
+        Args:
+            boundary: Multipart boundary token (without the leading dashes)
+            on_frame: Optional callback receiving each good frame payload; the
+                memoryview is only valid for the duration of the call. When
+                set, bodies are buffered instead of skipped.
+            max_part_size: Largest part body accepted before it is dropped
+            want_frame: Optional predicate asked when a part starts; when it
+                returns False the body is skipped and on_frame is not called
+                for that part (e.g. to sample 1-in-N frames)
+        """
+        self.on_frame = on_frame
+        self.want_frame = want_frame
+        self.max_part_size = max_part_size
+
+        # Per-stream counters, kept across reset()
+        self.frames = 0
+        self.malformed_frames = 0
+        self.frame_bytes = 0
+        self.last_frame_size = 0
+        self.min_frame_size = 0
+        self.max_frame_size = 0
+        self.repeated_frames = 0
+        self.repeat_runs = 0  # Runs of two or more identical frames
+        self.repeat_run = 1  # Length of the current run of identical frames
+        self.longest_repeat_run = 0
+        self._last_fingerprint: Optional[Tuple[int, int]] = None
+
+        self.delimiter = b'--' + (boundary or DEFAULT_BOUNDARY)
+        self._buffer = bytearray()
+        self._state = _SEEK_BOUNDARY
+        self.reset()
+
+    def reset(self, boundary: Optional[bytes] = None) -> None:
+        """Drop buffered data before reading a new response.
+
+        A part that was still being read counts as malformed (truncated).
+        """
+        if self._state in (_HEADERS, _BODY):
+            self.malformed_frames += 1
+
+        if boundary is not None:
+            self.delimiter = b'--' + boundary
+
+        self._buffer.clear()
+        self._state = _SEEK_BOUNDARY
+        self._scan_pos = 0
+        self._body_remaining: Optional[int] = None
+        self._body_size = 0
+        self._body_head = b''
+        self._body_tail = b''
+        self._body_sample = bytearray()
+        self._sample_ranges: List[Tuple[int, int]] = []
+        self._sample_index = 0
+        self._sample_next = sys.maxsize
+        self._check_jpeg = True
+        self._keep_body = False
+        self._deliver = False
+
+    def feed(self, data: bytes) -> int:
+        """Add a chunk and return the number of good frames it completed"""
+        completed = 0
+        size = len(data)
+        offset = 0
+
+        with memoryview(data) as view:
+            while offset < size:
+                if (self._state == _BODY and self._body_remaining is not None
+                        and not self._keep_body and not self._buffer):
+                    # Content-Length fast path: body bytes never enter the buffer
+                    take = min(self._body_remaining, size - offset)
+                    self._track_body_edges(view[offset:offset + take])
+                    self._body_remaining -= take
+                    offset += take
+                    if self._body_remaining == 0:
+                        completed += self._finish_part(None)
+                    continue
+
+                if self._state == _CLOSED:
+                    break
+
+                self._buffer.extend(view[offset:])
+                offset = size
+                completed += self._parse_buffer()
+
+        return completed
+
+    def _parse_buffer(self) -> int:
+        """Advance the state machine over buffered bytes"""
+        buffer = self._buffer
+        delimiter = self.delimiter
+        completed = 0
+        pos = 0
+
+        while True:
+            if self._state == _SEEK_BOUNDARY:
+                found = buffer.find(delimiter, max(pos, self._scan_pos))
+                if found < 0:
+                    # The tail may hold the start of a delimiter split across chunks
+                    pos = max(pos, len(buffer) - len(delimiter) + 1)
+                    self._scan_pos = pos
+                    break
+
+                after = found + len(delimiter)
+                if len(buffer) < after + 2:
+                    pos = self._scan_pos = found
+                    break
+                if buffer[after:after + 2] == b'--':
+                    # Closing delimiter, no more parts
+                    self._state = _CLOSED
+                    pos = len(buffer)
+                    break
+
+                line_end = buffer.find(b'\n', after)
+                if line_end < 0:
+                    pos = self._scan_pos = found
+                    if len(buffer) - found > MAX_HEADER_SIZE:
+                        pos = self._scan_pos = after
+                    break
+
+                pos = line_end + 1
+                self._state = _HEADERS
+
+            elif self._state == _HEADERS:
+                header_end, body_start = self._find_header_end(buffer, pos)
+                if header_end < 0:
+                    if len(buffer) - pos > MAX_HEADER_SIZE:
+                        self.malformed_frames += 1
+                        self._state = _SEEK_BOUNDARY
+                        self._scan_pos = pos
+                    break
+
+                headers = parse_part_headers(bytes(buffer[pos:header_end]))
+                self._start_body(headers)
+                pos = body_start
+
+            elif self._state == _BODY:
+                if self._body_remaining is not None:
+                    available = len(buffer) - pos
+                    if self._keep_body:
+                        if available < self._body_remaining:
+                            break
+                        end = pos + self._body_remaining
+                        with memoryview(buffer) as view:
+                            completed += self._finish_part(view[pos:end])
+                        pos = end
+                    else:
+                        take = min(available, self._body_remaining)
+                        with memoryview(buffer) as view:
+                            self._track_body_edges(view[pos:pos + take])
+                        self._body_remaining -= take
+                        pos += take
+                        if self._body_remaining:
+                            break
+                        completed += self._finish_part(None)
+                    self._scan_pos = pos
+                    continue
+
+                # No Content-Length: the body ends at the next delimiter
+                found = buffer.find(delimiter, max(pos, self._scan_pos))
+                if found < 0:
+                    self._scan_pos = max(pos, len(buffer) - len(delimiter) + 1)
+                    if len(buffer) - pos > self.max_part_size:
+                        # Part never terminates, drop it and resync
+                        self.malformed_frames += 1
+                        self._state = _SEEK_BOUNDARY
+                        pos = self._scan_pos
+                    break
+
+                end = found
+                if buffer[end - 2:end] == b'\r\n' and end - 2 >= pos:
+                    end -= 2
+                elif buffer[end - 1:end] == b'\n' and end - 1 >= pos:
+                    end -= 1
+                with memoryview(buffer) as view:
+                    completed += self._finish_part(view[pos:end])
+                pos = self._scan_pos = found
+
+            else:
+                pos = len(buffer)
+                break
+
+        if pos:
+            # Front deletion on bytearray only moves the start offset
+            del buffer[:pos]
+            self._scan_pos = max(0, self._scan_pos - pos)
+
+        return completed
+
+    @staticmethod
+    def _find_header_end(buffer: bytearray, pos: int):
+        """Return (header_end, body_start) or (-1, -1) if headers are incomplete"""
+        # Empty header block: the blank line follows the boundary line directly
+        if buffer.startswith(b'\r\n', pos):
+            return pos, pos + 2
+        if buffer.startswith(b'\n', pos):
+            return pos, pos + 1
+        crlf = buffer.find(b'\r\n\r\n', pos)
+        lf = buffer.find(b'\n\n', pos, crlf + 1 if crlf >= 0 else len(buffer))
+        if crlf >= 0 and (lf < 0 or crlf <= lf):
+            return crlf, crlf + 4
+        if lf >= 0:
+            return lf, lf + 2
+        return -1, -1
+
+    def _start_body(self, headers: Dict[str, str]) -> None:
+        """Prepare body state from the parsed part headers"""
+        content_type = headers.get('content-type', '').lower()
+        self._check_jpeg = not content_type or 'jpeg' in content_type or 'jpg' in content_type
+
+        self._body_remaining = None
+        length = headers.get('content-length')
+        if length is not None:
+            try:
+                self._body_remaining = int(length)
+            except ValueError:
+                self._body_remaining = None
+            if self._body_remaining is not None and not 0 <= self._body_remaining <= self.max_part_size:
+                self._body_remaining = None
+
+        self._deliver = self.on_frame is not None and (self.want_frame is None or self.want_frame())
+        self._keep_body = self._body_remaining is not None and self._deliver
+        self._body_size = 0
+        self._body_head = b''
+        self._body_tail = b''
+        self._state = _BODY
+        if self._body_remaining is not None and not self._keep_body:
+            # Skipped body: collect the fingerprint ranges as the bytes pass
+            self._body_sample.clear()
+            self._sample_ranges = fingerprint_ranges(self._body_remaining)
+            self._sample_index = 0
+            self._sample_next = self._sample_ranges[0][0]
+
+        if self._body_remaining == 0:
+            self._finish_part(None)
+
+    def _track_body_edges(self, piece: memoryview) -> None:
+        """Remember the first and last bytes and fingerprint ranges of a skipped body"""
+        start = self._body_size
+        end = self._body_size = start + len(piece)
+        if end > self._sample_next:
+            self._collect_sample(piece, start, end)
+        if len(self._body_head) < 2:
+            self._body_head += bytes(piece[:2 - len(self._body_head)])
+        if len(piece) >= 4:
+            self._body_tail = bytes(piece[-4:])
+        else:
+            self._body_tail = (self._body_tail + bytes(piece))[-4:]
+
+    def _collect_sample(self, piece: memoryview, start: int, end: int) -> None:
+        """Append the fingerprint ranges overlapping body[start:end]"""
+        ranges = self._sample_ranges
+        index = self._sample_index
+        while index < len(ranges):
+            range_start, range_end = ranges[index]
+            if range_start >= end:
+                break
+            self._body_sample += piece[max(range_start, start) - start:min(range_end, end) - start]
+            if range_end > end:
+                break
+            index += 1
+        self._sample_index = index
+        self._sample_next = ranges[index][0] if index < len(ranges) else sys.maxsize
+
+    def _finish_part(self, payload: Optional[memoryview]) -> int:
+        """Validate a completed part and update counters; returns 1 for a good frame"""
+        if payload is not None:
+            size = len(payload)
+            head = bytes(payload[:2])
+            tail = bytes(payload[-4:])
+            sample = None
+        else:
+            size = self._body_size
+            head = self._body_head
+            tail = self._body_tail
+            sample = self._body_sample
+
+        self._state = _SEEK_BOUNDARY
+        self._body_remaining = None
+
+        valid = size > 0
+        if valid and self._check_jpeg:
+            valid = head == JPEG_SOI and tail.rstrip(b'\r\n').endswith(JPEG_EOI)
+
+        if not valid:
+            self.malformed_frames += 1
+            return 0
+
+        self.frames += 1
+        self.frame_bytes += size
+        self.last_frame_size = size
+        if size > self.max_frame_size:
+            self.max_frame_size = size
+        if size < self.min_frame_size or self.min_frame_size == 0:
+            self.min_frame_size = size
+
+        if sample is None:
+            checksum = 0
+            for range_start, range_end in fingerprint_ranges(size):
+                checksum = zlib.crc32(payload[range_start:range_end], checksum)
+        else:
+            checksum = zlib.crc32(sample)
+        fingerprint = (size, checksum)
+        if fingerprint == self._last_fingerprint:
+            self.repeated_frames += 1
+            self.repeat_run += 1
+            if self.repeat_run == 2:
+                self.repeat_runs += 1
+            if self.repeat_run > self.longest_repeat_run:
+                self.longest_repeat_run = self.repeat_run
+        else:
+            self.repeat_run = 1
+            self._last_fingerprint = fingerprint
+
+        if self._deliver and payload is not None:
+            self.on_frame(payload)
+        return 1
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Connection Ramp Scheduler
+=========================
+
+Starts streams on a schedule instead of all at once, and tags metrics by
+ramp phase so connection-establishment capacity can be told apart from
+steady-state streaming capacity.
+- none: every stream starts immediately (thundering herd, the old behavior)
+- linear: starts spread evenly over --ramp-seconds
+- rate: a fixed arrival rate in connections per second
+- step: batches of --ramp-step streams, each held for --ramp-hold seconds
+- linear and rate also accept --ramp-step/--ramp-hold to pause after every batch
+- Phases are "ramp" then "steady", or "step-1".."step-N" then "steady";
+  each phase reports the connection setup percentiles, failures and the
+  frame throughput measured while it lasted
+
+Usage:
+    schedule = RampSchedule(mode="step", step_size=100, step_hold=30)
+    offsets = schedule.start_offsets(len(cameras))   # seconds after start
+    tracker = RampPhaseTracker(tester, schedule)
+    asyncio.create_task(tracker.run(start_time, len(cameras)))
+    ...
+    tracker.summary()
+"""
+
+import asyncio
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from latency_histogram import LatencyHistogram
+
+RAMP_MODES = ("none", "linear", "rate", "step")
+
+
+@dataclass
+class RampSchedule:
+    mode: str = "none"
+    ramp_seconds: float = 0  # linear: time over which all streams start
+    rate: float = 0  # rate: connections per second
+    step_size: int = 0  # Streams per step (step mode, optional for linear/rate)
+    step_hold: float = 0  # Seconds to hold after each step
+
+    def __post_init__(self):
+        if self.mode not in RAMP_MODES:
+            raise ValueError(f"Unknown ramp mode '{self.mode}', expected one of {', '.join(RAMP_MODES)}")
+        if self.mode == "linear" and self.ramp_seconds <= 0:
+            raise ValueError("Linear ramp needs --ramp-seconds > 0")
+        if self.mode == "rate" and self.rate <= 0:
+            raise ValueError("Rate ramp needs --ramp-rate > 0")
+        if self.mode == "step" and (self.step_size <= 0 or self.step_hold <= 0):
+            raise ValueError("Step ramp needs --ramp-step > 0 and --ramp-hold > 0")
+
+    @property
+    def stepped(self) -> bool:
+        return self.mode != "none" and self.step_size > 0
+
+    def start_offsets(self, count: int, shard: Optional[Tuple[int, int, int]] = None) -> List[float]:
+        """Start time (seconds after the test start) of each stream
+
+        Args:
+            count: Streams to start
+            shard: (index, shards, total) when these streams are the round-robin
+                   shard ``index`` of ``total`` streams; the offsets are then taken
+                   from the schedule of all ``total`` streams
+        """
+        if shard is not None:
+            index, shards, total = shard
+            return self.start_offsets(total)[index::shards][:count]
+
+        offsets = []
+        for i in range(count):
+            if self.mode == "linear":
+                offset = i * self.ramp_seconds / count
+            elif self.mode == "rate":
+                offset = i / self.rate
+            else:
+                offset = 0.0
+            if self.stepped:
+                offset += (i // self.step_size) * self.step_hold
+            offsets.append(offset)
+        return offsets
+
+    def phases(self, count: int) -> List[Tuple[float, str]]:
+        """(start offset, name) of each ramp phase; empty without a ramp"""
+        if self.mode == "none" or count == 0:
+            return []
+        offsets = self.start_offsets(count)
+        if self.stepped:
+            phases = [(offsets[k * self.step_size], f"step-{k + 1}")
+                      for k in range(math.ceil(count / self.step_size))]
+            steady_start = offsets[-1] + self.step_hold
+        else:
+            # The ramp lasts one arrival interval per stream
+            phases = [(0.0, "ramp")]
+            steady_start = self.ramp_seconds if self.mode == "linear" else count / self.rate
+        phases.append((steady_start, "steady"))
+        return phases
+
+
+class RampPhaseTracker:
+    """Snapshots a tester's totals at phase boundaries and reports per-phase deltas
+
+    Nothing is recorded on the streaming hot path: histograms are copied at
+    each boundary and the phase values are the differences between snapshots.
+    """
+
+    def __init__(self, tester, schedule: RampSchedule):
+        self.tester = tester
+        self.schedule = schedule
+        self.phases: List[Dict] = []
+        self._offsets: List[float] = []
+        self._phase_ends: Dict[str, float] = {}  # Scheduled end offset of each phase
+        self._current: Optional[Tuple[str, float, Dict]] = None
+
+    def _snapshot(self) -> Dict:
+        streams = list(self.tester.active_streams.values())
+        tracer = self.tester.phase_tracer
+        totals = self.tester.stats_table.totals()
+        return {
+            "frames": totals["total_frames"],
+            "bytes": totals["total_bytes"],
+            "errors": self.tester.global_stats['total_errors'],
+            "reconnections": self.tester.global_stats['total_reconnections'],
+            "attempts": tracer.attempts,
+            "failed_attempts": tracer.failed_attempts,
+            "frame_intervals": LatencyHistogram.merged(s.frame_intervals for s in streams),
+            "setup": {phase: hist.copy() for phase, hist in tracer.histograms.items()}
+        }
+
+    def begin(self, name: str, now: Optional[float] = None) -> None:
+        """Close the current phase (if any) and start ``name``"""
+        now = now or time.time()
+        snapshot = self._snapshot()
+        self._close(now, snapshot)
+        self._current = (name, now, snapshot)
+
+    def finish(self, now: Optional[float] = None) -> None:
+        """Close the last phase at the end of the test"""
+        if self._current is not None:
+            self._close(now or time.time(), self._snapshot())
+            self._current = None
+
+    def _close(self, now: float, snapshot: Dict) -> None:
+        if self._current is None:
+            return
+        name, started, before = self._current
+        duration = max(now - started, 1e-9)
+        end_offset = self._phase_ends.get(name, now - self.tester.start_time)
+        connected = self.tester.stats_table.count_status("connected", "stalled")
+        frames = snapshot["frames"] - before["frames"]
+        self.phases.append({
+            "phase": name,
+            "start_seconds": round(started - self.tester.start_time, 2),
+            "duration_seconds": round(duration, 2),
+            "streams_started": sum(1 for offset in self._offsets if offset < end_offset),
+            "streams_connected_at_end": connected,
+            "connection_attempts": snapshot["attempts"] - before["attempts"],
+            "failed_attempts": snapshot["failed_attempts"] - before["failed_attempts"],
+            "connection_phases_ms": {
+                phase: hist.delta_since(before["setup"][phase]).summary_ms()
+                for phase, hist in snapshot["setup"].items()
+                if hist.count > before["setup"][phase].count
+            },
+            "frames": frames,
+            "frames_per_second": round(frames / duration, 2),
+            "fps_per_connected_stream": round(frames / duration / connected, 2) if connected else 0,
+            "bytes_per_second": round((snapshot["bytes"] - before["bytes"]) / duration, 2),
+            "frame_interval_ms": snapshot["frame_intervals"].delta_since(before["frame_intervals"]).summary_ms(),
+            "errors": snapshot["errors"] - before["errors"],
+            "reconnections": snapshot["reconnections"] - before["reconnections"]
+        })
+
+    async def run(self, start_time: float, count: int, end_time: Optional[float] = None) -> None:
+        """Mark each phase boundary of the schedule for ``count`` streams
+
+        Args:
+            end_time: Close the last phase at this time (when the caller cannot
+                      call finish() before streams start disconnecting)
+        """
+        self._offsets = self.schedule.start_offsets(count)
+        phases = self.schedule.phases(count)
+        self._phase_ends = {name: end for (_, name), (end, _) in zip(phases, phases[1:])}
+        for offset, name in phases:
+            delay = start_time + offset - time.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.begin(name)
+        if end_time is not None and self._current is not None:
+            await asyncio.sleep(max(0.0, end_time - time.time()))
+            self.finish()
+
+    def summary(self) -> Optional[Dict]:
+        """Report section; None when no ramp was configured"""
+        if self.schedule.mode == "none":
+            return None
+        self.finish()
+        return {
+            "mode": self.schedule.mode,
+            "ramp_seconds": self.schedule.ramp_seconds,
+            "rate_per_second": self.schedule.rate,
+            "step_size": self.schedule.step_size,
+            "step_hold_seconds": self.schedule.step_hold,
+            "phases": self.phases
+        }
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Raw HTTP/1.1 Stream Client
+==========================
+
+Minimal asyncio.BufferedProtocol MJPEG client for pure capacity runs, where
+only the status, headers and frame boundaries matter.
+- One GET per connection (HTTP/1.1, optional TLS), no aiohttp response machinery
+- The socket reads into one preallocated buffer per connection
+  (get_buffer/buffer_updated) that is fed straight into MultipartFrameParser
+- Handles Content-Length, chunked and close-delimited bodies
+- Records dns / connect (TCP+TLS) / response_headers phases through
+  ConnectionPhaseTracer like the aiohttp path
+
+Usage:
+    client = RawStreamClient(ssl_context, tracer)
+    protocol = await client.open(url, parser, on_chunk, attempt)
+    error = await protocol.wait_closed()
+"""
+
+import asyncio
+import socket
+import ssl
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from multipart_stream_parser import MultipartFrameParser, parse_multipart_boundary
+from connection_phase_tracer import ConnectionPhaseTracer
+from session_pool import create_ssl_context
+
+RECV_BUFFER_SIZE = 64 * 1024
+MAX_HEAD_SIZE = 64 * 1024
+
+# Chunked transfer-encoding states
+_CHUNK_SIZE = 0
+_CHUNK_DATA = 1
+_CHUNK_DATA_END = 2
+_CHUNK_DONE = 3
+
+
+class RawStreamError(Exception):
+    """HTTP-level failure on a raw stream"""
+
+
+class RawStreamProtocol(asyncio.BufferedProtocol):
+    """Reads one HTTP response and feeds its body into a frame parser.
+
+    ``on_chunk(body_bytes, frames)`` is called after every socket read that
+    carried body bytes. When the response headers arrive the parser is reset
+    to the boundary announced in Content-Type.
+    """
+
+    def __init__(self, parser: MultipartFrameParser, on_chunk: Callable[[int, int], None],
+                 tracer: Optional[ConnectionPhaseTracer] = None, attempt: Optional[Dict] = None,
+                 read_timeout: float = 60.0, buffer_size: int = RECV_BUFFER_SIZE):
+        self.parser = parser
+        self.on_chunk = on_chunk
+        self.tracer = tracer
+        self.attempt = attempt
+        self.read_timeout = read_timeout
+
+        self.transport: Optional[asyncio.Transport] = None
+        self.status = 0
+        self.reason = ""
+        self.headers: Dict[str, str] = {}
+
+        self._loop = asyncio.get_running_loop()
+        self._buffer = bytearray(buffer_size)
+        self._view = memoryview(self._buffer)
+        self._head = bytearray()
+        self._in_head = True
+        self._chunked = False
+        self._chunk_state = _CHUNK_SIZE
+        self._chunk_line = bytearray()
+        self._chunk_remaining = 0
+        self._body_remaining: Optional[int] = None
+        self._error: Optional[Exception] = None
+        self._closed_locally = False
+
+        self._last_data = self._loop.time()
+        self._idle_handle: Optional[asyncio.TimerHandle] = None
+        self.headers_received = self._loop.create_future()
+        self.closed = self._loop.create_future()
+
+    # asyncio protocol callbacks ------------------------------------------
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self._idle_handle = self._loop.call_later(self.read_timeout, self._check_idle)
+
+    def get_buffer(self, sizehint):
+        return self._view
+
+    def buffer_updated(self, nbytes):
+        self._last_data = self._loop.time()
+        if self._in_head:
+            self._head += self._view[:nbytes]
+            end = self._head.find(b'\r\n\r\n')
+            if end < 0:
+                if len(self._head) > MAX_HEAD_SIZE:
+                    self._fail(RawStreamError("Response header too large"))
+                return
+            rest = bytes(self._head[end + 4:])
+            self._parse_head(bytes(self._head[:end]))
+            self._head = bytearray()
+            self._in_head = False
+            if rest and self.status == 200:
+                self._feed_body(rest, 0, len(rest))
+            return
+        self._feed_body(self._buffer, 0, nbytes)
+
+    def eof_received(self):
+        return None  # Close the transport; connection_lost reports the end
+
+    def connection_lost(self, exc):
+        if self._idle_handle is not None:
+            self._idle_handle.cancel()
+        # Errors while shutting down a connection we closed ourselves do not count
+        error = self._error or (None if self._closed_locally else exc)
+        if not self.headers_received.done():
+            self.headers_received.set_exception(
+                error or RawStreamError("Connection closed before response headers"))
+        if not self.closed.done():
+            self.closed.set_result(error)
+
+    # Public API ----------------------------------------------------------
+
+    async def wait_closed(self) -> Optional[Exception]:
+        """Wait for the stream to end; returns the error that ended it, if any"""
+        return await self.closed
+
+    def close(self) -> None:
+        if self.transport is not None and not self.transport.is_closing():
+            self._closed_locally = True
+            self.transport.close()
+
+    def pause_reading(self) -> None:
+        """Stop reading from the socket (slow viewer emulation)"""
+        if self.transport is not None and not self.transport.is_closing():
+            self.transport.pause_reading()
+
+    def resume_reading(self) -> None:
+        if self.transport is not None and not self.transport.is_closing():
+            self._last_data = self._loop.time()  # Time spent paused is not idle time
+            self.transport.resume_reading()
+
+    # Internals -----------------------------------------------------------
+
+    def _fail(self, error: Exception) -> None:
+        self._error = error
+        if self.transport is not None:
+            self.transport.abort()
+
+    def _check_idle(self) -> None:
+        idle = self._loop.time() - self._last_data
+        if idle >= self.read_timeout:
+            self._fail(asyncio.TimeoutError(f"No data for {idle:.0f}s"))
+            return
+        self._idle_handle = self._loop.call_later(self.read_timeout - idle, self._check_idle)
+
+    def _parse_head(self, head: bytes) -> None:
+        lines = head.split(b'\r\n')
+        parts = lines[0].split(b' ', 2)
+        try:
+            self.status = int(parts[1])
+        except (IndexError, ValueError):
+            self._fail(RawStreamError(f"Invalid status line: {lines[0][:80]!r}"))
+            return
+        self.reason = parts[2].decode('latin-1') if len(parts) > 2 else ""
+        for line in lines[1:]:
+            name, sep, value = line.partition(b':')
+            if sep:
+                self.headers[name.strip().lower().decode('latin-1')] = value.strip().decode('latin-1')
+
+        self._chunked = 'chunked' in self.headers.get('transfer-encoding', '').lower()
+        if not self._chunked and 'content-length' in self.headers:
+            try:
+                self._body_remaining = int(self.headers['content-length'])
+            except ValueError:
+                pass
+
+        self.parser.reset(parse_multipart_boundary(self.headers.get('content-type', '')))
+        if self.tracer is not None and self.attempt is not None:
+            self.tracer.record_response_headers(self.attempt)
+        self.headers_received.set_result(self.status)
+
+    def _feed_body(self, data, start: int, end: int) -> None:
+        """Feed data[start:end] (bytes or the receive buffer) into the parser"""
+        if self.status != 200:
+            return
+        if self._chunked:
+            body_bytes, frames = self._feed_chunked(data, start, end)
+        else:
+            if self._body_remaining is not None:
+                end = min(end, start + self._body_remaining)
+                self._body_remaining -= end - start
+            with memoryview(data) as view:
+                frames = self.parser.feed(view[start:end])
+            body_bytes = end - start
+            if self._body_remaining == 0:
+                self.close()
+        if body_bytes:
+            self.on_chunk(body_bytes, frames)
+
+    def _feed_chunked(self, data, pos: int, end: int) -> Tuple[int, int]:
+        """Decode chunked transfer-encoding; returns (body bytes, frames)"""
+        body_bytes = 0
+        frames = 0
+        with memoryview(data) as view:
+            while pos < end:
+                state = self._chunk_state
+                if state == _CHUNK_DATA:
+                    take = min(self._chunk_remaining, end - pos)
+                    frames += self.parser.feed(view[pos:pos + take])
+                    body_bytes += take
+                    self._chunk_remaining -= take
+                    pos += take
+                    if self._chunk_remaining == 0:
+                        self._chunk_state = _CHUNK_DATA_END
+                elif state == _CHUNK_SIZE:
+                    newline = data.find(b'\n', pos, end)
+                    if newline < 0:
+                        self._chunk_line += view[pos:end]
+                        if len(self._chunk_line) > 1024:
+                            self._fail(RawStreamError("Invalid chunk size line"))
+                        break
+                    self._chunk_line += view[pos:newline]
+                    pos = newline + 1
+                    try:
+                        size = int(bytes(self._chunk_line).split(b';', 1)[0].strip(), 16)
+                    except ValueError:
+                        self._fail(RawStreamError("Invalid chunk size"))
+                        break
+                    self._chunk_line = bytearray()
+                    if size == 0:
+                        self._chunk_state = _CHUNK_DONE
+                        self.close()
+                        break
+                    self._chunk_remaining = size
+                    self._chunk_state = _CHUNK_DATA
+                elif state == _CHUNK_DATA_END:
+                    newline = data.find(b'\n', pos, end)
+                    if newline < 0:
+                        break  # Only the CR arrived
+                    pos = newline + 1
+                    self._chunk_state = _CHUNK_SIZE
+                else:
+                    break
+        return body_bytes, frames
+
+
+class RawStreamClient:
+    """Opens raw MJPEG streams; keeps a small DNS cache like aiohttp's connector"""
+
+    def __init__(self, ssl_context: Optional[ssl.SSLContext] = None,
+                 tracer: Optional[ConnectionPhaseTracer] = None,
+                 read_timeout: float = 60.0, dns_ttl: float = 300.0):
+        self.ssl_context = ssl_context
+        self.tracer = tracer
+        self.read_timeout = read_timeout
+        self.dns_ttl = dns_ttl
+        self._dns_cache: Dict[Tuple[str, int], Tuple[List, float]] = {}
+
+    async def _resolve(self, host: str, port: int, attempt: Dict) -> List:
+        key = (host, port)
+        cached = self._dns_cache.get(key)
+        now = time.monotonic()
+        if cached and cached[1] > now:
+            if self.tracer is not None:
+                self.tracer.dns_cache_hits += 1
+            return cached[0]
+
+        start = time.perf_counter()
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        attempt['dns'] = time.perf_counter() - start
+        self._dns_cache[key] = (infos, now + self.dns_ttl)
+        return infos
+
+    async def open(self, url: str, parser: MultipartFrameParser,
+                   on_chunk: Callable[[int, int], None], attempt: Optional[Dict] = None) -> RawStreamProtocol:
+        """Connect, send the GET and wait for the response headers"""
+        loop = asyncio.get_running_loop()
+        parsed = urlparse(url)
+        secure = parsed.scheme == 'https'
+        host = parsed.hostname or ""
+        port = parsed.port or (443 if secure else 80)
+        path = (parsed.path or '/') + (f"?{parsed.query}" if parsed.query else "")
+        attempt = attempt if attempt is not None else {}
+
+        if self.tracer is not None:
+            self.tracer.start_attempt(attempt)
+
+        protocol: Optional[RawStreamProtocol] = None
+        try:
+            infos = await self._resolve(host, port, attempt)
+
+            ssl_context = None
+            if secure:
+                if self.ssl_context is None:
+                    self.ssl_context = create_ssl_context()
+                ssl_context = self.ssl_context
+
+            connect_start = time.perf_counter()
+            last_error: Optional[Exception] = None
+            for family, _, _, _, sockaddr in infos:
+                try:
+                    _, protocol = await loop.create_connection(
+                        lambda: RawStreamProtocol(parser, on_chunk, self.tracer, attempt, self.read_timeout),
+                        sockaddr[0], sockaddr[1], family=family,
+                        ssl=ssl_context, server_hostname=host if secure else None
+                    )
+                    break
+                except OSError as e:
+                    last_error = e
+            else:
+                raise last_error or OSError(f"Could not resolve {host}")
+            attempt['connect'] = time.perf_counter() - connect_start
+
+            protocol.transport.write(
+                f"GET {path} HTTP/1.1\r\n"
+                f"Host: {parsed.netloc.rsplit('@', 1)[-1]}\r\n"
+                f"Accept: multipart/x-mixed-replace; boundary=frame\r\n"
+                f"Connection: close\r\n\r\n".encode('latin-1')
+            )
+            attempt['headers_sent'] = time.perf_counter()
+            await protocol.headers_received
+            return protocol
+
+        except BaseException as e:
+            if protocol is not None:
+                protocol.close()
+            if self.tracer is not None and isinstance(e, Exception):
+                self.tracer.record_failure(attempt)
+            raise
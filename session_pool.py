@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Shared Session Pool
+===================
+
+One SSL context and one aiohttp session per upstream host, shared by every
+logical stream connection, instead of an SSL context + TCPConnector +
+ClientSession per connection.
+- Connectors are sharded by (scheme, host, port)
+- force_close keeps one socket per logical connection and never reuses a
+  socket across reconnects, so the server sees the same connection pattern
+
+Usage:
+    pool = SharedSessionPool()
+    session = pool.session_for(fr_url)
+    ...
+    await pool.close()
+"""
+
+import asyncio
+import ssl
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import aiohttp
+
+
+def create_ssl_context() -> ssl.SSLContext:
+    """SSL context used for camera streams (self-signed certificates accepted)"""
+    ssl_context = ssl.create_default_context()
+    ssl_context.check_hostname = False
+    ssl_context.verify_mode = ssl.CERT_NONE
+    return ssl_context
+
+
+class SharedSessionPool:
+    """Lazily creates one pooled ClientSession per upstream host"""
+
+    def __init__(self, ssl_context: Optional[ssl.SSLContext] = None,
+                 trace_configs: Optional[List[aiohttp.TraceConfig]] = None):
+        self.ssl_context = ssl_context or create_ssl_context()
+        self.trace_configs = trace_configs
+        self._sessions: Dict[Tuple[str, str, Optional[int]], aiohttp.ClientSession] = {}
+
+    @staticmethod
+    def _shard_key(url: str) -> Tuple[str, str, Optional[int]]:
+        parsed = urlparse(url)
+        return parsed.scheme, parsed.hostname or "", parsed.port
+
+    def session_for(self, url: str) -> aiohttp.ClientSession:
+        """Return the shared session for the URL's host"""
+        key = self._shard_key(url)
+        session = self._sessions.get(key)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=0,             # No pool cap: every stream holds its own socket
+                limit_per_host=0,
+                enable_cleanup_closed=True,
+                ssl=self.ssl_context,
+                ttl_dns_cache=300,
+                use_dns_cache=True,
+                force_close=True     # One socket per logical connection, no reuse
+            )
+            session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=None),
+                trace_configs=self.trace_configs
+            )
+            self._sessions[key] = session
+        return session
+
+    @property
+    def host_count(self) -> int:
+        return len(self._sessions)
+
+    async def close(self) -> None:
+        """Close all sessions"""
+        for session in self._sessions.values():
+            if not session.closed:
+                await session.close()
+        self._sessions.clear()
+        # Give some time for SSL cleanup
+        await asyncio.sleep(0.1)
+
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Sharded Camera Stream Load Test
+===============================
+
+Runs CameraStreamLoadTester across several worker processes so the stream
+count is not limited by what one event loop on one core can parse.
+- The parent fetches and selects cameras once, then splits them round-robin
+- Each worker streams its shard on its own event loop
+- Workers send stats deltas to the parent every report interval
+- The parent merges them into the usual generate_report() format (counters
+  exact, percentiles from merged histograms) plus a per-worker breakdown
+
+Usage:
+    python camera_stream_load_test.py --max-streams 2000 --duration 300 --workers 8
+"""
+
+import asyncio
+import multiprocessing
+import os
+import queue
+import sys
+import time
+from dataclasses import asdict
+from typing import Awaitable, Callable, Dict, List, Optional
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from camera_stream_load_test import CameraStreamLoadTester
+from camera_inventory import DEFAULT_TTL
+from fault_proxy import load_scenario
+from loop_lag_probe import LAG_THRESHOLD_MS, TESTER_CPU_THRESHOLD
+from ramp_scheduler import RampSchedule
+from stats_delta import StatsDeltaTracker, apply_generator_message, new_generator_totals
+from tester_logging import close_tester_logger
+from event_loop_backend import run_with_loop
+
+WORKER_GRACE_SECONDS = 30  # Extra time for workers to shut down and flush
+
+
+def split_cameras(cameras: List[Dict], workers: int) -> List[List[Dict]]:
+    """Round-robin split so every shard gets a similar mix of cameras"""
+    return [cameras[i::workers] for i in range(workers) if cameras[i::workers]]
+
+
+async def run_shard(cameras: List[Dict], options: Dict,
+                    send: Callable[[str, Dict], Awaitable[None]],
+                    stop_requested: Callable[[], bool], report_interval: float = 1.0) -> None:
+    """Stream one shard of cameras and ship stats deltas until the test ends
+    
+    Args:
+        cameras: Cameras assigned to this generator
+        options: CameraStreamLoadTester keyword arguments
+        send: Coroutine called with ("delta", delta) periodically and
+              ("done", {"delta", "error", "cpu_seconds"}) once at the end
+        stop_requested: Polled every report interval to end the test early
+        report_interval: Seconds between deltas
+    """
+    tester = CameraStreamLoadTester(max_concurrent=len(cameras), shuffle_cameras=False, **options)
+    tracker = StatsDeltaTracker(tester)
+    error = None
+
+    test_task = asyncio.create_task(tester.run_load_test(cameras))
+    try:
+        while not test_task.done():
+            done, _ = await asyncio.wait({test_task}, timeout=report_interval)
+            if stop_requested():
+                tester.should_stop = True
+            if not done:
+                await send("delta", tracker.collect())
+        error = test_task.result().get("error")
+    except Exception as e:
+        error = str(e)
+
+    await send("done", {
+        "delta": tracker.collect(),
+        "error": error,
+        "cpu_seconds": round(time.process_time(), 2)
+    })
+
+
+def _worker_main(worker_id: int, cameras: List[Dict], options: Dict,
+                 results, stop_event, report_interval: float, loop_backend: str):
+    """Worker process entry point"""
+    async def send(kind: str, payload: Dict) -> None:
+        results.put((kind, worker_id, payload))
+
+    run_with_loop(run_shard(cameras, options, send, stop_event.is_set, report_interval), loop_backend)
+
+
+class ShardedLoadTester:
+    """Multi-process front end with the same run_load_test() contract"""
+
+    def __init__(self, workers: int, api_url: str = "https://cc.nttagid.com/api/v1/camera/",
+                 max_concurrent: int = 50, test_duration: int = 300,
+                 shuffle_cameras: bool = True, prefix: str = "",
+                 stall_threshold: float = 5.0, stall_reconnect_after: Optional[float] = None,
+                 report_interval: float = 1.0, loop_backend: str = "auto", client: str = "aiohttp",
+                 decode_sample_every: int = 0, decode_workers: int = 2,
+                 slow_viewer_fraction: float = 0.0, slow_viewer_rate: float = 128.0,
+                 ramp: Optional[RampSchedule] = None, lag_threshold_ms: float = LAG_THRESHOLD_MS,
+                 tester_cpu_threshold: float = TESTER_CPU_THRESHOLD,
+                 inventory_ttl: float = DEFAULT_TTL, offline: bool = False,
+                 inventory_page_size: int = 0, fault_scenario=None):
+        """
+        Args:
+            workers: Number of worker processes
+            report_interval: Seconds between stats deltas from each worker
+            loop_backend: Event loop backend for the workers
+            Other arguments as for CameraStreamLoadTester
+        """
+        self.workers = workers
+        self.report_interval = report_interval
+        self.loop_backend = loop_backend
+        self.worker_options = {
+            "api_url": api_url,
+            "test_duration": test_duration,
+            "prefix": prefix,
+            "stall_threshold": stall_threshold,
+            "stall_reconnect_after": stall_reconnect_after,
+            "client": client,
+            "decode_sample_every": decode_sample_every,
+            "decode_workers": decode_workers,
+            "slow_viewer_fraction": slow_viewer_fraction,
+            "slow_viewer_rate": slow_viewer_rate,
+            "ramp": asdict(ramp) if ramp else None,
+            "timeline": False,  # The merging process keeps the timeline
+            "fault_scenario": load_scenario(fault_scenario) if fault_scenario else None
+        }
+
+        # Merge target: owns camera selection, system monitoring and the report
+        self.tester = CameraStreamLoadTester(
+            api_url=api_url,
+            max_concurrent=max_concurrent,
+            test_duration=test_duration,
+            shuffle_cameras=shuffle_cameras,
+            prefix=prefix,
+            stall_threshold=stall_threshold,
+            stall_reconnect_after=stall_reconnect_after,
+            client=client,
+            decode_sample_every=decode_sample_every,
+            decode_workers=decode_workers,
+            slow_viewer_fraction=slow_viewer_fraction,
+            slow_viewer_rate=slow_viewer_rate,
+            ramp=ramp,
+            lag_threshold_ms=lag_threshold_ms,
+            tester_cpu_threshold=tester_cpu_threshold,
+            inventory_ttl=inventory_ttl,
+            offline=offline,
+            inventory_page_size=inventory_page_size,
+            fault_scenario=self.worker_options["fault_scenario"]
+        )
+        self.logger = self.tester.logger
+        self.worker_stats: Dict[int, Dict] = {}
+
+    def _drain(self, results, pending: set) -> None:
+        """Apply every delta currently waiting in the results queue"""
+        while True:
+            try:
+                kind, worker_id, payload = results.get_nowait()
+            except queue.Empty:
+                return
+
+            worker = self.worker_stats[worker_id]
+            if apply_generator_message(self.tester, worker, kind, payload):
+                pending.discard(worker_id)
+                self.logger.info(f"Worker {worker_id}: Finished ({worker['total_frames']} frames)")
+
+    async def run_load_test(self) -> Dict:
+        """Fetch cameras, run the workers and return the merged report"""
+        try:
+            return await self._run_load_test()
+        finally:
+            close_tester_logger(self.logger)
+
+    async def _run_load_test(self) -> Dict:
+        tester = self.tester
+
+        try:
+            cameras = await tester.get_active_cameras()
+        except Exception as e:
+            self.logger.error(f"Failed to get cameras: {e}")
+            return {"error": str(e)}
+
+        if not cameras:
+            self.logger.error("No active cameras found")
+            return {"error": "No active cameras found"}
+
+        test_cameras = tester.select_test_cameras(cameras)
+        shards = split_cameras(test_cameras, self.workers)
+
+        # spawn: never fork a process that already runs an event loop
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+        stop_event = context.Event()
+
+        tester.start_time = time.time()
+        tester.global_stats['total_streams_attempted'] = len(test_cameras)
+
+        processes = []
+        for worker_id, shard in enumerate(shards):
+            self.worker_stats[worker_id] = new_generator_totals(worker_id=worker_id, cameras=len(shard))
+            options = dict(self.worker_options, ramp_shard=(worker_id, self.workers, len(test_cameras)),
+                           ramp_origin=tester.start_time)
+            process = context.Process(
+                target=_worker_main,
+                args=(worker_id, shard, options, results, stop_event,
+                      self.report_interval, self.loop_backend),
+                name=f"load-worker-{worker_id}",
+                daemon=True
+            )
+            process.start()
+            processes.append(process)
+
+        self.logger.info(f"Started {len(processes)} worker processes for {len(test_cameras)} cameras")
+
+        monitor_task = asyncio.create_task(tester.monitor_system_resources())
+        timeline_task = tester.start_timeline()
+        ramp_task = asyncio.create_task(tester.ramp_tracker.run(
+            tester.start_time, len(test_cameras), tester.start_time + tester.test_duration))
+        pending = set(range(len(processes)))
+        deadline = tester.start_time + tester.test_duration + WORKER_GRACE_SECONDS
+
+        try:
+            while pending:
+                self._drain(results, pending)
+                if tester.should_stop:
+                    stop_event.set()
+
+                crashed = [i for i in pending if not processes[i].is_alive()]
+                if crashed:
+                    self._drain(results, pending)
+                    for worker_id in crashed:
+                        if worker_id in pending:
+                            self.worker_stats[worker_id]["error"] = f"exit code {processes[worker_id].exitcode}"
+                            self.logger.error(f"Worker {worker_id}: Exited without final stats")
+                            pending.discard(worker_id)
+
+                if time.time() > deadline:
+                    self.logger.warning(f"Workers {sorted(pending)} did not finish in time")
+                    break
+
+                await asyncio.sleep(0.2)
+        finally:
+            stop_event.set()
+            tester.should_stop = True
+            monitor_task.cancel()
+            ramp_task.cancel()
+            if timeline_task is not None:
+                timeline_task.cancel()
+            await asyncio.gather(monitor_task, ramp_task, *filter(None, [timeline_task]), return_exceptions=True)
+            tester.ramp_tracker.finish()
+            for process in processes:
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+
+        report = tester.generate_report()
+        report["workers"] = {
+            "worker_count": len(processes),
+            "report_interval_seconds": self.report_interval,
+            "per_worker": [self.worker_stats[i] for i in sorted(self.worker_stats)]
+        }
+        return report
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Frozen-Stream Stall Watchdog
+============================
+
+One watchdog task for all streams, instead of relying on the 60s sock_read
+timeout to notice a connected stream that stopped sending frames.
+- Keeps a deadline heap keyed by each stream's last_frame_time + threshold
+- Frames never touch the heap; deadlines are re-checked lazily when they
+  expire, so each check costs O(log n) however many streams are watched
+- Marks streams "stalled" and accumulates stall seconds per stream
+- Optionally forces a reconnect once a stall exceeds a configurable gap
+
+Usage:
+    watchdog = StallWatchdog(stall_threshold=5.0, reconnect_after=20.0)
+    monitor = asyncio.create_task(watchdog.run())
+    watchdog.watch(camera_id, stats, on_reconnect=response.close)
+    ...
+    if stats.status == "stalled":
+        watchdog.settle(stats, now)  # before updating last_frame_time
+"""
+
+import asyncio
+import heapq
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from tester_logging import camera_event
+
+
+class StallWatchdog:
+    """Detects streams that are connected but no longer delivering frames.
+
+    Watched stats objects need ``last_frame_time``, ``status``,
+    ``stall_count`` and ``stall_seconds`` attributes (StreamStats has them).
+    """
+
+    def __init__(self, stall_threshold: float = 5.0, reconnect_after: Optional[float] = None,
+                 check_interval: float = 0.25, logger: Optional[logging.Logger] = None):
+        """
+        Args:
+            stall_threshold: Seconds without frames before a stream is marked stalled
+            reconnect_after: Seconds without frames before a reconnect is forced (None disables)
+            check_interval: How often expired deadlines are examined
+            logger: Logger for stall events
+        """
+        self.stall_threshold = stall_threshold
+        self.reconnect_after = reconnect_after
+        self.check_interval = check_interval
+        self.logger = logger or logging.getLogger(__name__)
+
+        self.forced_reconnects = 0
+        self._heap: List[Tuple[float, int, object]] = []
+        self._streams: Dict[object, object] = {}
+        self._callbacks: Dict[object, Optional[Callable[[], None]]] = {}
+        self._generations: Dict[object, int] = {}
+        self._stopped = False
+
+    def watch(self, key, stats, on_reconnect: Optional[Callable[[], None]] = None) -> None:
+        """Start (or restart after a reconnect) watching a stream"""
+        generation = self._generations.get(key, 0) + 1
+        self._generations[key] = generation
+        self._streams[key] = stats
+        self._callbacks[key] = on_reconnect
+        deadline = max(stats.last_frame_time, time.time()) + self.stall_threshold
+        heapq.heappush(self._heap, (deadline, generation, key))
+
+    def unwatch(self, key) -> None:
+        """Stop watching a stream; its heap entry is discarded when it expires"""
+        self._streams.pop(key, None)
+        self._callbacks.pop(key, None)
+        self._generations.pop(key, None)
+
+    def settle(self, stats, now: float) -> None:
+        """Close out a stall when frames resume or the connection ends"""
+        if stats.status == "stalled":
+            stats.stall_seconds += max(0.0, now - stats.last_frame_time)
+            stats.status = "connected"
+
+    def stop(self) -> None:
+        self._stopped = True
+
+    async def run(self) -> None:
+        """Watchdog loop; cancel it or call stop() to end"""
+        while not self._stopped:
+            self.check(time.time())
+            await asyncio.sleep(self.check_interval)
+
+    def check(self, now: float) -> None:
+        """Process every deadline that has expired by ``now``"""
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            _, generation, key = heapq.heappop(heap)
+            if self._generations.get(key) != generation:
+                continue  # Stale entry from an earlier connection
+
+            stats = self._streams[key]
+            if stats.status not in ("connected", "stalled"):
+                # Not streaming yet (connecting / backing off): look again later
+                heapq.heappush(heap, (now + self.stall_threshold, generation, key))
+                continue
+
+            silent_for = now - stats.last_frame_time
+            if silent_for < self.stall_threshold:
+                # Frames arrived since this deadline was set
+                heapq.heappush(heap, (stats.last_frame_time + self.stall_threshold, generation, key))
+                continue
+
+            if stats.status == "connected":
+                stats.status = "stalled"
+                stats.stall_count += 1
+                self.logger.warning(f"Camera {key}: Stalled, no frames for {silent_for:.1f}s",
+                                    extra=camera_event(stats.camera_id, "stall"))
+
+            if self.reconnect_after is not None:
+                if silent_for >= self.reconnect_after:
+                    callback = self._callbacks.get(key)
+                    if callback is not None:
+                        self.forced_reconnects += 1
+                        self.logger.warning(f"Camera {key}: Forcing reconnect after {silent_for:.1f}s stall",
+                                            extra=camera_event(stats.camera_id, "stall_reconnect"))
+                        self._callbacks[key] = None
+                        callback()
+                    heapq.heappush(heap, (now + self.stall_threshold, generation, key))
+                else:
+                    heapq.heappush(heap, (stats.last_frame_time + self.reconnect_after, generation, key))
+            else:
+                # Keep checking so recovery and repeated stalls are noticed
+                heapq.heappush(heap, (now + self.stall_threshold, generation, key))
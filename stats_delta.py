@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Stream Statistics Deltas
+========================
+
+Ships CameraStreamLoadTester statistics from a load generator process to the
+one that writes the report, so several generators produce a single
+generate_report() result.
+- Additive counters are sent as exact deltas since the previous collection
+- Histograms are sent as sparse bucket deltas, so percentiles stay mergeable
+- Per-stream state (status, FPS, frame sizes, last phases) is sent as latest value
+- Deltas are plain dicts/lists and survive both pickling and JSON
+
+Usage:
+    tracker = StatsDeltaTracker(worker_tester)
+    delta = tracker.collect()            # in the generator, periodically
+    apply_stats_delta(parent_tester, delta)  # in the parent
+"""
+
+from collections import Counter
+from typing import Dict, List, Optional
+
+from camera_stream_load_test import CameraStreamLoadTester, StreamStats
+from fault_proxy import FAULT_COUNTERS
+from latency_histogram import LatencyHistogram
+
+# StreamStats fields merged by addition
+STREAM_COUNTERS = ("total_frames", "total_bytes", "reconnections", "malformed_frames",
+                   "frame_bytes", "stall_count", "stall_seconds", "stall_reconnects",
+                   "decoded_frames", "decode_dropped", "decode_failures", "resolution_changes",
+                   "sharpness_total", "repeated_frames", "repeat_runs")
+# StreamStats fields merged by taking the latest value
+STREAM_GAUGES = ("status", "last_frame_time", "avg_fps", "min_frame_size", "max_frame_size",
+                 "end_time", "last_connection_phases", "longest_repeat_run", "frame_width", "frame_height", "last_sharpness",
+                 "viewer", "throttled_seconds", "http_status")
+# StreamStats LatencyHistogram fields, shipped as bucket deltas
+STREAM_HISTOGRAMS = ("frame_intervals", "decode_times")
+TRACER_COUNTERS = ("attempts", "failed_attempts", "reused_connections", "dns_cache_hits")
+GLOBAL_COUNTERS = ("total_errors", "total_reconnections")
+
+
+class StatsDeltaTracker:
+    """Remembers what has already been shipped for one tester"""
+
+    def __init__(self, tester: CameraStreamLoadTester):
+        self.tester = tester
+        self._stream_counters: Dict[int, Dict] = {}
+        self._stream_errors: Dict[int, Counter] = {}
+        self._stream_histograms: Dict[int, Dict[str, LatencyHistogram]] = {}
+        self._tracer_counters: Dict[str, int] = {name: 0 for name in TRACER_COUNTERS}
+        self._tracer_histograms: Dict[str, LatencyHistogram] = {
+            phase: LatencyHistogram() for phase in tester.phase_tracer.histograms
+        }
+        self._global_counters: Dict[str, int] = {name: 0 for name in GLOBAL_COUNTERS}
+        self._forced_reconnects = 0
+        self._loop_lag = LatencyHistogram()
+        self._lag_second = 0  # Last wall second shipped (re-sent while it fills; merged by max)
+        self._fault_stats: Dict[str, int] = {name: 0 for name in FAULT_COUNTERS}
+        self._fault_rules: Counter = Counter()
+
+    def collect(self) -> Dict:
+        """Everything that changed since the previous call"""
+        streams: List[Dict] = []
+        for camera_id, stats in list(self.tester.active_streams.items()):
+            previous = self._stream_counters.get(camera_id)
+            current = {name: getattr(stats, name) for name in STREAM_COUNTERS}
+            counters = {
+                name: value - previous[name] if previous else value
+                for name, value in current.items()
+            }
+            self._stream_counters[camera_id] = current
+
+            errors = stats.errors.delta_since(self._stream_errors.get(camera_id) or Counter())
+            self._stream_errors[camera_id] = stats.errors.counts.copy()
+
+            baselines = self._stream_histograms.setdefault(camera_id, {})
+            histograms = {}
+            for name in STREAM_HISTOGRAMS:
+                hist = getattr(stats, name)
+                histograms[name] = hist.delta_since(baselines.get(name) or LatencyHistogram()).to_dict()
+                baselines[name] = hist.copy()
+
+            streams.append({
+                "camera_id": camera_id,
+                "fr_url": stats.fr_url,
+                "start_time": stats.start_time,
+                "counters": counters,
+                "gauges": {name: getattr(stats, name) for name in STREAM_GAUGES},
+                "errors": errors,
+                "histograms": histograms
+            })
+
+        tracer = self.tester.phase_tracer
+        tracer_counters = {}
+        for name in TRACER_COUNTERS:
+            value = getattr(tracer, name)
+            tracer_counters[name] = value - self._tracer_counters[name]
+            self._tracer_counters[name] = value
+        phase_histograms = {}
+        for phase, hist in tracer.histograms.items():
+            phase_histograms[phase] = hist.delta_since(self._tracer_histograms[phase]).to_dict()
+            self._tracer_histograms[phase] = hist.copy()
+
+        global_counters = {}
+        for name in GLOBAL_COUNTERS:
+            value = self.tester.global_stats[name]
+            global_counters[name] = value - self._global_counters[name]
+            self._global_counters[name] = value
+        forced = self.tester.stall_watchdog.forced_reconnects
+        global_counters["stall_forced_reconnects"] = forced - self._forced_reconnects
+        self._forced_reconnects = forced
+
+        probe = self.tester.loop_lag
+        loop_lag = {
+            "histogram": probe.lag.delta_since(self._loop_lag).to_dict(),
+            "worst_by_second": {str(second): lag for second, lag in probe.worst_by_second.items()
+                                if second >= self._lag_second}
+        }
+        self._loop_lag = probe.lag.copy()
+        self._lag_second = max(probe.worst_by_second, default=self._lag_second)
+
+        delta = {
+            "streams": streams,
+            "phase_counters": tracer_counters,
+            "phase_histograms": phase_histograms,
+            "global_counters": global_counters,
+            "loop_lag": loop_lag
+        }
+
+        fault_stats = self.tester.fault_stats
+        if fault_stats is not None:
+            rules = Counter(dict(fault_stats["rule_connections"]))  # Copied at once: the proxy thread adds rules
+            delta["fault_proxy"] = {name: fault_stats[name] - self._fault_stats[name] for name in FAULT_COUNTERS}
+            delta["fault_proxy"]["rule_connections"] = dict(rules - self._fault_rules)
+            self._fault_stats = {name: fault_stats[name] for name in FAULT_COUNTERS}
+            self._fault_rules = rules
+        return delta
+
+
+def apply_stats_delta(tester: CameraStreamLoadTester, delta: Dict) -> None:
+    """Merge a collected delta into a tester used only for reporting"""
+    for entry in delta.get("streams", []):
+        camera_id = int(entry["camera_id"])
+        stats = tester.active_streams.get(camera_id)
+        if stats is None:
+            stats = StreamStats(camera_id=camera_id, fr_url=entry["fr_url"], start_time=entry["start_time"],
+                                table=tester.stats_table)
+            tester.active_streams[camera_id] = stats
+        for name, value in entry["counters"].items():
+            setattr(stats, name, getattr(stats, name) + value)
+        for name, value in entry["gauges"].items():
+            setattr(stats, name, value)
+        stats.errors.apply_delta(entry["errors"])
+        for name, data in entry["histograms"].items():
+            getattr(stats, name).merge(LatencyHistogram.from_dict(data))
+
+    tracer = tester.phase_tracer
+    for name, value in delta.get("phase_counters", {}).items():
+        setattr(tracer, name, getattr(tracer, name) + value)
+    for phase, data in delta.get("phase_histograms", {}).items():
+        tracer.histograms[phase].merge(LatencyHistogram.from_dict(data))
+
+    global_counters = delta.get("global_counters", {})
+    for name in GLOBAL_COUNTERS:
+        tester.global_stats[name] += global_counters.get(name, 0)
+    tester.stall_watchdog.forced_reconnects += global_counters.get("stall_forced_reconnects", 0)
+
+    # Generator loops lag independently; a second is as bad as the worst loop in it
+    loop_lag = delta.get("loop_lag")
+    if loop_lag:
+        tester.loop_lag.lag.merge(LatencyHistogram.from_dict(loop_lag["histogram"]))
+        for second, lag in loop_lag["worst_by_second"].items():
+            tester.loop_lag.merge_second(int(second), lag)
+
+    # Every generator runs its own fault proxy in front of its shard
+    fault_proxy = delta.get("fault_proxy")
+    if fault_proxy and tester.fault_stats is not None:
+        for name in FAULT_COUNTERS:
+            tester.fault_stats[name] += fault_proxy.get(name, 0)
+        rules = tester.fault_stats["rule_connections"]
+        for name, count in fault_proxy.get("rule_connections", {}).items():
+            rules[name] = rules.get(name, 0) + count
+
+
+def new_generator_totals(**identity) -> Dict:
+    """Per-generator breakdown entry (worker process or remote agent)"""
+    totals = dict(identity)
+    totals.update({
+        "total_frames": 0,
+        "total_bytes": 0,
+        "total_reconnections": 0,
+        "total_errors": 0,
+        "cpu_seconds": None,
+        "error": None
+    })
+    return totals
+
+
+def apply_generator_message(tester: CameraStreamLoadTester, totals: Dict,
+                            kind: str, payload: Dict) -> bool:
+    """Apply a "delta" or "done" message from a generator; True once it is done"""
+    delta: Optional[Dict] = payload if kind == "delta" else payload.get("delta")
+    if delta:
+        apply_stats_delta(tester, delta)
+        for name, value in delta_totals(delta).items():
+            totals[name] += value
+    if kind == "done":
+        totals["cpu_seconds"] = payload.get("cpu_seconds")
+        totals["error"] = payload.get("error")
+        return True
+    return False
+
+
+def delta_totals(delta: Dict) -> Dict:
+    """Frame/byte/error totals of a delta, for per-generator breakdowns"""
+    return {
+        "total_frames": sum(s["counters"]["total_frames"] for s in delta.get("streams", [])),
+        "total_bytes": sum(s["counters"]["total_bytes"] for s in delta.get("streams", [])),
+        "total_reconnections": delta.get("global_counters", {}).get("total_reconnections", 0),
+        "total_errors": delta.get("global_counters", {}).get("total_errors", 0)
+    }
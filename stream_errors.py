@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Bounded Stream Error Log
+========================
+
+Keeps per-stream errors in constant memory however long a soak test runs.
+- Every error gets a structured code when it is captured: timeout, tls,
+  dns, reset, refused, http_<status>, stall, ended, protocol or other
+- Counters per code are kept for the whole run
+- Only the most recent errors (code, time, message) are kept, in a ring
+- ``len(errors)`` is the total number of errors, so existing counting works
+
+Usage:
+    errors = ErrorLog()
+    errors.record(classify_error(e), f"Stream error: {e}")
+    errors.counts        # Counter({"timeout": 3, "http_503": 1})
+    errors.messages()    # recent messages, oldest first
+"""
+
+import asyncio
+import socket
+import ssl
+import time
+from collections import Counter, deque
+from typing import Dict, List, Optional
+
+import aiohttp
+
+from raw_stream_client import RawStreamError
+
+RECENT_ERRORS = 10  # Errors kept per stream
+MAX_MESSAGE_LENGTH = 300
+
+_DNS_ERRORS = tuple(filter(None, (socket.gaierror, getattr(aiohttp, 'ClientConnectorDNSError', None))))
+_TLS_ERRORS = (ssl.SSLError, ssl.CertificateError, aiohttp.ClientSSLError)
+_TIMEOUT_ERRORS = (asyncio.TimeoutError, socket.timeout, aiohttp.ServerTimeoutError)
+_RESET_ERRORS = (ConnectionResetError, BrokenPipeError, ConnectionAbortedError,
+                 aiohttp.ServerDisconnectedError, aiohttp.ClientPayloadError)
+
+
+class StreamHTTPError(Exception):
+    """Stream URL answered with a non-200 status"""
+
+    def __init__(self, status: int, reason: str = ""):
+        super().__init__(f"HTTP {status}: {reason}")
+        self.status = status
+
+
+class StreamStalledError(Exception):
+    """Stream closed by the stall watchdog"""
+
+
+class StreamEndedError(Exception):
+    """Server closed a stream before the test stopped"""
+
+
+def _causes(error: BaseException):
+    """The error and the errors it wraps (aiohttp keeps the OSError in os_error)"""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        yield error
+        error = getattr(error, 'os_error', None) or error.__cause__ or error.__context__
+
+
+def classify_error(error: BaseException) -> str:
+    """Structured error code for an exception raised by a stream connection"""
+    for cause in _causes(error):
+        if isinstance(cause, StreamHTTPError):
+            return f"http_{cause.status}"
+        if isinstance(cause, aiohttp.ClientResponseError):
+            return f"http_{cause.status}"
+        if isinstance(cause, StreamStalledError):
+            return "stall"
+        if isinstance(cause, StreamEndedError):
+            return "ended"
+        if isinstance(cause, _DNS_ERRORS):
+            return "dns"
+        if isinstance(cause, _TLS_ERRORS):
+            return "tls"
+        if isinstance(cause, _TIMEOUT_ERRORS):
+            return "timeout"
+        if isinstance(cause, _RESET_ERRORS):
+            return "reset"
+        if isinstance(cause, ConnectionRefusedError):
+            return "refused"
+        if isinstance(cause, RawStreamError):
+            return "protocol"
+    if isinstance(error, (aiohttp.ClientConnectionError, ConnectionError)):
+        return "reset"  # Closed mid-stream without a more specific cause
+    return "other"
+
+
+class ErrorLog:
+    """Counters per error code plus a ring of the most recent errors"""
+
+    __slots__ = ('counts', 'recent')
+
+    def __init__(self, size: int = RECENT_ERRORS):
+        self.counts = Counter()
+        self.recent = deque(maxlen=size)  # (time, code, message)
+
+    def __len__(self) -> int:
+        return sum(self.counts.values())
+
+    def record(self, code: str, message: str, when: Optional[float] = None) -> None:
+        self.counts[code] += 1
+        self.recent.append((when or time.time(), code, message[:MAX_MESSAGE_LENGTH]))
+
+    def messages(self) -> List[str]:
+        return [message for _, _, message in self.recent]
+
+    def merge(self, other: 'ErrorLog') -> None:
+        """Fold another stream's errors in (e.g. an ended churn session)"""
+        self.counts.update(other.counts)
+        self.recent.extend(other.recent)
+
+    def delta_since(self, shipped_counts: Counter) -> Dict:
+        """Errors recorded since the counts in ``shipped_counts``, for stats deltas"""
+        new = len(self) - sum(shipped_counts.values())
+        return {
+            "codes": dict(self.counts - shipped_counts),
+            "recent": list(self.recent)[-new:] if new > 0 else []
+        }
+
+    def apply_delta(self, delta: Dict) -> None:
+        self.counts.update(delta.get("codes", {}))
+        self.recent.extend(tuple(entry) for entry in delta.get("recent", []))
+
+
+def error_code_totals(logs) -> Dict[str, int]:
+    """Error counts per code over many streams, most frequent first"""
+    totals = Counter()
+    for log in logs:
+        totals.update(log.counts)
+    return dict(totals.most_common())
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Columnar Stream Stats
+=====================
+
+Struct-of-arrays store for the per-stream values that are aggregated every
+monitor tick, so totals over thousands of streams do not walk thousands of
+Python objects.
+- One column per value (frames, bytes, reconnections, stream status code,
+  last HTTP status, last frame time), indexed by a stream slot
+- Columns are ``array`` buffers that grow in place, so a stream's hot path
+  can keep a column reference and write its slot directly; sums and status
+  counts run vectorized over NumPy views of the same memory (builtin sums
+  when NumPy is not installed)
+- StreamStats keeps its attribute API: the columnar fields are descriptors
+  that read and write the stream's slot, so reports and stats deltas work
+  unchanged
+- Released slots are zeroed and reused; a released StreamStats keeps its
+  values in a private one-row table
+
+Usage:
+    table = StreamStatsTable()
+    stats = StreamStats(camera_id=1, fr_url=url, start_time=time.time(), table=table)
+    stats.total_frames += 1                        # writes the column
+    column, slot = table.columns["total_bytes"], stats.slot
+    column[slot] += len(chunk)                     # per-chunk hot path
+    table.totals()                                 # {"total_frames": ..., ...}
+    table.status_counts()                          # {"connected": ..., ...}
+"""
+
+import array
+from collections import Counter
+from typing import Dict, List
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+# Stream status values; code 0 marks a free slot
+STREAM_STATUSES = ("free", "starting", "connecting", "connected", "stalled", "error", "disconnected")
+STATUS_CODES = {status: code for code, status in enumerate(STREAM_STATUSES)}
+
+# Column name -> (array typecode, NumPy dtype of the same width)
+COLUMNS = {
+    "total_frames": ("q", "int64"),
+    "total_bytes": ("q", "int64"),
+    "reconnections": ("i", "int32"),
+    "status_code": ("b", "int8"),
+    "http_status": ("h", "int16"),  # Last HTTP status of the stream URL, 0 before a response
+    "last_frame_time": ("d", "float64"),
+}
+SUMMED_COLUMNS = ("total_frames", "total_bytes", "reconnections")
+
+
+class StreamStatsTable:
+    """Columns of per-stream values indexed by slot"""
+
+    def __init__(self, capacity: int = 1024):
+        """
+        Args:
+            capacity: Initial slots; the table doubles when full
+        """
+        self.capacity = max(1, capacity)
+        self.size = 0  # Slots handed out so far (high-water mark)
+        self.columns = {name: self._new_column(name, self.capacity) for name in COLUMNS}
+        self._free: List[int] = []
+
+    @staticmethod
+    def _new_column(name: str, length: int) -> array.array:
+        typecode = COLUMNS[name][0]
+        return array.array(typecode, bytes(array.array(typecode).itemsize * length))
+
+    def _view(self, name: str):
+        """Used part of a column; a NumPy view of its memory when available"""
+        column = self.columns[name]
+        if NUMPY_AVAILABLE:
+            return np.frombuffer(column, dtype=COLUMNS[name][1], count=self.size)
+        return column[:self.size]
+
+    def _grow(self) -> None:
+        # In place, so column references held by running streams stay valid
+        for column in self.columns.values():
+            column.frombytes(bytes(column.itemsize * self.capacity))
+        self.capacity *= 2
+
+    def allocate(self) -> int:
+        """Hand out a zeroed slot with status "starting" """
+        if self._free:
+            slot = self._free.pop()
+        else:
+            if self.size == self.capacity:
+                self._grow()
+            slot = self.size
+            self.size += 1
+        self.columns["status_code"][slot] = STATUS_CODES["starting"]
+        return slot
+
+    def release(self, slot: int) -> Dict:
+        """Free a slot; returns its values"""
+        row = self.row(slot)
+        for column in self.columns.values():
+            column[slot] = 0
+        self._free.append(slot)
+        return row
+
+    def row(self, slot: int) -> Dict:
+        return {name: column[slot] for name, column in self.columns.items()}
+
+    def totals(self) -> Dict[str, int]:
+        """Sums over all slots (free slots are zero)"""
+        return {name: int(self._view(name).sum()) if NUMPY_AVAILABLE else sum(self._view(name))
+                for name in SUMMED_COLUMNS}
+
+    def status_counts(self) -> Dict[str, int]:
+        """Streams per status, without free slots"""
+        codes = self._view("status_code")
+        if NUMPY_AVAILABLE:
+            counts = np.bincount(codes, minlength=len(STREAM_STATUSES))
+            return {STREAM_STATUSES[code]: int(count) for code, count in enumerate(counts) if code and count}
+        return {STREAM_STATUSES[code]: count for code, count in Counter(codes).items() if code}
+
+    def count_status(self, *statuses: str) -> int:
+        counts = self.status_counts()
+        return sum(counts.get(status, 0) for status in statuses)
+
+    @property
+    def live(self) -> int:
+        return self.size - len(self._free)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the columns"""
+        return sum(column.itemsize * len(column) for column in self.columns.values())
+
+
+class StatsColumn:
+    """StreamStats attribute stored in the stream's table slot"""
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, stats, owner=None):
+        if stats is None:
+            return self
+        return stats.table.columns[self.name][stats.slot]
+
+    def __set__(self, stats, value):
+        stats.table.columns[self.name][stats.slot] = value
+
+
+class StatusColumn:
+    """StreamStats.status as a string, stored as a status code"""
+
+    def __get__(self, stats, owner=None):
+        if stats is None:
+            return self
+        return STREAM_STATUSES[stats.table.columns["status_code"][stats.slot]]
+
+    def __set__(self, stats, value: str):
+        stats.table.columns["status_code"][stats.slot] = STATUS_CODES[value]
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Per-Second Stream Timeline
+==========================
+
+Records every stream's frames and bytes per one-second bucket, so a camera
+that degrades at minute 4 of a 5-minute run shows up as a curve instead of
+disappearing into whole-run totals.
+- Once per second the frame and byte columns of the stats table are copied
+  and diffed against the previous copy (vectorized); nothing is added to
+  the per-chunk hot path
+- Buckets live in preallocated [seconds x streams] integer arrays (uint16
+  frames, uint32 bytes); runs longer than the buffer keep the most recent
+  seconds as a ring
+- The global FPS, throughput and connected-stream timelines are column sums
+- Exported as a columnar .npz artifact next to the JSON reports
+
+Usage:
+    timeline = StreamTimeline(tester.stats_table, seconds=330)
+    task = asyncio.create_task(timeline.run(tester.start_time))
+    ...
+    timeline.save("reports/stream_timeline.npz", tester.active_streams)
+"""
+
+import asyncio
+import time
+from typing import Dict, List
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+from stream_stats_table import StreamStatsTable
+
+MAX_TIMELINE_SECONDS = 3600  # Longer runs keep the most recent hour
+DEGRADED_FPS_RATIO = 0.5  # Late FPS below this share of early FPS is reported
+
+
+class StreamTimeline:
+    """Per-second frame and byte buckets for every slot of a stats table"""
+
+    def __init__(self, table: StreamStatsTable, seconds: int = 330):
+        """
+        Args:
+            table: Stats table whose columns are sampled
+            seconds: Buckets to keep; older seconds are overwritten (ring)
+        """
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("The stream timeline needs NumPy (pip install numpy)")
+
+        self.table = table
+        self.seconds = max(1, min(seconds, MAX_TIMELINE_SECONDS))
+        self.ticks = 0  # Buckets recorded so far
+        self.width = table.capacity
+        self.frames = np.zeros((self.seconds, self.width), dtype=np.uint16)
+        self.bytes = np.zeros((self.seconds, self.width), dtype=np.uint32)
+        self.connected = np.zeros(self.seconds, dtype=np.int32)
+        self._last_frames = np.zeros(self.width, dtype=np.int64)
+        self._last_bytes = np.zeros(self.width, dtype=np.int64)
+
+    def _column(self, name: str):
+        return np.frombuffer(self.table.columns[name], dtype=np.int64, count=self.table.capacity)
+
+    def _widen(self) -> None:
+        """Follow the table when it grows"""
+        extra = self.table.capacity - self.width
+        self.frames = np.pad(self.frames, ((0, 0), (0, extra)))
+        self.bytes = np.pad(self.bytes, ((0, 0), (0, extra)))
+        self._last_frames = np.pad(self._last_frames, (0, extra))
+        self._last_bytes = np.pad(self._last_bytes, (0, extra))
+        self.width = self.table.capacity
+
+    def tick(self) -> None:
+        """Close one one-second bucket"""
+        if self.table.capacity > self.width:
+            self._widen()
+        frames = self._column("total_frames").copy()
+        total_bytes = self._column("total_bytes").copy()
+        row = self.ticks % self.seconds
+        # Counters only grow; a negative step means the slot was reset
+        self.frames[row] = np.clip(frames - self._last_frames, 0, np.iinfo(np.uint16).max)
+        self.bytes[row] = np.clip(total_bytes - self._last_bytes, 0, np.iinfo(np.uint32).max)
+        self.connected[row] = self.table.count_status("connected")
+        self._last_frames = frames
+        self._last_bytes = total_bytes
+        self.ticks += 1
+
+    def move(self, source: int, target: int) -> None:
+        """Fold the history of slot ``source`` into ``target`` before ``source`` is released
+
+        The counters of ``source`` are added to ``target`` by the caller; the
+        part already bucketed moves here so it is not counted twice.
+        """
+        self.frames[:, target] += self.frames[:, source]
+        self.bytes[:, target] += self.bytes[:, source]
+        self.frames[:, source] = 0
+        self.bytes[:, source] = 0
+        self._last_frames[target] += self._last_frames[source]
+        self._last_bytes[target] += self._last_bytes[source]
+        self._last_frames[source] = 0
+        self._last_bytes[source] = 0
+
+    async def run(self, start_time: float) -> None:
+        """Tick on every whole second after ``start_time``; cancel to stop"""
+        while True:
+            await asyncio.sleep(max(0.0, start_time + self.ticks + 1 - time.time()))
+            self.tick()
+
+    def _ordered(self, series):
+        """Recorded buckets, oldest first"""
+        if self.ticks <= self.seconds:
+            return series[:self.ticks]
+        return np.roll(series, -(self.ticks % self.seconds), axis=0)
+
+    @property
+    def first_second(self) -> int:
+        return max(0, self.ticks - self.seconds)
+
+    def summary(self, streams: Dict, find_degraded: bool = True) -> Dict:
+        """Global per-second timelines and streams whose FPS fell off late in the run
+
+        Args:
+            find_degraded: False when streams are not expected to run the whole
+                           test (viewer churn)
+        """
+        frames = self._ordered(self.frames)
+        total_bytes = self._ordered(self.bytes)
+        return {
+            "first_second": self.first_second,
+            "seconds": len(frames),
+            "frames_per_second": frames.sum(axis=1, dtype=np.int64).tolist(),
+            "bytes_per_second": total_bytes.sum(axis=1, dtype=np.int64).tolist(),
+            "connected_streams": self._ordered(self.connected).tolist(),
+            "degraded_streams": self.degraded_streams(streams) if find_degraded else []
+        }
+
+    def degraded_streams(self, streams: Dict) -> List[Dict]:
+        """Streams whose FPS in the last 20% of the run fell below half of the early FPS"""
+        frames = self._ordered(self.frames)
+        count = len(frames)
+        if count < 10 or not streams:
+            return []
+        stats = list(streams.values())
+        per_stream = frames[:, [s.slot for s in stats]].astype(np.float64)
+        # Early window skips the first 10% (connection setup)
+        early = per_stream[count // 10:count // 2].mean(axis=0)
+        late = per_stream[count - count // 5:].mean(axis=0)
+        degraded = np.nonzero((early >= 1) & (late < early * DEGRADED_FPS_RATIO))[0]
+        return [
+            {
+                "camera_id": stats[i].camera_id,
+                "early_fps": round(float(early[i]), 2),
+                "late_fps": round(float(late[i]), 2),
+                # First second (from the end of the early window) below the threshold
+                "degraded_from_second": self.first_second + count // 2 + int(np.argmax(
+                    per_stream[count // 2:, i] < early[i] * DEGRADED_FPS_RATIO))
+            }
+            for i in degraded
+        ]
+
+    def save(self, path: str, streams: Dict) -> str:
+        """Write the timeline of ``streams`` (key -> StreamStats) as a columnar .npz"""
+        keys = list(streams)
+        slots = [streams[key].slot for key in keys]
+        frames = self._ordered(self.frames)[:, slots]
+        total_bytes = self._ordered(self.bytes)[:, slots]
+        np.savez_compressed(
+            path,
+            second=np.arange(self.first_second, self.first_second + len(frames), dtype=np.int32),
+            stream_key=np.array([str(key) for key in keys]),
+            camera_id=np.array([streams[key].camera_id for key in keys], dtype=np.int64),
+            frames=frames,
+            bytes=total_bytes,
+            global_frames=frames.sum(axis=1, dtype=np.int64),
+            global_bytes=total_bytes.sum(axis=1, dtype=np.int64),
+            connected_streams=self._ordered(self.connected)
+        )
+        return path
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+System Resource Sampler
+=======================
+
+Samples host and tester resources on a dedicated thread, so the event loop
+that drives the streams never waits on psutil.
+- The thread wakes once per interval and measures CPU as the delta since
+  its previous sample (``cpu_percent(interval=None)``), never sleeping
+  inside psutil
+- Samples are handed to the event loop through a bounded deque (append and
+  popleft are atomic, so there is no lock); the loop drains it whenever it
+  likes, and the oldest samples are dropped if it falls far behind
+- Host: CPU, memory, network totals, context switches per second
+- Tester: CPU (% of one core) and RSS of this process and its children
+  (shard workers, decode pools), voluntary + involuntary context switches
+- Per NIC: received/sent bytes per second, errors and drops
+
+Usage:
+    sampler = SystemResourceSampler(interval=1.0)
+    sampler.start()
+    ...
+    for sample in sampler.drain():
+        print(sample['cpu_percent'], sample['tester_cpu_percent'])
+    sampler.stop()
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+import psutil
+
+MAX_PENDING_SAMPLES = 300  # Samples kept while the event loop does not drain
+
+
+class SystemResourceSampler:
+    """Background thread that samples psutil and queues the results"""
+
+    def __init__(self, interval: float = 1.0, include_children: bool = True):
+        """
+        Args:
+            interval: Seconds between samples
+            include_children: Count child processes (shard workers) as tester
+        """
+        self.interval = interval
+        self.include_children = include_children
+        self.samples = deque(maxlen=MAX_PENDING_SAMPLES)
+        self.process = psutil.Process()
+        self._processes: Dict[int, psutil.Process] = {self.process.pid: self.process}
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last: Optional[Dict] = None
+
+    def start(self) -> None:
+        self._prime()
+        self._thread = threading.Thread(target=self._run, name="system-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            # The thread waits on the event, so this returns within one sample
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def drain(self) -> List[Dict]:
+        """Samples taken since the last drain, oldest first (event loop side)"""
+        drained = []
+        while True:
+            try:
+                drained.append(self.samples.popleft())
+            except IndexError:
+                return drained
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.samples.append(self.sample())
+            except Exception:
+                pass  # A process vanished mid-sample; the next sample retries
+
+    def _tester_processes(self) -> List[psutil.Process]:
+        """This process and its children; Process objects are kept so cpu_percent has a baseline"""
+        if not self.include_children:
+            return [self.process]
+        try:
+            children = self.process.children(recursive=True)
+        except psutil.Error:
+            children = []
+        alive = {self.process.pid: self.process}
+        for child in children:
+            alive[child.pid] = self._processes.get(child.pid, child)
+        self._processes = alive
+        return list(alive.values())
+
+    def _prime(self) -> None:
+        """First call of every delta-based counter, so the first sample is a real interval"""
+        psutil.cpu_percent(interval=None)
+        for process in self._tester_processes():
+            try:
+                process.cpu_percent(interval=None)
+            except psutil.Error:
+                pass
+        self._last = self._counters()
+
+    def _counters(self) -> Dict:
+        tester_switches = {}  # pid -> switches, so processes coming and going do not skew the rate
+        for pid, process in self._processes.items():
+            try:
+                switches = process.num_ctx_switches()
+                tester_switches[pid] = switches.voluntary + switches.involuntary
+            except psutil.Error:
+                pass
+        return {
+            'time': time.monotonic(),
+            'ctx_switches': psutil.cpu_stats().ctx_switches,
+            'tester_ctx_switches': tester_switches,
+            'nics': psutil.net_io_counters(pernic=True)
+        }
+
+    def sample(self) -> Dict:
+        """One sample; called on the sampler thread"""
+        processes = self._tester_processes()
+        tester_cpu = tester_rss = busiest = 0.0
+        for process in processes:
+            try:
+                process_cpu = process.cpu_percent(interval=None)
+                tester_cpu += process_cpu
+                busiest = max(busiest, process_cpu)
+                tester_rss += process.memory_info().rss
+            except psutil.Error:
+                pass
+        cpu_percent = psutil.cpu_percent(interval=None)
+        memory = psutil.virtual_memory()
+        counters = self._counters()
+        last, self._last = self._last, counters
+        elapsed = max(counters['time'] - last['time'], 1e-9)
+        tester_switches = sum(count - last['tester_ctx_switches'][pid]
+                              for pid, count in counters['tester_ctx_switches'].items()
+                              if pid in last['tester_ctx_switches'])
+
+        nics = {}
+        for name, nic in counters['nics'].items():
+            before = last['nics'].get(name)
+            if before is None:
+                continue
+            nics[name] = {
+                'recv_bytes_per_second': max(nic.bytes_recv - before.bytes_recv, 0) / elapsed,
+                'sent_bytes_per_second': max(nic.bytes_sent - before.bytes_sent, 0) / elapsed,
+                'errors': max(nic.errin + nic.errout - before.errin - before.errout, 0),
+                'drops': max(nic.dropin + nic.dropout - before.dropin - before.dropout, 0)
+            }
+
+        return {
+            'timestamp': time.time(),
+            'cpu_percent': cpu_percent,
+            'memory_percent': memory.percent,
+            'memory_used_gb': memory.used / (1024**3),
+            'network_bytes_sent': sum(nic.bytes_sent for nic in counters['nics'].values()),
+            'network_bytes_recv': sum(nic.bytes_recv for nic in counters['nics'].values()),
+            'ctx_switches_per_second': (counters['ctx_switches'] - last['ctx_switches']) / elapsed,
+            'tester_cpu_percent': tester_cpu,
+            'tester_peak_process_cpu_percent': busiest,  # One event loop per process; this one saturates first
+            'tester_rss_mb': tester_rss / (1024**2),
+            'tester_processes': len(processes),
+            'tester_ctx_switches_per_second': tester_switches / elapsed,
+            'nics': nics
+        }
+
+
+def system_resources_summary(samples: List[Dict]) -> Dict:
+    """Report section from monitor samples (system_stats rows)"""
+    if not samples:
+        return {
+            "average_cpu_percent": 0,
+            "peak_cpu_percent": 0,
+            "average_memory_percent": 0,
+            "peak_memory_percent": 0
+        }
+
+    def average(key: str) -> float:
+        return round(sum(s.get(key, 0) for s in samples) / len(samples), 2)
+
+    def peak(key: str) -> float:
+        return round(max(s.get(key, 0) for s in samples), 2)
+
+    interfaces = {}
+    for name in sorted({name for s in samples for name in s.get('nics', {})}):
+        rows = [s['nics'][name] for s in samples if name in s.get('nics', {})]
+        recv = [row['recv_bytes_per_second'] * 8 / 1e6 for row in rows]
+        sent = [row['sent_bytes_per_second'] * 8 / 1e6 for row in rows]
+        if not any(recv) and not any(sent):
+            continue  # Idle interface
+        interfaces[name] = {
+            "average_recv_mbps": round(sum(recv) / len(recv), 2),
+            "peak_recv_mbps": round(max(recv), 2),
+            "average_sent_mbps": round(sum(sent) / len(sent), 2),
+            "peak_sent_mbps": round(max(sent), 2),
+            "errors": sum(row['errors'] for row in rows),
+            "drops": sum(row['drops'] for row in rows)
+        }
+
+    return {
+        "average_cpu_percent": average('cpu_percent'),
+        "peak_cpu_percent": peak('cpu_percent'),
+        "average_memory_percent": average('memory_percent'),
+        "peak_memory_percent": peak('memory_percent'),
+        "average_ctx_switches_per_second": round(average('ctx_switches_per_second')),
+        "peak_ctx_switches_per_second": round(peak('ctx_switches_per_second')),
+        "tester": {
+            "average_cpu_percent_of_one_core": average('tester_cpu_percent'),
+            "peak_cpu_percent_of_one_core": peak('tester_cpu_percent'),
+            "peak_single_process_cpu_percent": peak('tester_peak_process_cpu_percent'),
+            "peak_rss_mb": peak('tester_rss_mb'),
+            "processes": max(s.get('tester_processes', 0) for s in samples),
+            "average_ctx_switches_per_second": round(average('tester_ctx_switches_per_second'))
+        },
+        "network_interfaces": interfaces,
+        "samples": len(samples)
+    }
@@ -0,0 +1,753 @@
+#!/usr/bin/env python3
+"""
+Load Tester Self-Benchmark
+==========================
+
+Measures the cost of the tester's own hot paths so capacity numbers can be
+trusted to describe the server rather than the client.
+- parser: frames/sec per core for the multipart frame parser vs the old
+  ``buffer += chunk`` loop
+- loop: tester CPU per 1,000 frames and streams per core for each event loop
+  backend (asyncio, uvloop) against a local MJPEG source
+- client: the same measurement for the aiohttp and raw protocol stream clients
+- stats-store: memory and per-tick aggregation cost of the columnar stats
+  table vs walking one object per stream, at 2,000 and 10,000 streams
+- logging: event loop time per log call during a reconnection storm, for
+  synchronous console + file handlers vs the queue-based tester logger,
+  with and without per-camera rate limiting
+- inventory: peak memory, parse time and time to the first active camera
+  for ``response.json()`` + filter vs the incremental JSON array parser
+
+Usage:
+    python tester_benchmark.py parser
+    python tester_benchmark.py parser --frame-size 65536 --frames 5000
+    python tester_benchmark.py loop --streams 200 --fps 15 --duration 20
+    python tester_benchmark.py client --streams 200
+    python tester_benchmark.py stats-store --streams 2000 10000
+    python tester_benchmark.py logging --cameras 1000 --rounds 5
+    python tester_benchmark.py inventory --cameras 50000 --metadata-size 2000
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import aiohttp
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from multipart_stream_parser import MultipartFrameParser, parse_multipart_boundary
+from event_loop_backend import available_loop_backends, resolve_loop_backend, run_with_loop
+from raw_stream_client import RawStreamClient
+from camera_stream_load_test import StreamStats
+from stream_stats_table import NUMPY_AVAILABLE, StreamStatsTable
+from tester_logging import LOG_FORMAT, camera_event, close_tester_logger, setup_tester_logger, suppressed_log_lines
+from camera_inventory import READ_CHUNK_SIZE, active_cameras
+from json_array_parser import JsonArrayParser
+from mjpeg_standin_server import build_jpeg_payload, build_mjpeg_part
+
+
+def build_mjpeg_stream(frame_count: int, frame_size: int, boundary: bytes = b'frame',
+                       content_length: bool = True) -> bytes:
+    """Build a synthetic multipart/x-mixed-replace body"""
+    rng = random.Random(1234)
+    parts = []
+    for _ in range(frame_count):
+        size = max(4, int(rng.gauss(frame_size, frame_size * 0.1)))
+        parts.append(build_mjpeg_part(build_jpeg_payload(size, rng), boundary, content_length))
+    parts.append(b'--' + boundary + b'\r\n')
+    return b''.join(parts)
+
+
+def split_chunks(data: bytes, chunk_size: int = 8192) -> List[bytes]:
+    """Split a stream body into chunks as iter_chunked() would deliver them"""
+    return [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+
+
+def legacy_count_frames(chunks: List[bytes]) -> int:
+    """Frame counting loop used by the testers before MultipartFrameParser"""
+    frames = 0
+    buffer = b''
+    frame_start_marker = b'--frame'
+    for chunk in chunks:
+        buffer += chunk
+        while frame_start_marker in buffer:
+            frame_pos = buffer.find(frame_start_marker)
+            if frame_pos > 0:
+                frames += 1
+            next_pos = frame_pos + len(frame_start_marker)
+            buffer = buffer[next_pos:]
+        if len(buffer) > 1024 * 1024:
+            buffer = buffer[-512*1024:]
+    return frames
+
+
+def parser_count_frames(chunks: List[bytes]) -> int:
+    """Frame counting with the shared incremental parser"""
+    parser = MultipartFrameParser()
+    for chunk in chunks:
+        parser.feed(chunk)
+    return parser.frames
+
+
+def _time_cpu(func, chunks: List[bytes], repeats: int) -> Dict:
+    """Run func over the chunks and return the best CPU time of all repeats"""
+    best = float('inf')
+    frames = 0
+    for _ in range(repeats):
+        start = time.process_time()
+        frames = func(chunks)
+        best = min(best, time.process_time() - start)
+    return {
+        "frames": frames,
+        "cpu_seconds": round(best, 4),
+        "frames_per_core_second": round(frames / best, 1) if best > 0 else 0
+    }
+
+
+def benchmark_parser(frame_size: int = 40000, frame_count: int = 2000,
+                     chunk_size: int = 8192, repeats: int = 3,
+                     content_length: bool = True) -> Dict:
+    """Compare per-core frame throughput of the old loop and the new parser"""
+    stream = build_mjpeg_stream(frame_count, frame_size, content_length=content_length)
+    chunks = split_chunks(stream, chunk_size)
+
+    legacy = _time_cpu(legacy_count_frames, chunks, repeats)
+    parser = _time_cpu(parser_count_frames, chunks, repeats)
+
+    return {
+        "frame_size": frame_size,
+        "chunk_size": chunk_size,
+        "frames_in_stream": frame_count,
+        "content_length_headers": content_length,
+        "legacy_loop": legacy,
+        "multipart_parser": parser,
+        "speedup": round(parser["frames_per_core_second"] / legacy["frames_per_core_second"], 2)
+        if legacy["frames_per_core_second"] else 0
+    }
+
+
+def print_parser_results(results: Dict):
+    """Print parser benchmark results"""
+    print("\n" + "="*70)
+    print("🧪 FRAME PARSER MICROBENCHMARK")
+    print("="*70)
+    print(f"   Frame size: {results['frame_size']:,} bytes | Chunk size: {results['chunk_size']:,} bytes | "
+          f"Content-Length: {'yes' if results['content_length_headers'] else 'no'}")
+    for name in ("legacy_loop", "multipart_parser"):
+        r = results[name]
+        print(f"   {name:<18} frames: {r['frames']:,} | CPU: {r['cpu_seconds']}s | "
+              f"{r['frames_per_core_second']:,.0f} frames/s per core")
+    print(f"   Speedup: {results['speedup']}x")
+    print("="*70)
+
+
+async def _serve_source_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                                   part: bytes, fps: float):
+    """Send one MJPEG stream at a fixed frame rate until the client goes away"""
+    loop = asyncio.get_running_loop()
+    try:
+        await reader.readuntil(b'\r\n\r\n')
+        writer.write(b'HTTP/1.1 200 OK\r\n'
+                     b'Content-Type: multipart/x-mixed-replace; boundary=frame\r\n'
+                     b'Connection: close\r\n\r\n')
+        interval = 1.0 / fps
+        next_send = loop.time()
+        while True:
+            writer.write(part)
+            await writer.drain()
+            next_send += interval
+            await asyncio.sleep(max(0.0, next_send - loop.time()))
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def _run_stream_source(port_queue, frame_size: int, fps: float):
+    """Minimal HTTP MJPEG source on an ephemeral localhost port"""
+    part = build_mjpeg_part(build_jpeg_payload(frame_size, random.Random(1234)))
+    server = await asyncio.start_server(
+        lambda r, w: _serve_source_connection(r, w, part, fps), '127.0.0.1', 0, backlog=4096
+    )
+    port_queue.put(server.sockets[0].getsockname()[1])
+    async with server:
+        await server.serve_forever()
+
+
+def _stream_source_main(port_queue, frame_size: int, fps: float):
+    """Stream source process entry point"""
+    try:
+        asyncio.run(_run_stream_source(port_queue, frame_size, fps))
+    except KeyboardInterrupt:
+        pass
+
+
+async def _loop_client(url: str, streams: int, duration: float, warmup: float,
+                       client: str = "aiohttp") -> Dict:
+    """Open streams with the tester's read path and measure CPU after warm-up"""
+    frames = [0]
+    connector = aiohttp.TCPConnector(limit=0, force_close=True)
+    raw_client = RawStreamClient()
+
+    def on_chunk(body_bytes: int, count: int) -> None:
+        frames[0] += count
+
+    async def stream():
+        if client == "raw":
+            protocol = await raw_client.open(url, MultipartFrameParser(), on_chunk)
+            try:
+                await protocol.wait_closed()
+            finally:
+                protocol.close()
+            return
+        async with session.get(url) as response:
+            parser = MultipartFrameParser(parse_multipart_boundary(response.headers.get('content-type', '')))
+            async for chunk in response.content.iter_chunked(8192):
+                frames[0] += parser.feed(chunk)
+
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=None)) as session:
+        tasks = [asyncio.create_task(stream()) for _ in range(streams)]
+        await asyncio.sleep(warmup)
+
+        start_frames, start_cpu, start_wall = frames[0], time.process_time(), time.perf_counter()
+        await asyncio.sleep(duration)
+        end_frames, end_cpu, end_wall = frames[0], time.process_time(), time.perf_counter()
+
+        for task in tasks:
+            task.cancel()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    return {
+        "frames": end_frames - start_frames,
+        "cpu_seconds": end_cpu - start_cpu,
+        "wall_seconds": end_wall - start_wall,
+        "failed_streams": sum(1 for r in results if isinstance(r, Exception)
+                              and not isinstance(r, asyncio.CancelledError))
+    }
+
+
+def _loop_client_main(backend: str, client: str, url: str, streams: int, duration: float,
+                      warmup: float, result_queue):
+    """Client process entry point: one process per run so loops and clients never mix"""
+    result_queue.put(run_with_loop(_loop_client(url, streams, duration, warmup, client), backend))
+
+
+def _benchmark_stream_clients(runs: Dict[str, tuple], streams: int, fps: float, frame_size: int,
+                              duration: float, warmup: float) -> Dict:
+    """Run each (loop backend, client) pair against one local source"""
+    context = multiprocessing.get_context("spawn")
+
+    port_queue = context.Queue()
+    source = context.Process(target=_stream_source_main, args=(port_queue, frame_size, fps), daemon=True)
+    source.start()
+    url = f"http://127.0.0.1:{port_queue.get(timeout=30)}/stream"
+
+    results = {}
+    try:
+        for label, (backend, client_type) in runs.items():
+            result_queue = context.Queue()
+            client = context.Process(target=_loop_client_main,
+                                     args=(backend, client_type, url, streams, duration, warmup, result_queue))
+            client.start()
+            r = result_queue.get(timeout=duration + warmup + 120)
+            client.join()
+
+            cpu_per_frame = r["cpu_seconds"] / r["frames"] if r["frames"] else 0
+            delivered_fps = r["frames"] / r["wall_seconds"] / streams if r["wall_seconds"] else 0
+            cpu_percent = r["cpu_seconds"] / r["wall_seconds"] * 100
+            results[label] = {
+                "loop_backend": backend,
+                "client": client_type,
+                "frames": r["frames"],
+                "cpu_seconds": round(r["cpu_seconds"], 3),
+                "cpu_percent_of_one_core": round(cpu_percent, 1),
+                "cpu_percent_per_stream": round(cpu_percent / streams, 3),
+                "cpu_ms_per_1000_frames": round(cpu_per_frame * 1000 * 1000, 2),
+                "delivered_fps_per_stream": round(delivered_fps, 2),
+                "sustained": delivered_fps >= fps * 0.95 and not r["failed_streams"],
+                "failed_streams": r["failed_streams"],
+                # Streams at the target frame rate that one fully busy core could read
+                "max_streams_per_core": int(1 / (cpu_per_frame * fps)) if cpu_per_frame else 0
+            }
+    finally:
+        source.terminate()
+        source.join()
+
+    return {
+        "streams": streams,
+        "target_fps": fps,
+        "frame_size": frame_size,
+        "duration_seconds": duration,
+        "runs": results
+    }
+
+
+def benchmark_loop(streams: int = 100, fps: float = 15.0, frame_size: int = 40000,
+                   duration: float = 15.0, warmup: float = 3.0,
+                   backends: Optional[List[str]] = None) -> Dict:
+    """Compare tester CPU per frame for each event loop backend"""
+    runs = {backend: (backend, "aiohttp") for backend in backends or available_loop_backends()}
+    return _benchmark_stream_clients(runs, streams, fps, frame_size, duration, warmup)
+
+
+def benchmark_client(streams: int = 100, fps: float = 15.0, frame_size: int = 40000,
+                     duration: float = 15.0, warmup: float = 3.0, backend: str = "auto") -> Dict:
+    """Compare tester CPU per stream for the aiohttp and raw protocol clients"""
+    backend = resolve_loop_backend(backend)
+    runs = {client: (backend, client) for client in ("aiohttp", "raw")}
+    results = _benchmark_stream_clients(runs, streams, fps, frame_size, duration, warmup)
+    aiohttp_cpu = results["runs"]["aiohttp"]["cpu_ms_per_1000_frames"]
+    raw_cpu = results["runs"]["raw"]["cpu_ms_per_1000_frames"]
+    results["raw_cpu_saving_percent"] = round((1 - raw_cpu / aiohttp_cpu) * 100, 1) if aiohttp_cpu else 0
+    return results
+
+
+@dataclass
+class LegacyStreamCounters:
+    """The per-stream values the monitor tick aggregated before the stats table"""
+    total_frames: int = 0
+    total_bytes: int = 0
+    reconnections: int = 0
+    last_frame_time: float = 0
+    status: str = "starting"
+
+
+def _fill_streams(streams: List, rng: random.Random) -> None:
+    """Give every stream plausible values mid-test"""
+    now = time.time()
+    for s in streams:
+        s.total_frames = rng.randrange(1, 10000)
+        s.total_bytes = s.total_frames * rng.randrange(20000, 80000)
+        s.reconnections = rng.randrange(0, 3)
+        s.last_frame_time = now - rng.random()
+        s.status = "connected" if rng.random() < 0.9 else "stalled"
+
+
+def _legacy_tick(streams: List) -> tuple:
+    """What monitor_system_resources computed each second by walking every stream"""
+    active = len([s for s in streams if s.status == "connected"])
+    return active, sum(s.total_frames for s in streams), sum(s.total_bytes for s in streams)
+
+
+def _table_tick(table: StreamStatsTable) -> tuple:
+    totals = table.totals()
+    return table.count_status("connected"), totals["total_frames"], totals["total_bytes"]
+
+
+def _time_per_call(func, repeats: int) -> float:
+    """Best wall time of one call in microseconds"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1e6
+
+
+def _traced_bytes(build) -> tuple:
+    """Memory allocated by build() and its result"""
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, result
+
+
+def benchmark_stats_store(stream_counts: Optional[List[int]] = None, repeats: int = 20) -> Dict:
+    """Compare object-per-stream aggregation with the columnar stats table"""
+    results = {}
+    for count in stream_counts or [2000, 10000]:
+        rng = random.Random(count)
+        legacy_bytes, legacy = _traced_bytes(lambda: [LegacyStreamCounters() for _ in range(count)])
+        _fill_streams(legacy, rng)
+
+        table = StreamStatsTable(count)
+        views = [StreamStats(camera_id=i, fr_url="", start_time=0.0, table=table) for i in range(count)]
+        _fill_streams(views, random.Random(count))
+
+        assert _legacy_tick(legacy) == _table_tick(table)
+        legacy_us = _time_per_call(lambda: _legacy_tick(legacy), repeats)
+        table_us = _time_per_call(lambda: _table_tick(table), repeats)
+        view_us = _time_per_call(lambda: _legacy_tick(views), repeats)
+
+        # Hot path: one chunk's byte count as a plain attribute, through the
+        # view, and through the column reference the stream loops keep
+        stream, view = legacy[0], views[0]
+        column, slot = table.columns["total_bytes"], view.slot
+        updates = 100000
+
+        def legacy_updates():
+            for _ in range(updates):
+                stream.total_bytes += 8192
+
+        def view_updates():
+            for _ in range(updates):
+                view.total_bytes += 8192
+
+        def column_updates():
+            for _ in range(updates):
+                column[slot] += 8192
+
+        results[count] = {
+            "object_store_bytes": legacy_bytes,
+            "table_bytes": table.nbytes,
+            "object_tick_us": round(legacy_us, 1),
+            "table_tick_us": round(table_us, 1),
+            "view_walk_tick_us": round(view_us, 1),
+            "tick_speedup": round(legacy_us / table_us, 1) if table_us else 0,
+            "object_update_ns": round(_time_per_call(legacy_updates, 3) * 1000 / updates, 1),
+            "view_update_ns": round(_time_per_call(view_updates, 3) * 1000 / updates, 1),
+            "column_update_ns": round(_time_per_call(column_updates, 3) * 1000 / updates, 1)
+        }
+    return {"numpy": NUMPY_AVAILABLE, "repeats": repeats, "streams": results}
+
+
+def print_stats_store_results(results: Dict):
+    """Print stats store benchmark results"""
+    print("\n" + "="*70)
+    print("🗃️  STATS STORE BENCHMARK")
+    print("="*70)
+    print(f"   Columns: {'NumPy' if results['numpy'] else 'array (NumPy not installed)'} | "
+          f"Best of {results['repeats']} ticks")
+    for count, r in results["streams"].items():
+        print(f"   {count:>6,} streams | memory: objects {r['object_store_bytes'] / 1024:,.0f} KB, "
+              f"table {r['table_bytes'] / 1024:,.0f} KB")
+        print(f"                  | tick: object walk {r['object_tick_us']:,} µs, table {r['table_tick_us']:,} µs "
+              f"({r['tick_speedup']}x), walk through views {r['view_walk_tick_us']:,} µs")
+        print(f"                  | per-chunk update: attribute {r['object_update_ns']} ns, "
+              f"table column {r['column_update_ns']} ns, view {r['view_update_ns']} ns")
+    print("="*70)
+
+
+def _sync_logger(name: str, log_filename: str, console_stream) -> logging.Logger:
+    """The testers' previous setup: console and file handlers called on the logging thread"""
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.INFO)
+    logger.handlers.clear()
+    for handler in (logging.StreamHandler(console_stream), logging.FileHandler(log_filename)):
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        logger.addHandler(handler)
+    logger.propagate = False
+    return logger
+
+
+def _reconnection_storm(logger: logging.Logger, cameras: int, rounds: int) -> int:
+    """The lines stream_camera logs per failed attempt, for every camera; returns log calls"""
+    for attempt in range(1, rounds + 1):
+        for camera_id in range(cameras):
+            logger.info(f"Camera {camera_id}: Connecting to https://camera.example/{camera_id}/fr",
+                        extra=camera_event(camera_id, "connect"))
+            logger.warning(f"Camera {camera_id}: [reset] Connection error: Connection reset by peer",
+                           extra=camera_event(camera_id, "error"))
+            logger.info(f"Camera {camera_id}: Reconnecting in 1.0s (attempt #{attempt})",
+                        extra=camera_event(camera_id, "reconnect"))
+    return cameras * rounds * 3
+
+
+def benchmark_logging(cameras: int = 1000, rounds: int = 5) -> Dict:
+    """Time spent in log calls on the calling (event loop) thread during a reconnection storm"""
+    variants = {
+        "sync": None,
+        "queue": 0.0,  # rate_window 0: no rate limit
+        "queue+rate": None
+    }
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as console:
+        for label in variants:
+            log_filename = os.path.join(tmp, f"{label}.log")
+            name = f"LoggingBenchmark_{label}"
+            if label == "sync":
+                logger = _sync_logger(name, log_filename, console)
+            elif label == "queue":
+                logger = setup_tester_logger(name, log_filename, rate_window=0, console_stream=console)
+            else:
+                logger = setup_tester_logger(name, log_filename, console_stream=console)
+
+            start = time.perf_counter()
+            cpu_start = time.thread_time()  # CPU of this thread only: what the event loop would lose
+            calls = _reconnection_storm(logger, cameras, rounds)
+            caller_seconds = time.thread_time() - cpu_start
+            # Until every line is on disk (listener drained)
+            close_tester_logger(logger)
+            total_seconds = time.perf_counter() - start
+            suppressed = suppressed_log_lines(logger)
+            for handler in logger.handlers:
+                handler.close()
+            logger.handlers.clear()
+            logger.filters.clear()
+            with open(log_filename) as f:
+                lines = sum(1 for _ in f)
+
+            results[label] = {
+                "log_calls": calls,
+                "lines_written": lines,
+                "suppressed": suppressed,
+                "caller_us_per_call": round(caller_seconds * 1e6 / calls, 2),
+                "caller_seconds": round(caller_seconds, 3),
+                "seconds_until_written": round(total_seconds, 3)
+            }
+    sync_us = results["sync"]["caller_us_per_call"]
+    for r in results.values():
+        r["caller_speedup"] = round(sync_us / r["caller_us_per_call"], 1) if r["caller_us_per_call"] else 0
+    return {"cameras": cameras, "rounds": rounds, "variants": results}
+
+
+def print_logging_results(results: Dict):
+    """Print logging benchmark results"""
+    print("\n" + "="*70)
+    print("📝 LOGGING BENCHMARK")
+    print("="*70)
+    print(f"   Reconnection storm: {results['cameras']:,} cameras x {results['rounds']} failed attempts "
+          f"(connect, error, reconnect lines)")
+    for label, r in results["variants"].items():
+        print(f"   {label:<11} loop thread: {r['caller_us_per_call']} µs/call ({r['caller_speedup']}x), "
+              f"{r['caller_seconds']}s total | written: {r['lines_written']:,} lines "
+              f"in {r['seconds_until_written']}s | suppressed: {r['suppressed']:,}")
+    print("="*70)
+
+
+def build_inventory(cameras: int, metadata_size: int, active_fraction: float, rng: random.Random) -> bytes:
+    """Camera API response body with ``metadata_size`` bytes of extra fields per camera"""
+    inventory = []
+    for camera_id in range(cameras):
+        active = rng.random() < active_fraction
+        inventory.append({
+            "id": camera_id,
+            "name": f"Camera {camera_id}",
+            "status": 1 if active else 0,
+            "fr_url": f"https://camera.example/{camera_id}/fr" if active else None,
+            "location": {"lat": rng.uniform(-90, 90), "lon": rng.uniform(-180, 180)},
+            "metadata": "x" * metadata_size
+        })
+    return json.dumps(inventory).encode()
+
+
+def _json_inventory(chunks: List[bytes], on_first) -> List[Dict]:
+    """The previous path: read the whole body, json(), then filter"""
+    cameras = active_cameras(json.loads(b"".join(chunks)))
+    if cameras:
+        on_first()
+    return cameras
+
+
+def _incremental_inventory(chunks: List[bytes], on_first) -> List[Dict]:
+    """camera_inventory's path: filter every chunk as it arrives"""
+    parser = JsonArrayParser()
+    cameras = []
+    for chunk in chunks:
+        active = active_cameras(parser.feed(chunk))
+        if active and not cameras:
+            on_first()
+        cameras.extend(active)
+    cameras.extend(active_cameras(parser.close()))
+    return cameras
+
+
+# Numbers split after '.', 'e' or '-' must not parse as a shorter number
+SPLIT_CHECK_BODY = json.dumps([
+    {"id": 1, "status": 1, "lat": -3.5e10, "zoom": 1.5}, 1.5, -3.5e10, -0.25e-3, 0, 12345678901234567890,
+    True, None, "1.5", [2.5e-3, -7]
+]).encode()
+
+
+def check_inventory_splits(body: bytes = SPLIT_CHECK_BODY) -> Dict:
+    """Feed ``body`` to the incremental parser split at every pair of offsets and compare with json.loads"""
+    expected = json.loads(body)
+    splits = mismatches = 0
+    for i in range(len(body) + 1):
+        for j in range(i, len(body) + 1):
+            parser = JsonArrayParser()
+            try:
+                elements = parser.feed(body[:i]) + parser.feed(body[i:j]) + parser.feed(body[j:]) + parser.close()
+            except ValueError:
+                elements = None
+            splits += 1
+            mismatches += elements != expected
+    return {"body_bytes": len(body), "splits": splits, "mismatches": mismatches}
+
+
+def benchmark_inventory(cameras: int = 50000, metadata_size: int = 2000,
+                        active_fraction: float = 0.5, repeats: int = 3) -> Dict:
+    """Peak memory and time to the first camera for whole-body vs incremental inventory parsing"""
+    body = build_inventory(cameras, metadata_size, active_fraction, random.Random(7))
+    chunks = split_chunks(body, READ_CHUNK_SIZE)
+    results = {}
+    for label, parse in (("json", _json_inventory), ("incremental", _incremental_inventory)):
+        best_total = best_first = float('inf')
+        for _ in range(repeats):
+            first = []
+            start = time.perf_counter()
+            kept = parse(chunks, lambda: first.append(time.perf_counter()))
+            best_total = min(best_total, time.perf_counter() - start)
+            best_first = min(best_first, first[0] - start if first else best_total)
+
+        tracemalloc.start()
+        kept = parse(chunks, lambda: None)
+        kept_bytes, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[label] = {
+            "active_cameras": len(kept),
+            "parse_seconds": round(best_total, 3),
+            "time_to_first_camera_ms": round(best_first * 1000, 2),
+            "peak_mb": round(peak_bytes / 1024**2, 1),
+            "kept_mb": round(kept_bytes / 1024**2, 1)
+        }
+        del kept
+    return {
+        "cameras": cameras,
+        "body_mb": round(len(body) / 1024**2, 1),
+        "chunk_size": READ_CHUNK_SIZE,
+        "variants": results,
+        "split_check": check_inventory_splits(),
+        "peak_memory_saving_percent": round(
+            (1 - results["incremental"]["peak_mb"] / results["json"]["peak_mb"]) * 100, 1
+        ) if results["json"]["peak_mb"] else 0
+    }
+
+
+def print_inventory_results(results: Dict):
+    """Print inventory parsing benchmark results"""
+    print("\n" + "="*70)
+    print("📋 CAMERA INVENTORY PARSING BENCHMARK")
+    print("="*70)
+    print(f"   Inventory: {results['cameras']:,} cameras, {results['body_mb']} MB "
+          f"(read in {results['chunk_size'] // 1024} KB chunks)")
+    for label, r in results["variants"].items():
+        print(f"   {label:<12} peak: {r['peak_mb']} MB (kept {r['kept_mb']} MB) | "
+              f"parse: {r['parse_seconds']}s | first camera: {r['time_to_first_camera_ms']} ms | "
+              f"active: {r['active_cameras']:,}")
+    print(f"   Peak memory saving: {results['peak_memory_saving_percent']}%")
+    split = results["split_check"]
+    print(f"   Split check: {split['splits']:,} ways to cut a {split['body_bytes']}-byte body into 3 chunks, "
+          f"{split['mismatches']} mismatches with json.loads")
+    print("   Time to first camera excludes the network; with the incremental parser it")
+    print("   follows the first chunk instead of the last")
+    print("="*70)
+
+
+def print_stream_client_results(results: Dict, title: str):
+    """Print loop/client benchmark results"""
+    print("\n" + "="*70)
+    print(title)
+    print("="*70)
+    print(f"   Streams: {results['streams']} | Target FPS: {results['target_fps']} | "
+          f"Frame size: {results['frame_size']:,} bytes | Measured: {results['duration_seconds']}s")
+    for label, r in results["runs"].items():
+        print(f"   {label:<8} CPU/1000 frames: {r['cpu_ms_per_1000_frames']} ms | "
+              f"CPU: {r['cpu_percent_of_one_core']}% ({r['cpu_percent_per_stream']}% per stream) | "
+              f"FPS/stream: {r['delivered_fps_per_stream']} {'✅' if r['sustained'] else '⚠️'} | "
+              f"max streams/core: {r['max_streams_per_core']:,}")
+    if "raw_cpu_saving_percent" in results:
+        print(f"   Raw client CPU saving: {results['raw_cpu_saving_percent']}%")
+    if not all(r["sustained"] for r in results["runs"].values()):
+        print("   ⚠️  Some runs did not sustain the target frame rate; the local source or the client is saturated")
+    print("="*70)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load Tester Self-Benchmark')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    parser_bench = subparsers.add_parser('parser', help='Multipart frame parser microbenchmark')
+    parser_bench.add_argument('--frame-size', type=int, default=40000,
+                              help='Average JPEG size in bytes (default: 40000)')
+    parser_bench.add_argument('--frames', type=int, default=2000,
+                              help='Frames in the synthetic stream (default: 2000)')
+    parser_bench.add_argument('--chunk-size', type=int, default=8192,
+                              help='Read chunk size in bytes (default: 8192)')
+    parser_bench.add_argument('--repeats', type=int, default=3,
+                              help='Repetitions, best CPU time is kept (default: 3)')
+    parser_bench.add_argument('--no-content-length', dest='content_length', action='store_false',
+                              help='Omit part Content-Length headers to exercise the boundary scan')
+
+    loop_bench = subparsers.add_parser('loop', help='Event loop backend comparison against a local stream source')
+    loop_bench.add_argument('--streams', type=int, default=100,
+                            help='Concurrent streams (default: 100)')
+    loop_bench.add_argument('--fps', type=float, default=15.0,
+                            help='Frames per second per stream (default: 15)')
+    loop_bench.add_argument('--frame-size', type=int, default=40000,
+                            help='JPEG size in bytes (default: 40000)')
+    loop_bench.add_argument('--duration', type=float, default=15.0,
+                            help='Measured seconds per backend (default: 15)')
+    loop_bench.add_argument('--warmup', type=float, default=3.0,
+                            help='Seconds before measuring, to connect all streams (default: 3)')
+    loop_bench.add_argument('--backends', nargs='+', choices=['asyncio', 'uvloop'],
+                            help='Backends to compare (default: all installed)')
+
+    client_bench = subparsers.add_parser('client', help='aiohttp vs raw protocol client against a local stream source')
+    client_bench.add_argument('--streams', type=int, default=100,
+                              help='Concurrent streams (default: 100)')
+    client_bench.add_argument('--fps', type=float, default=15.0,
+                              help='Frames per second per stream (default: 15)')
+    client_bench.add_argument('--frame-size', type=int, default=40000,
+                              help='JPEG size in bytes (default: 40000)')
+    client_bench.add_argument('--duration', type=float, default=15.0,
+                              help='Measured seconds per client (default: 15)')
+    client_bench.add_argument('--warmup', type=float, default=3.0,
+                              help='Seconds before measuring, to connect all streams (default: 3)')
+    client_bench.add_argument('--loop', choices=['auto', 'asyncio', 'uvloop'], default='auto',
+                              help='Event loop backend for both clients (default: auto)')
+
+    store_bench = subparsers.add_parser('stats-store', help='Columnar stats table vs object-per-stream aggregation')
+    store_bench.add_argument('--streams', type=int, nargs='+', default=[2000, 10000],
+                             help='Stream counts to measure (default: 2000 10000)')
+    store_bench.add_argument('--repeats', type=int, default=20,
+                             help='Ticks per measurement, the best is kept (default: 20)')
+
+    logging_bench = subparsers.add_parser('logging', help='Synchronous vs queue-based logging during a reconnection storm')
+    logging_bench.add_argument('--cameras', type=int, default=1000,
+                               help='Cameras failing at once (default: 1000)')
+    logging_bench.add_argument('--rounds', type=int, default=5,
+                               help='Failed attempts per camera (default: 5)')
+
+    inventory_bench = subparsers.add_parser('inventory', help='Whole-body vs incremental camera inventory parsing')
+    inventory_bench.add_argument('--cameras', type=int, default=50000,
+                                 help='Cameras in the synthetic inventory (default: 50000)')
+    inventory_bench.add_argument('--metadata-size', type=int, default=2000,
+                                 help='Bytes of extra metadata per camera (default: 2000)')
+    inventory_bench.add_argument('--active-fraction', type=float, default=0.5,
+                                 help='Share of active cameras (default: 0.5)')
+    inventory_bench.add_argument('--repeats', type=int, default=3,
+                                 help='Repetitions, the best time is kept (default: 3)')
+
+    args = parser.parse_args()
+
+    if args.benchmark == 'parser':
+        results = benchmark_parser(args.frame_size, args.frames, args.chunk_size,
+                                   args.repeats, args.content_length)
+        print_parser_results(results)
+    elif args.benchmark == 'loop':
+        results = benchmark_loop(args.streams, args.fps, args.frame_size,
+                                 args.duration, args.warmup, args.backends)
+        print_stream_client_results(results, "🔁 EVENT LOOP BACKEND BENCHMARK")
+    elif args.benchmark == 'client':
+        results = benchmark_client(args.streams, args.fps, args.frame_size,
+                                   args.duration, args.warmup, args.loop)
+        print_stream_client_results(results, "🔌 STREAM CLIENT BENCHMARK")
+    elif args.benchmark == 'stats-store':
+        results = benchmark_stats_store(args.streams, args.repeats)
+        print_stats_store_results(results)
+    elif args.benchmark == 'logging':
+        results = benchmark_logging(args.cameras, args.rounds)
+        print_logging_results(results)
+    elif args.benchmark == 'inventory':
+        results = benchmark_inventory(args.cameras, args.metadata_size, args.active_fraction, args.repeats)
+        print_inventory_results(results)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Tester Logging Setup
+====================
+
+Shared logger setup for the load testers, so logging does not compete with
+the streams for the event loop.
+- The logger has a single QueueHandler; formatting timestamps and writing
+  the console and file lines happens on a QueueListener thread
+- Per-camera events (connect, error, reconnect, stall) carry a rate key; the
+  first few per camera and event pass in each window, the rest are counted
+  and the next line that passes says how many were suppressed
+- close_tester_logger() flushes the queue, stops the listener thread, closes
+  the log file and leaves the logger on the console only; every run method
+  calls it when it finishes, listeners still running at exit are flushed by
+  atexit
+
+Usage:
+    self.logger = setup_tester_logger(f"CameraLoadTester_{id(self)}", self.log_filename)
+    self.logger.warning(f"Camera {camera_id}: {error}", extra=camera_event(camera_id, "error"))
+    ...
+    close_tester_logger(self.logger)
+"""
+
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Hashable, Optional, TextIO
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+RATE_LIMIT_WINDOW = 10.0  # Seconds
+RATE_LIMIT_BURST = 3  # Lines per camera and event in each window
+
+_listeners: Dict[str, QueueListener] = {}
+
+
+def camera_event(key: Hashable, event: str) -> Dict:
+    """``extra`` for a per-camera log line, so repeats are rate-limited per camera and event"""
+    return {"rate_key": (key, event)}
+
+
+class CameraRateLimitFilter(logging.Filter):
+    """Passes RATE_LIMIT_BURST lines per rate key and window, counts the rest"""
+
+    def __init__(self, window: float = RATE_LIMIT_WINDOW, burst: int = RATE_LIMIT_BURST):
+        super().__init__()
+        self.window = window
+        self.burst = burst
+        self.suppressed = 0
+        self._windows: Dict[Hashable, list] = {}  # rate key -> [window start, passed, suppressed]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = getattr(record, "rate_key", None)
+        if key is None:
+            return True
+        state = self._windows.get(key)
+        if state is None or record.created - state[0] >= self.window:
+            if state is not None and state[2]:
+                record.msg = f"{record.getMessage()} (+{state[2]} similar lines suppressed)"
+                record.args = None
+            state = self._windows[key] = [record.created, 0, 0]
+        if state[1] < self.burst:
+            state[1] += 1
+            return True
+        state[2] += 1
+        self.suppressed += 1
+        return False
+
+
+class _InProcessQueueHandler(QueueHandler):
+    """QueueHandler for a listener in the same process
+
+    The stock prepare() formats and copies every record so it can be
+    pickled; in-process the record can be queued as is and formatted on
+    the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def setup_tester_logger(name: str, log_filename: Optional[str] = None,
+                        rate_window: float = RATE_LIMIT_WINDOW, rate_burst: int = RATE_LIMIT_BURST,
+                        console_stream: Optional[TextIO] = None) -> logging.Logger:
+    """Console (and file) logger whose handlers run on a background thread
+
+    Args:
+        name: Logger name (unique per tester instance)
+        log_filename: Also log to this file
+        rate_window: Rate limit window in seconds for per-camera events, 0 disables
+        rate_burst: Per-camera lines per event passed in each window
+        console_stream: Console stream (default: stderr)
+    """
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.INFO)
+    close_tester_logger(logger)
+    logger.handlers.clear()
+    logger.filters.clear()
+
+    handlers = []
+    console_handler = logging.StreamHandler(console_stream)
+    console_handler.setLevel(logging.INFO)
+    console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    handlers.append(console_handler)
+
+    file_ok = False
+    if log_filename:
+        try:
+            file_handler = logging.FileHandler(log_filename)
+            file_handler.setLevel(logging.INFO)
+            file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+            handlers.append(file_handler)
+            file_ok = True
+        except Exception as e:
+            print(f"Warning: Could not create log file {log_filename}: {e}")
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = _InProcessQueueHandler(log_queue)
+    if rate_window > 0:
+        queue_handler.addFilter(CameraRateLimitFilter(rate_window, rate_burst))
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _listeners[name] = listener
+    logger.addHandler(queue_handler)
+
+    # Prevent propagation to root logger
+    logger.propagate = False
+    if file_ok:
+        logger.info(f"Logging to file: {log_filename}")
+    return logger
+
+
+def close_tester_logger(logger: logging.Logger) -> None:
+    """Write out queued lines, close the log file and log to the console from now on"""
+    listener = _listeners.pop(logger.name, None)
+    if listener is None:
+        return
+    listener.stop()
+    for handler in [h for h in logger.handlers if isinstance(h, QueueHandler)]:
+        logger.removeHandler(handler)
+        for rate_filter in handler.filters:
+            logger.addFilter(rate_filter)  # Keeps limiting and counting
+    for handler in listener.handlers:
+        if isinstance(handler, logging.FileHandler):
+            handler.close()
+        else:
+            logger.addHandler(handler)
+
+
+def suppressed_log_lines(logger: logging.Logger) -> int:
+    """Per-camera lines dropped by the rate limit so far"""
+    filters = logger.filters + [f for h in logger.handlers for f in h.filters]
+    return sum(f.suppressed for f in filters if isinstance(f, CameraRateLimitFilter))
+
+
+@atexit.register
+def _flush_listeners() -> None:
+    for listener in list(_listeners.values()):
+        listener.stop()
+    _listeners.clear()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Open-Loop Viewer Churn
+======================
+
+Workload mode where viewers come and go instead of holding one stream each
+for the whole test.
+- Sessions arrive by a Poisson process (exponential inter-arrival times),
+  independent of how fast earlier sessions connect or finish (open loop)
+- Each session picks a camera by popularity: Zipf over the active camera
+  list (rank 1 is the most watched) or uniform
+- Session length is sampled (exponential, lognormal or fixed around a mean)
+- Every session runs through CameraStreamLoadTester.stream_camera, so it
+  reconnects, is stall-checked and is counted like a normal stream
+- Measures time-to-first-frame (TTFF) and session success rate; ended
+  sessions are folded into per-camera totals so memory stays O(cameras)
+
+Usage:
+    python camera_stream_load_test.py --churn-rate 5 --session-mean 60 --popularity zipf --duration 600
+"""
+
+import asyncio
+import bisect
+import itertools
+import math
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import aiohttp
+
+from latency_histogram import LatencyHistogram
+
+POPULARITY_MODELS = ("zipf", "uniform")
+SESSION_DISTRIBUTIONS = ("exponential", "lognormal", "fixed")
+LOGNORMAL_SIGMA = 1.0
+MIN_SESSION_SECONDS = 1.0
+
+
+@dataclass
+class ChurnWorkload:
+    arrival_rate: float  # Sessions per second (Poisson)
+    session_mean: float = 60.0  # Mean session length in seconds
+    session_distribution: str = "exponential"
+    popularity: str = "zipf"
+    zipf_exponent: float = 1.0
+    seed: Optional[int] = None
+
+    def __post_init__(self):
+        if self.arrival_rate <= 0:
+            raise ValueError("Churn needs --churn-rate > 0")
+        if self.session_distribution not in SESSION_DISTRIBUTIONS:
+            raise ValueError(f"Unknown session distribution '{self.session_distribution}'")
+        if self.popularity not in POPULARITY_MODELS:
+            raise ValueError(f"Unknown popularity model '{self.popularity}'")
+
+
+class ViewerChurnRunner:
+    """Generates viewer sessions against a tester and tracks their outcome"""
+
+    def __init__(self, tester, cameras: List[Dict], workload: ChurnWorkload):
+        """
+        Args:
+            tester: CameraStreamLoadTester whose stream_camera runs each session
+            cameras: Active cameras in popularity order (rank 1 first)
+            workload: Arrival, popularity and session length model
+        """
+        self.tester = tester
+        self.cameras = cameras
+        self.workload = workload
+        self.rng = random.Random(workload.seed)
+        if workload.popularity == "zipf":
+            weights = [1.0 / rank ** workload.zipf_exponent for rank in range(1, len(cameras) + 1)]
+        else:
+            weights = [1.0] * len(cameras)
+        self._cum_weights = list(itertools.accumulate(weights))
+
+        self.sessions_started = 0
+        self.dropped_at_cap = 0  # Arrivals while max_concurrent sessions were running
+        self.outcomes = Counter()  # success, degraded, failed
+        self.ttff = LatencyHistogram()
+        self.session_seconds = LatencyHistogram()
+        self.camera_sessions = Counter()
+        self.peak_sessions = 0
+        self._camera_seconds: Dict[int, float] = {}
+        self._sessions: Dict[int, asyncio.Task] = {}
+        self._ids = itertools.count(1)
+
+    def pick_camera(self) -> Dict:
+        point = self.rng.random() * self._cum_weights[-1]
+        return self.cameras[min(bisect.bisect_right(self._cum_weights, point), len(self.cameras) - 1)]
+
+    def session_length(self) -> float:
+        mean = self.workload.session_mean
+        distribution = self.workload.session_distribution
+        if distribution == "exponential":
+            length = self.rng.expovariate(1.0 / mean)
+        elif distribution == "lognormal":
+            length = self.rng.lognormvariate(math.log(mean) - LOGNORMAL_SIGMA ** 2 / 2, LOGNORMAL_SIGMA)
+        else:
+            length = mean
+        return max(MIN_SESSION_SECONDS, length)
+
+    async def run(self, session: aiohttp.ClientSession) -> None:
+        """Start sessions until the tester stops; cancel to end"""
+        tester = self.tester
+        next_arrival = time.time()
+        try:
+            while not tester.should_stop:
+                next_arrival += self.rng.expovariate(self.workload.arrival_rate)
+                delay = next_arrival - time.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                if tester.should_stop:
+                    break
+                if len(self._sessions) >= tester.max_concurrent:
+                    self.dropped_at_cap += 1
+                    continue
+
+                session_id = next(self._ids)
+                camera = self.pick_camera()
+                self._sessions[session_id] = asyncio.create_task(
+                    self._run_session(camera, session, session_id, self.session_length())
+                )
+                self.sessions_started += 1
+                self.camera_sessions[camera['id']] += 1
+                self.peak_sessions = max(self.peak_sessions, len(self._sessions))
+        finally:
+            await self.stop_sessions()
+
+    async def _run_session(self, camera: Dict, session, session_id: int, length: float) -> None:
+        """One viewer: stream for ``length`` seconds, then leave"""
+        tester = self.tester
+        key = f"session-{session_id}"
+        stream = asyncio.create_task(tester.stream_camera(camera, session, session_id=session_id))
+        try:
+            # stream_camera only returns once the test stops
+            await asyncio.wait({stream}, timeout=length)
+        finally:
+            if not stream.done():
+                stream.cancel()
+                await asyncio.gather(stream, return_exceptions=True)
+            self._sessions.pop(session_id, None)
+            stats = tester.active_streams.pop(key, None)
+            if stats is not None:
+                self._retire(stats, cut_by_test_end=tester.should_stop)
+
+    def _retire(self, stats, cut_by_test_end: bool) -> None:
+        """Classify an ended session and fold it into its camera's totals"""
+        # stats_delta imports the tester module, which imports this one
+        from stats_delta import STREAM_COUNTERS, STREAM_HISTOGRAMS
+
+        duration = (stats.end_time or time.time()) - stats.start_time
+        if stats.first_frame_time is not None:
+            self.ttff.record(stats.first_frame_time - stats.start_time)
+        if not cut_by_test_end:
+            # Sessions still running when the test ends are not classified
+            if stats.first_frame_time is None:
+                self.outcomes["failed"] += 1
+            elif stats.errors or stats.stall_count:  # A server close mid-session is an "ended" error
+                self.outcomes["degraded"] += 1
+            else:
+                self.outcomes["success"] += 1
+        self.session_seconds.record(duration)
+
+        aggregate = self.tester.active_streams.get(stats.camera_id)
+        if aggregate is None:
+            aggregate = type(stats)(camera_id=stats.camera_id, fr_url=stats.fr_url, start_time=stats.start_time,
+                                    table=stats.table)
+            aggregate.status = "disconnected"
+            self.tester.active_streams[stats.camera_id] = aggregate
+        for name in STREAM_COUNTERS:
+            setattr(aggregate, name, getattr(aggregate, name) + getattr(stats, name))
+        for name in STREAM_HISTOGRAMS:
+            getattr(aggregate, name).merge(getattr(stats, name))
+        aggregate.errors.merge(stats.errors)
+        aggregate.min_frame_size = min(filter(None, (aggregate.min_frame_size, stats.min_frame_size)), default=0)
+        aggregate.max_frame_size = max(aggregate.max_frame_size, stats.max_frame_size)
+        aggregate.longest_repeat_run = max(aggregate.longest_repeat_run, stats.longest_repeat_run)
+        aggregate.throttled_seconds += stats.throttled_seconds
+        if stats.frame_width:
+            aggregate.frame_width, aggregate.frame_height = stats.frame_width, stats.frame_height
+            aggregate.last_sharpness = stats.last_sharpness
+        aggregate.last_connection_phases = stats.last_connection_phases or aggregate.last_connection_phases
+        aggregate.end_time = stats.end_time
+        if aggregate.first_frame_time is None:
+            aggregate.first_frame_time = stats.first_frame_time
+
+        seconds = self._camera_seconds.get(stats.camera_id, 0.0) + duration
+        self._camera_seconds[stats.camera_id] = seconds
+        aggregate.avg_fps = aggregate.total_frames / seconds if seconds > 0 else 0
+        if self.tester.timeline is not None:
+            self.tester.timeline.move(stats.slot, aggregate.slot)
+        stats.release()  # The session's table slot is reused by later sessions
+
+    async def stop_sessions(self) -> None:
+        """Cancel every running session and wait for them to be folded in"""
+        tasks = list(self._sessions.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def summary(self) -> Dict:
+        """Report section"""
+        classified = sum(self.outcomes.values())
+        return {
+            "arrival_rate_per_second": self.workload.arrival_rate,
+            "session_mean_seconds": self.workload.session_mean,
+            "session_distribution": self.workload.session_distribution,
+            "popularity": self.workload.popularity,
+            "zipf_exponent": self.workload.zipf_exponent if self.workload.popularity == "zipf" else None,
+            "cameras_available": len(self.cameras),
+            "cameras_watched": len(self.camera_sessions),
+            "expected_concurrent_sessions": round(self.workload.arrival_rate * self.workload.session_mean, 1),
+            "peak_concurrent_sessions": self.peak_sessions,
+            "sessions_started": self.sessions_started,
+            "dropped_at_cap": self.dropped_at_cap,
+            "sessions_classified": classified,
+            "sessions_succeeded": self.outcomes["success"],
+            "sessions_degraded": self.outcomes["degraded"],
+            "sessions_failed": self.outcomes["failed"],
+            "success_rate_percent": round(self.outcomes["success"] / classified * 100, 2) if classified else 0,
+            "time_to_first_frame_ms": self.ttff.summary_ms(),
+            "session_seconds": {name: value if name == "count" else round(value / 1000, 2)
+                                for name, value in self.session_seconds.summary_ms().items()},
+            "top_cameras": [
+                {"camera_id": camera_id, "sessions": count}
+                for camera_id, count in self.camera_sessions.most_common(10)
+            ]
+        }
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Slow Viewer Read Throttling
+===========================
+
+Emulates viewers on slow links that do not drain the stream as fast as the
+tester can, so servers that buffer per consumer are tested at scale.
+- One token bucket per throttled connection (bytes per second + small burst)
+- Buckets refill lazily from the clock when bytes are consumed; a connection
+  only waits once its bucket is in debt
+- Waiting connections are released by one shared timer task instead of a
+  sleep per chunk, so thousands of slow viewers cost one timer
+- While a connection waits it stops reading, the socket buffers fill and
+  the server sees real TCP backpressure
+
+Usage:
+    timer = ThrottleTimer()
+    timer_task = asyncio.create_task(timer.run())
+    bucket = TokenBucket(64 * 1024, timer)
+    if not bucket.consume(len(chunk)):
+        await bucket.wait()                       # coroutine readers
+        # or: transport.pause_reading(); bucket.wait_then(transport.resume_reading)
+"""
+
+import asyncio
+import time
+from typing import Callable, List, Optional
+
+BURST_SECONDS = 0.25  # Bucket depth in seconds of the configured rate
+MIN_BURST = 16 * 1024
+
+
+def assign_viewer_classes(count: int, slow_fraction: float) -> List[str]:
+    """Evenly interleaved "fast"/"slow" labels for ``count`` streams"""
+    slow_fraction = min(max(slow_fraction, 0.0), 1.0)
+    return [
+        "slow" if int((index + 1) * slow_fraction) > int(index * slow_fraction) else "fast"
+        for index in range(count)
+    ]
+
+
+class ThrottleTimer:
+    """Shared ticker that releases buckets once they are out of debt"""
+
+    def __init__(self, interval: float = 0.05):
+        """
+        Args:
+            interval: Seconds between refills of waiting buckets
+        """
+        self.interval = interval
+        self._waiting = set()
+        self._stopped = False
+
+    def add(self, bucket: 'TokenBucket') -> None:
+        self._waiting.add(bucket)
+
+    def discard(self, bucket: 'TokenBucket') -> None:
+        self._waiting.discard(bucket)
+
+    def stop(self) -> None:
+        self._stopped = True
+
+    async def run(self) -> None:
+        """Timer loop; cancel it or call stop() to end"""
+        while not self._stopped:
+            await asyncio.sleep(self.interval)
+            self.tick(time.monotonic())
+
+    def tick(self, now: float) -> None:
+        """Refill every waiting bucket and release those back in credit"""
+        for bucket in list(self._waiting):
+            bucket.refill(now)
+            if bucket.tokens >= 0:
+                self._waiting.discard(bucket)
+                bucket.release(now)
+
+
+class TokenBucket:
+    """Per-connection read budget in bytes"""
+
+    __slots__ = ('rate', 'burst', 'tokens', 'throttled_seconds', 'timer',
+                 '_updated', '_blocked_since', '_waiter', '_callback')
+
+    def __init__(self, rate: float, timer: ThrottleTimer, burst: Optional[float] = None):
+        """
+        Args:
+            rate: Bytes per second
+            timer: Shared timer that releases waiting connections
+            burst: Bucket depth in bytes (default: BURST_SECONDS of rate)
+        """
+        self.rate = rate
+        self.burst = burst or max(rate * BURST_SECONDS, MIN_BURST)
+        self.tokens = self.burst
+        self.throttled_seconds = 0.0  # Time spent waiting for tokens
+        self.timer = timer
+        self._updated = time.monotonic()
+        self._blocked_since = 0.0
+        self._waiter: Optional[asyncio.Future] = None
+        self._callback: Optional[Callable[[], None]] = None
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def consume(self, nbytes: int) -> bool:
+        """Charge bytes already read; False when the reader must wait"""
+        now = time.monotonic()
+        self.refill(now)
+        self.tokens -= nbytes
+        if self.tokens >= 0:
+            return True
+        self._blocked_since = now
+        return False
+
+    async def wait(self) -> None:
+        """Wait until the timer releases this bucket"""
+        self._waiter = asyncio.get_running_loop().create_future()
+        self.timer.add(self)
+        try:
+            await self._waiter
+        finally:
+            self._waiter = None
+            self.timer.discard(self)
+
+    def wait_then(self, callback: Callable[[], None]) -> None:
+        """Call ``callback`` (e.g. resume_reading) when the timer releases this bucket"""
+        self._callback = callback
+        self.timer.add(self)
+
+    def cancel(self) -> None:
+        """Forget a pending wait_then() callback (connection closed)"""
+        self._callback = None
+        self.timer.discard(self)
+
+    def release(self, now: float) -> None:
+        """Called by the timer once tokens are back to zero or more"""
+        self.throttled_seconds += now - self._blocked_since
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+        callback, self._callback = self._callback, None
+        if callback is not None:
+            callback()